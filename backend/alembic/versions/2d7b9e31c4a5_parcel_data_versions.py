@@ -0,0 +1,55 @@
+"""Parcel data versions for tile caching
+
+Revision ID: 2d7b9e31c4a5
+Revises: 8c1e4a7f2b90
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = '2d7b9e31c4a5'
+down_revision = '8c1e4a7f2b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if 'data_versions' not in inspector.get_table_names():
+        op.create_table(
+            'data_versions',
+            sa.Column('name', sa.String(length=150), primary_key=True),
+            sa.Column('version', sa.BigInteger(), nullable=False, server_default='1'),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        )
+
+    # Bump the table's version once per write statement, whatever code path
+    # (API, seed scripts, psql) performed the write.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO data_versions (name, version, updated_at)
+            VALUES (TG_TABLE_NAME, 1, now())
+            ON CONFLICT (name) DO UPDATE
+                SET version = data_versions.version + 1,
+                    updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER parcels_bump_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON parcels
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()
+    """)
+    op.execute("INSERT INTO data_versions (name, version) VALUES ('parcels', 1) ON CONFLICT DO NOTHING")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS parcels_bump_data_version ON parcels")
+    op.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+    op.drop_table('data_versions')
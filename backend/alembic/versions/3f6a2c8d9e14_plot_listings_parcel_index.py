@@ -0,0 +1,27 @@
+"""Index plot_listings.parcel_id for nearest-listing joins
+
+Revision ID: 3f6a2c8d9e14
+Revises: e19d5b7c3a42
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6a2c8d9e14'
+down_revision = 'e19d5b7c3a42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ListingService.get_nearest_listings walks parcels in `<->` order and
+    # looks up each parcel's listings, so the join key needs an index
+    op.execute("CREATE INDEX IF NOT EXISTS ix_plot_listings_parcel_id ON plot_listings (parcel_id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_plot_listings_parcel_id")
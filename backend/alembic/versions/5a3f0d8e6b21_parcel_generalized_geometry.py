@@ -0,0 +1,54 @@
+"""Precomputed generalized parcel geometry
+
+Revision ID: 5a3f0d8e6b21
+Revises: 2d7b9e31c4a5
+Create Date: 2026-10-17 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = '5a3f0d8e6b21'
+down_revision = '2d7b9e31c4a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE parcels ADD COLUMN IF NOT EXISTS geometry_lod1 geometry(GEOMETRY, 4326)")
+    op.execute("ALTER TABLE parcels ADD COLUMN IF NOT EXISTS geometry_lod2 geometry(GEOMETRY, 4326)")
+
+    # Tolerances are in degrees (~11 m and ~55 m at the equator) and match
+    # GENERALIZATION_LEVELS in app/services/parcel_service.py (zoom <= 13
+    # and zoom <= 10 respectively).
+    op.execute("""
+        CREATE OR REPLACE FUNCTION generalize_parcel_geometry() RETURNS trigger AS $$
+        BEGIN
+            NEW.geometry_lod1 := ST_SimplifyPreserveTopology(NEW.geometry, 0.0001);
+            NEW.geometry_lod2 := ST_SimplifyPreserveTopology(NEW.geometry, 0.0005);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER parcels_generalize_geometry
+            BEFORE INSERT OR UPDATE OF geometry ON parcels
+            FOR EACH ROW EXECUTE FUNCTION generalize_parcel_geometry()
+    """)
+
+    op.execute("""
+        UPDATE parcels SET
+            geometry_lod1 = ST_SimplifyPreserveTopology(geometry, 0.0001),
+            geometry_lod2 = ST_SimplifyPreserveTopology(geometry, 0.0005)
+        WHERE geometry_lod1 IS NULL OR geometry_lod2 IS NULL
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS parcels_generalize_geometry ON parcels")
+    op.execute("DROP FUNCTION IF EXISTS generalize_parcel_geometry()")
+    op.drop_column('parcels', 'geometry_lod2')
+    op.drop_column('parcels', 'geometry_lod1')
@@ -0,0 +1,303 @@
+"""Partition parcels by region
+
+Revision ID: 6e1c7b9a3d58
+Revises: f4b8a2d61e07
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = '6e1c7b9a3d58'
+down_revision = 'f4b8a2d61e07'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_COLUMNS = ['parcel_id', 'owner_name', 'address', 'land_use', 'region']
+
+# Every trigger on parcels as (name, definition after "CREATE TRIGGER name").
+# Functions are the ones created by earlier revisions, plus the parcel_keys
+# ones below. Triggers on a partitioned table apply to all its partitions.
+PARCEL_TRIGGERS = [
+    ('parcels_register_key', """
+        BEFORE INSERT ON parcels
+        FOR EACH ROW EXECUTE FUNCTION register_parcel_key()
+    """),
+    ('parcels_generalize_geometry', """
+        BEFORE INSERT OR UPDATE OF geometry ON parcels
+        FOR EACH ROW EXECUTE FUNCTION generalize_parcel_geometry()
+    """),
+    ('parcels_sync_keys', """
+        AFTER UPDATE ON parcels
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION sync_parcel_keys()
+    """),
+    ('parcels_release_keys', """
+        AFTER DELETE ON parcels
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION release_parcel_keys()
+    """),
+    ('parcels_release_keys_truncate', """
+        AFTER TRUNCATE ON parcels
+        FOR EACH STATEMENT EXECUTE FUNCTION release_parcel_keys()
+    """),
+    ('parcels_bump_data_version', """
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON parcels
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()
+    """),
+    ('parcels_region_versions_insert', """
+        AFTER INSERT ON parcels
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION parcels_bump_region_versions()
+    """),
+    ('parcels_region_versions_update', """
+        AFTER UPDATE ON parcels
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION parcels_bump_region_versions()
+    """),
+    ('parcels_region_versions_delete', """
+        AFTER DELETE ON parcels
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION parcels_bump_region_versions()
+    """),
+    ('parcels_region_versions_truncate', """
+        AFTER TRUNCATE ON parcels
+        FOR EACH STATEMENT EXECUTE FUNCTION parcels_bump_region_versions()
+    """),
+    ('parcels_neighbors_insert', """
+        AFTER INSERT ON parcels
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION parcel_neighbors_after_insert()
+    """),
+    ('parcels_neighbors_update', """
+        AFTER UPDATE ON parcels
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION parcel_neighbors_after_update()
+    """),
+]
+
+
+def _insertable_columns(bind, table: str) -> str:
+    """Column list of a table without generated columns, for INSERT ... SELECT"""
+    columns = bind.execute(sa.text("""
+        SELECT quote_ident(attname)
+        FROM pg_attribute
+        WHERE attrelid = CAST(:table AS regclass) AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+        ORDER BY attnum
+    """), {"table": table}).scalars().all()
+    return ", ".join(columns)
+
+
+def _repoint_foreign_keys(bind, source: str, target: str) -> None:
+    """Move every foreign key referencing source(id) to target(id)"""
+    constraints = bind.execute(sa.text("""
+        SELECT conrelid::regclass::text AS relation, conname, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE confrelid = CAST(:source AS regclass) AND contype = 'f'
+    """), {"source": source}).all()
+    for relation, name, definition in constraints:
+        op.execute(f'ALTER TABLE {relation} DROP CONSTRAINT "{name}"')
+        definition = definition.replace(f"REFERENCES {source}(id)", f"REFERENCES {target}(id)")
+        op.execute(f'ALTER TABLE {relation} ADD CONSTRAINT "{name}" {definition}')
+
+
+def _create_triggers() -> None:
+    for name, definition in PARCEL_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON parcels")
+        op.execute(f"CREATE TRIGGER {name} {definition}")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # Unique constraints on a partitioned table must include the partition
+    # key, so the globally unique id and parcel_id live in parcel_keys and
+    # foreign keys to parcels point there instead
+    if 'parcel_keys' not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            'parcel_keys',
+            sa.Column('id', sa.Integer(), primary_key=True, autoincrement=False),
+            sa.Column('parcel_id', sa.String(length=50), nullable=False),
+            sa.Column('region', sa.String(length=100), nullable=False),
+        )
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_parcel_keys_parcel_id ON parcel_keys (parcel_id)")
+
+    # Register a new parcel's keys. An upsert of an existing parcel, or a
+    # row moving partition because its region changed, finds its key
+    # already there; the same parcel_id in another region is rejected.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION register_parcel_key() RETURNS trigger AS $$
+        DECLARE
+            existing parcel_keys%ROWTYPE;
+        BEGIN
+            INSERT INTO parcel_keys (id, parcel_id, region)
+            VALUES (NEW.id, NEW.parcel_id, NEW.region)
+            ON CONFLICT DO NOTHING;
+            IF NOT FOUND THEN
+                SELECT * INTO existing FROM parcel_keys WHERE parcel_id = NEW.parcel_id;
+                IF FOUND AND existing.id <> NEW.id AND existing.region <> NEW.region THEN
+                    RAISE EXCEPTION 'Parcel % already exists in region %', NEW.parcel_id, existing.region
+                        USING ERRCODE = 'unique_violation';
+                END IF;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION sync_parcel_keys() RETURNS trigger AS $$
+        BEGIN
+            UPDATE parcel_keys k
+            SET parcel_id = n.parcel_id, region = n.region
+            FROM new_rows n
+            WHERE k.id = n.id AND (k.parcel_id, k.region) IS DISTINCT FROM (n.parcel_id, n.region);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    # Deleting the key cascades to listings, inquiries and neighbours as the
+    # old foreign keys to parcels did. A row moving partition is an UPDATE
+    # and does not fire this.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION release_parcel_keys() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'TRUNCATE' THEN
+                DELETE FROM parcel_keys;
+            ELSE
+                DELETE FROM parcel_keys k USING old_rows o WHERE k.id = o.id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Give a region its own partition, moving its rows out of the default
+    # partition. Takes an exclusive lock on parcels; run it when adding a
+    # region rather than inside a long import.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION add_parcel_region_partition(region_name text) RETURNS text AS $$
+        DECLARE
+            partition text := 'parcels_'
+                || left(trim(both '_' from lower(regexp_replace(region_name, '[^A-Za-z0-9]+', '_', 'g'))), 40)
+                || '_' || left(md5(region_name), 6);
+            columns text;
+        BEGIN
+            IF to_regclass(partition) IS NOT NULL THEN
+                RETURN partition;
+            END IF;
+
+            SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO columns
+            FROM pg_attribute
+            WHERE attrelid = 'parcels'::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+
+            CREATE TEMP TABLE parcel_partition_rows ON COMMIT DROP AS
+                SELECT * FROM parcels_default WHERE region = region_name;
+            DELETE FROM parcels_default WHERE region = region_name;
+
+            EXECUTE format('CREATE TABLE %I PARTITION OF parcels FOR VALUES IN (%L)', partition, region_name);
+            EXECUTE format('INSERT INTO %I (%s) SELECT %s FROM parcel_partition_rows', partition, columns, columns);
+            DROP TABLE parcel_partition_rows;
+
+            RETURN partition;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    partitioned = bind.execute(sa.text("SELECT relkind = 'p' FROM pg_class WHERE oid = 'parcels'::regclass")).scalar()
+    op.execute("""
+        INSERT INTO parcel_keys (id, parcel_id, region)
+        SELECT id, parcel_id, region FROM parcels
+        ON CONFLICT DO NOTHING
+    """)
+
+    if not partitioned:
+        _repoint_foreign_keys(bind, 'parcels', 'parcel_keys')
+
+        sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('parcels', 'id')")).scalar()
+        op.execute("ALTER TABLE parcels RENAME TO parcels_unpartitioned")
+        if sequence:
+            op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+
+        # Same columns, defaults (the id sequence) and generated search_vector
+        op.execute("""
+            CREATE TABLE parcels (
+                LIKE parcels_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE
+            ) PARTITION BY LIST (region)
+        """)
+        op.execute("CREATE TABLE parcels_default PARTITION OF parcels DEFAULT")
+        op.execute("SELECT add_parcel_region_partition(region) FROM (SELECT DISTINCT region FROM parcels_unpartitioned) r")
+
+        # Copied before any index or trigger exists on the new table
+        columns = _insertable_columns(bind, 'parcels_unpartitioned')
+        op.execute(f"INSERT INTO parcels ({columns}) SELECT {columns} FROM parcels_unpartitioned")
+        op.execute("DROP TABLE parcels_unpartitioned")
+        if sequence:
+            op.execute(f"ALTER SEQUENCE {sequence} OWNED BY parcels.id")
+    else:
+        # Created partitioned by create_all(); it only lacks partitions
+        op.execute("CREATE TABLE IF NOT EXISTS parcels_default PARTITION OF parcels DEFAULT")
+        op.execute("SELECT add_parcel_region_partition(region) FROM (SELECT DISTINCT region FROM parcels) r")
+
+    has_primary_key = bind.execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_constraint WHERE conrelid = 'parcels'::regclass AND contype = 'p')"
+    )).scalar()
+    if not has_primary_key:
+        op.execute("ALTER TABLE parcels ADD CONSTRAINT parcels_pkey PRIMARY KEY (id, region)")
+
+    # Indexes on the partitioned table are created on every partition,
+    # current and future
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_parcels_parcel_id ON parcels (parcel_id, region)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_parcels_id ON parcels (id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_parcels_region ON parcels (region)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_parcels_owner_name ON parcels (owner_name)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_parcels_geometry ON parcels USING gist (geometry)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_parcels_search_vector ON parcels USING gin (search_vector)")
+    for column in TRIGRAM_COLUMNS:
+        op.execute(f"CREATE INDEX IF NOT EXISTS idx_parcels_{column}_trgm ON parcels USING gin ({column} gin_trgm_ops)")
+
+    _create_triggers()
+    op.execute("ANALYZE parcels")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('parcels', 'id')")).scalar()
+    op.execute("ALTER TABLE parcels RENAME TO parcels_partitioned")
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE parcels (
+            LIKE parcels_partitioned INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE
+        )
+    """)
+    columns = _insertable_columns(bind, 'parcels_partitioned')
+    op.execute(f"INSERT INTO parcels ({columns}) SELECT {columns} FROM parcels_partitioned")
+    op.execute("DROP TABLE parcels_partitioned CASCADE")
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY parcels.id")
+
+    op.execute("ALTER TABLE parcels ADD CONSTRAINT parcels_pkey PRIMARY KEY (id)")
+    op.execute("CREATE UNIQUE INDEX ix_parcels_parcel_id ON parcels (parcel_id)")
+    op.execute("CREATE INDEX ix_parcels_id ON parcels (id)")
+    op.execute("CREATE INDEX ix_parcels_region ON parcels (region)")
+    op.execute("CREATE INDEX ix_parcels_owner_name ON parcels (owner_name)")
+    op.execute("CREATE INDEX idx_parcels_geometry ON parcels USING gist (geometry)")
+    op.execute("CREATE INDEX idx_parcels_search_vector ON parcels USING gin (search_vector)")
+    for column in TRIGRAM_COLUMNS:
+        op.execute(f"CREATE INDEX idx_parcels_{column}_trgm ON parcels USING gin ({column} gin_trgm_ops)")
+
+    _repoint_foreign_keys(bind, 'parcel_keys', 'parcels')
+    for name, definition in PARCEL_TRIGGERS:
+        if 'parcel_key' not in definition:
+            op.execute(f"CREATE TRIGGER {name} {definition}")
+
+    op.execute("DROP FUNCTION IF EXISTS add_parcel_region_partition(text)")
+    op.execute("DROP FUNCTION IF EXISTS release_parcel_keys()")
+    op.execute("DROP FUNCTION IF EXISTS sync_parcel_keys()")
+    op.execute("DROP FUNCTION IF EXISTS register_parcel_key()")
+    op.drop_table('parcel_keys')
@@ -0,0 +1,221 @@
+"""Initial schema
+
+Revision ID: 8c1e4a7f2b90
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1e4a7f2b90'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases created through create_all() or the Supabase migrations
+    # already have these tables; only create what is missing so they can
+    # be adopted by Alembic without a manual stamp.
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+
+    if 'parcels' not in existing:
+        op.create_table(
+            'parcels',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('parcel_id', sa.String(length=50), nullable=False),
+            sa.Column('geometry', geoalchemy2.Geometry('POLYGON', srid=4326, spatial_index=False), nullable=False),
+            sa.Column('region', sa.String(length=100), nullable=False),
+            sa.Column('district', sa.String(length=100)),
+            sa.Column('ward', sa.String(length=100)),
+            sa.Column('area_sqm', sa.Numeric(15, 2)),
+            sa.Column('perimeter_m', sa.Numeric(10, 2)),
+            sa.Column('owner_name', sa.String(length=255)),
+            sa.Column('owner_id', sa.String(length=50)),
+            sa.Column('address', sa.Text()),
+            sa.Column('land_use', sa.String(length=100)),
+            sa.Column('zoning', sa.String(length=50)),
+            sa.Column('valuation', sa.Numeric(15, 2)),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+        )
+        op.create_index('ix_parcels_id', 'parcels', ['id'])
+        op.create_index('ix_parcels_parcel_id', 'parcels', ['parcel_id'], unique=True)
+        op.create_index('ix_parcels_region', 'parcels', ['region'])
+        op.create_index('ix_parcels_owner_name', 'parcels', ['owner_name'])
+        op.create_index('idx_parcels_geometry', 'parcels', ['geometry'], postgresql_using='gist')
+
+    if 'shapefile_imports' not in existing:
+        op.create_table(
+            'shapefile_imports',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('filename', sa.String(length=255)),
+            sa.Column('upload_date', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('processed_date', sa.DateTime(timezone=True)),
+            sa.Column('status', sa.String(length=50)),
+            sa.Column('records_count', sa.Integer()),
+            sa.Column('error_log', sa.Text()),
+        )
+        op.create_index('ix_shapefile_imports_id', 'shapefile_imports', ['id'])
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('email', sa.String(length=255), nullable=False),
+            sa.Column('password_hash', sa.String(length=255), nullable=False),
+            sa.Column('first_name', sa.String(length=100)),
+            sa.Column('last_name', sa.String(length=100)),
+            sa.Column('phone', sa.String(length=20)),
+            sa.Column('role', sa.String(length=50)),
+            sa.Column('is_active', sa.Boolean()),
+            sa.Column('email_verified', sa.Boolean()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+            sa.Column('last_login', sa.DateTime(timezone=True)),
+        )
+        op.create_index('ix_users_id', 'users', ['id'])
+        op.create_index('ix_users_email', 'users', ['email'], unique=True)
+        op.create_index('ix_users_role', 'users', ['role'])
+
+    if 'user_roles' not in existing:
+        op.create_table(
+            'user_roles',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(length=50), nullable=False, unique=True),
+            sa.Column('description', sa.Text()),
+            sa.Column('permissions', sa.JSON()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        )
+        op.create_index('ix_user_roles_id', 'user_roles', ['id'])
+
+    if 'user_permissions' not in existing:
+        op.create_table(
+            'user_permissions',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column('permission', sa.String(length=100), nullable=False),
+            sa.Column('resource', sa.String(length=100)),
+            sa.Column('granted_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('granted_by', postgresql.UUID(as_uuid=True)),
+        )
+        op.create_index('ix_user_permissions_id', 'user_permissions', ['id'])
+        op.create_index('ix_user_permissions_user_id', 'user_permissions', ['user_id'])
+
+    if 'api_keys' not in existing:
+        op.create_table(
+            'api_keys',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('key_name', sa.String(length=255), nullable=False),
+            sa.Column('api_key', sa.String(length=255), nullable=False, unique=True),
+            sa.Column('secret_key', sa.String(length=255)),
+            sa.Column('website_domain', sa.String(length=255)),
+            sa.Column('permissions', sa.JSON()),
+            sa.Column('rate_limit', sa.Integer()),
+            sa.Column('is_active', sa.Boolean()),
+            sa.Column('created_by', postgresql.UUID(as_uuid=True)),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('last_used', sa.DateTime(timezone=True)),
+        )
+
+    if 'plot_listings' not in existing:
+        op.create_table(
+            'plot_listings',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('parcel_id', sa.Integer(), sa.ForeignKey('parcels.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('title', sa.String(length=255), nullable=False),
+            sa.Column('description', sa.Text()),
+            sa.Column('price', sa.Numeric(15, 2), nullable=False),
+            sa.Column('price_per_sqm', sa.Numeric(10, 2)),
+            sa.Column('status', sa.String(length=50)),
+            sa.Column('featured', sa.Boolean()),
+            sa.Column('amenities', sa.JSON()),
+            sa.Column('images', sa.JSON()),
+            sa.Column('contact_person', sa.String(length=255)),
+            sa.Column('contact_phone', sa.String(length=20)),
+            sa.Column('contact_email', sa.String(length=255)),
+            sa.Column('listed_by', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id')),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+        )
+        op.create_index('ix_plot_listings_id', 'plot_listings', ['id'])
+        op.create_index('ix_plot_listings_status', 'plot_listings', ['status'])
+        op.create_index('ix_plot_listings_featured', 'plot_listings', ['featured'])
+
+    if 'plot_inquiries' not in existing:
+        op.create_table(
+            'plot_inquiries',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('parcel_id', sa.Integer(), sa.ForeignKey('parcels.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('listing_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('plot_listings.id', ondelete='CASCADE')),
+            sa.Column('customer_name', sa.String(length=255), nullable=False),
+            sa.Column('customer_email', sa.String(length=255), nullable=False),
+            sa.Column('customer_phone', sa.String(length=20)),
+            sa.Column('message', sa.Text()),
+            sa.Column('inquiry_type', sa.String(length=50)),
+            sa.Column('status', sa.String(length=50)),
+            sa.Column('source_website', sa.String(length=255)),
+            sa.Column('referral_data', sa.JSON()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('responded_at', sa.DateTime(timezone=True)),
+            sa.Column('responded_by', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id')),
+        )
+        op.create_index('ix_plot_inquiries_id', 'plot_inquiries', ['id'])
+        op.create_index('ix_plot_inquiries_status', 'plot_inquiries', ['status'])
+
+    if 'shapefile_data' not in existing:
+        op.create_table(
+            'shapefile_data',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('original_name', sa.String(length=255)),
+            sa.Column('file_size', sa.Integer()),
+            sa.Column('file_type', sa.String(length=50)),
+            sa.Column('upload_date', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('uploaded_by', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id')),
+            sa.Column('processed', sa.Boolean()),
+            sa.Column('processing_status', sa.String(length=50)),
+            sa.Column('processing_log', sa.Text()),
+            sa.Column('metadata', sa.JSON()),
+            sa.Column('geometry_type', sa.String(length=50)),
+            sa.Column('coordinate_system', sa.String(length=100)),
+            sa.Column('feature_count', sa.Integer()),
+        )
+
+    if 'spatial_layers' not in existing:
+        op.create_table(
+            'spatial_layers',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('description', sa.Text()),
+            sa.Column('layer_type', sa.String(length=50)),
+            sa.Column('source_shapefile', postgresql.UUID(as_uuid=True), sa.ForeignKey('shapefile_data.id')),
+            sa.Column('geometry_column', sa.String(length=100)),
+            sa.Column('properties_schema', sa.JSON()),
+            sa.Column('style_config', sa.JSON()),
+            sa.Column('is_public', sa.Boolean()),
+            sa.Column('created_by', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id')),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('updated_at', sa.DateTime(timezone=True)),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('spatial_layers')
+    op.drop_table('shapefile_data')
+    op.drop_table('plot_inquiries')
+    op.drop_table('plot_listings')
+    op.drop_table('api_keys')
+    op.drop_table('user_permissions')
+    op.drop_table('user_roles')
+    op.drop_table('users')
+    op.drop_table('shapefile_imports')
+    op.drop_table('parcels')
@@ -0,0 +1,182 @@
+"""Region listing summary rollup
+
+Revision ID: a3d7e5c1f924
+Revises: 6e1c7b9a3d58
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d7e5c1f924'
+down_revision = '6e1c7b9a3d58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if 'region_listing_summaries' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'region_listing_summaries',
+            sa.Column('region', sa.String(length=100), primary_key=True),
+            sa.Column('available_plots', sa.Integer(), nullable=False),
+            sa.Column('min_price', sa.Numeric(15, 2)),
+            sa.Column('max_price', sa.Numeric(15, 2)),
+            sa.Column('avg_price', sa.Numeric()),
+            sa.Column('total_area_sqm', sa.Numeric()),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        )
+
+    # Recompute the given regions from the base tables. min/max cannot be
+    # maintained by deltas when a listing leaves a region, but one region's
+    # active listings are cheap to re-aggregate. Per-region advisory locks
+    # (taken in name order) make concurrent refreshes of a region run one
+    # after the other, so the later one sees the earlier one's writes.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION refresh_region_listing_summaries(regions text[]) RETURNS void AS $$
+        DECLARE
+            target text;
+        BEGIN
+            FOR target IN SELECT DISTINCT r FROM unnest(regions) r WHERE r IS NOT NULL ORDER BY 1 LOOP
+                PERFORM pg_advisory_xact_lock(hashtext('region_listing_summaries:' || target));
+            END LOOP;
+
+            DELETE FROM region_listing_summaries s
+            WHERE s.region = ANY(regions)
+            AND NOT EXISTS (
+                SELECT 1 FROM plot_listings l JOIN parcels p ON p.id = l.parcel_id
+                WHERE l.status = 'active' AND p.region = s.region
+            );
+
+            INSERT INTO region_listing_summaries
+                (region, available_plots, min_price, max_price, avg_price, total_area_sqm, updated_at)
+            SELECT p.region, count(*), min(l.price), max(l.price), avg(l.price), sum(p.area_sqm), now()
+            FROM plot_listings l
+            JOIN parcels p ON p.id = l.parcel_id
+            WHERE l.status = 'active' AND p.region = ANY(regions)
+            GROUP BY p.region
+            ON CONFLICT (region) DO UPDATE SET
+                available_plots = EXCLUDED.available_plots,
+                min_price = EXCLUDED.min_price,
+                max_price = EXCLUDED.max_price,
+                avg_price = EXCLUDED.avg_price,
+                total_area_sqm = EXCLUDED.total_area_sqm,
+                updated_at = EXCLUDED.updated_at;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Listing writes refresh the regions of the parcels they were and are on
+    op.execute("""
+        CREATE OR REPLACE FUNCTION plot_listings_refresh_region_summaries() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM refresh_region_listing_summaries(ARRAY(
+                    SELECT p.region FROM new_rows n JOIN parcels p ON p.id = n.parcel_id
+                ));
+            ELSIF TG_OP = 'UPDATE' THEN
+                PERFORM refresh_region_listing_summaries(ARRAY(
+                    SELECT p.region
+                    FROM new_rows n
+                    JOIN old_rows o ON o.id = n.id
+                    JOIN parcels p ON p.id IN (n.parcel_id, o.parcel_id)
+                    WHERE (n.status, n.price, n.parcel_id) IS DISTINCT FROM (o.status, o.price, o.parcel_id)
+                ));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM refresh_region_listing_summaries(ARRAY(
+                    SELECT p.region FROM old_rows o JOIN parcels p ON p.id = o.parcel_id
+                ));
+            ELSE
+                DELETE FROM region_listing_summaries;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Parcel writes matter only for listed parcels whose area or region
+    # changed, or that were deleted. This runs before parcels_release_keys
+    # cascades the delete to the listings; they are already excluded by the
+    # join with parcels, and by then the listing trigger can no longer see
+    # their region.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION parcels_refresh_region_summaries() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                PERFORM refresh_region_listing_summaries(ARRAY(
+                    SELECT unnest(ARRAY[n.region, o.region])
+                    FROM new_rows n
+                    JOIN old_rows o ON o.id = n.id
+                    WHERE (n.region, n.area_sqm) IS DISTINCT FROM (o.region, o.area_sqm)
+                    AND EXISTS (SELECT 1 FROM plot_listings l WHERE l.parcel_id = n.id)
+                ));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM refresh_region_listing_summaries(ARRAY(
+                    SELECT o.region FROM old_rows o
+                    WHERE EXISTS (SELECT 1 FROM plot_listings l WHERE l.parcel_id = o.id)
+                ));
+            ELSE
+                DELETE FROM region_listing_summaries;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    op.execute("""
+        CREATE TRIGGER plot_listings_region_summaries_insert
+            AFTER INSERT ON plot_listings
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION plot_listings_refresh_region_summaries()
+    """)
+    op.execute("""
+        CREATE TRIGGER plot_listings_region_summaries_update
+            AFTER UPDATE ON plot_listings
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION plot_listings_refresh_region_summaries()
+    """)
+    op.execute("""
+        CREATE TRIGGER plot_listings_region_summaries_delete
+            AFTER DELETE ON plot_listings
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION plot_listings_refresh_region_summaries()
+    """)
+    op.execute("""
+        CREATE TRIGGER plot_listings_region_summaries_truncate
+            AFTER TRUNCATE ON plot_listings
+            FOR EACH STATEMENT EXECUTE FUNCTION plot_listings_refresh_region_summaries()
+    """)
+    op.execute("""
+        CREATE TRIGGER parcels_region_summaries_update
+            AFTER UPDATE ON parcels
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION parcels_refresh_region_summaries()
+    """)
+
+    op.execute("""
+        CREATE TRIGGER parcels_region_summaries_delete
+            AFTER DELETE ON parcels
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION parcels_refresh_region_summaries()
+    """)
+    op.execute("""
+        CREATE TRIGGER parcels_region_summaries_truncate
+            AFTER TRUNCATE ON parcels
+            FOR EACH STATEMENT EXECUTE FUNCTION parcels_refresh_region_summaries()
+    """)
+
+    op.execute("SELECT refresh_region_listing_summaries(ARRAY(SELECT DISTINCT region FROM parcels))")
+
+
+def downgrade() -> None:
+    for event in ('update', 'delete', 'truncate'):
+        op.execute(f"DROP TRIGGER IF EXISTS parcels_region_summaries_{event} ON parcels")
+    for event in ('insert', 'update', 'delete', 'truncate'):
+        op.execute(f"DROP TRIGGER IF EXISTS plot_listings_region_summaries_{event} ON plot_listings")
+    op.execute("DROP FUNCTION IF EXISTS parcels_refresh_region_summaries()")
+    op.execute("DROP FUNCTION IF EXISTS plot_listings_refresh_region_summaries()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_region_listing_summaries(text[])")
+    op.drop_table('region_listing_summaries')
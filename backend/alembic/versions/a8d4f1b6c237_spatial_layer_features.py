@@ -0,0 +1,42 @@
+"""Feature storage for spatial layers
+
+Revision ID: a8d4f1b6c237
+Revises: 3f6a2c8d9e14
+Create Date: 2026-10-17 13:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d4f1b6c237'
+down_revision = '3f6a2c8d9e14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'spatial_layer_features' not in existing:
+        op.create_table(
+            'spatial_layer_features',
+            sa.Column('id', sa.BigInteger(), primary_key=True),
+            sa.Column('layer_id', postgresql.UUID(as_uuid=True),
+                      sa.ForeignKey('spatial_layers.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('geometry', geoalchemy2.types.Geometry(geometry_type='GEOMETRY', srid=4326,
+                                                             spatial_index=False), nullable=False),
+            sa.Column('properties', postgresql.JSONB()),
+        )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_spatial_layer_features_layer_id ON spatial_layer_features (layer_id)")
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_spatial_layer_features_geometry
+        ON spatial_layer_features USING gist (geometry)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('spatial_layer_features')
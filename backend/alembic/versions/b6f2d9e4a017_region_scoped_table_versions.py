@@ -0,0 +1,61 @@
+"""Derive table data versions from their per-region rows
+
+Revision ID: b6f2d9e4a017
+Revises: a3d7e5c1f924
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6f2d9e4a017'
+down_revision = 'a3d7e5c1f924'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Every write to parcels or plot_listings already bumps the rows of the
+    # regions it touched. Bumping the single table row as well made all
+    # writers of the table wait on that one row lock until commit. The
+    # table row is left at its last value; the table's version is now it
+    # plus the sum of its region rows (see DataVersionService).
+    op.execute("DROP TRIGGER IF EXISTS parcels_bump_data_version ON parcels")
+    op.execute("DROP TRIGGER IF EXISTS plot_listings_bump_data_version ON plot_listings")
+    op.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+
+
+def downgrade() -> None:
+    # Fold the region rows back into the table rows so versions keep growing
+    op.execute("""
+        UPDATE data_versions t
+        SET version = t.version + r.version, updated_at = now()
+        FROM (
+            SELECT split_part(name, ':region:', 1) AS name, sum(version) AS version
+            FROM data_versions
+            WHERE name LIKE '%:region:%'
+            GROUP BY 1
+        ) r
+        WHERE t.name = r.name
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO data_versions (name, version, updated_at)
+            VALUES (TG_TABLE_NAME, 1, now())
+            ON CONFLICT (name) DO UPDATE
+                SET version = data_versions.version + 1,
+                    updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in ('parcels', 'plot_listings'):
+        op.execute(f"""
+            CREATE TRIGGER {table}_bump_data_version
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()
+        """)
@@ -0,0 +1,40 @@
+"""Indexes matching the keyset pagination orderings
+
+Revision ID: b74c2e9a1f03
+Revises: 5a3f0d8e6b21
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = 'b74c2e9a1f03'
+down_revision = '5a3f0d8e6b21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ListingService.get_listings: status filter, then (featured, created_at, id) DESC
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_plot_listings_status_page
+        ON plot_listings (status, featured DESC, created_at DESC, id DESC)
+    """)
+    # ListingService.get_inquiries: optional status filter, then (created_at, id) DESC
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_plot_inquiries_page
+        ON plot_inquiries (created_at DESC, id DESC)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_plot_inquiries_status_page
+        ON plot_inquiries (status, created_at DESC, id DESC)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_plot_inquiries_status_page")
+    op.execute("DROP INDEX IF EXISTS idx_plot_inquiries_page")
+    op.execute("DROP INDEX IF EXISTS idx_plot_listings_status_page")
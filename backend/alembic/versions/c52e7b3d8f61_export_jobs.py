@@ -0,0 +1,44 @@
+"""Server-side parcel export jobs
+
+Revision ID: c52e7b3d8f61
+Revises: a8d4f1b6c237
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c52e7b3d8f61'
+down_revision = 'a8d4f1b6c237'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    if 'export_jobs' not in existing:
+        op.create_table(
+            'export_jobs',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('format', sa.String(length=20), nullable=False),
+            sa.Column('selection', sa.JSON(), nullable=False),
+            sa.Column('status', sa.String(length=50)),
+            sa.Column('feature_count', sa.Integer()),
+            sa.Column('processed_count', sa.Integer()),
+            sa.Column('filename', sa.String(length=255)),
+            sa.Column('file_size', sa.BigInteger()),
+            sa.Column('error', sa.Text()),
+            sa.Column('created_by', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id')),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+            sa.Column('completed_at', sa.DateTime(timezone=True)),
+        )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_export_jobs_status ON export_jobs (status)")
+
+
+def downgrade() -> None:
+    op.drop_table('export_jobs')
@@ -0,0 +1,296 @@
+"""Maintain the region listing rollup with deltas
+
+Revision ID: c8e3f1a5d6b2
+Revises: b6f2d9e4a017
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e3f1a5d6b2'
+down_revision = 'b6f2d9e4a017'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Running sums behind avg_price and total_area_sqm; sized_plots counts
+    # the listings whose parcel has an area, so the total can be NULL like sum()
+    op.add_column('region_listing_summaries', sa.Column('price_sum', sa.Numeric(), nullable=False, server_default='0'))
+    op.add_column('region_listing_summaries', sa.Column('sized_plots', sa.Integer(), nullable=False, server_default='0'))
+
+    # Active listings per (region, price): min/max after a listing leaves a
+    # region are one index lookup instead of a scan of the region
+    op.create_table(
+        'region_listing_prices',
+        sa.Column('region', sa.String(length=100), primary_key=True),
+        sa.Column('price', sa.Numeric(15, 2), primary_key=True),
+        sa.Column('listings', sa.Integer(), nullable=False),
+    )
+
+    # One active listing entering (sign 1) or leaving (sign -1) a region
+    op.execute("CREATE TYPE region_listing_delta AS (region text, price numeric, area_sqm numeric, sign integer)")
+
+    # Apply a statement's deltas. Cost is proportional to the rows the
+    # statement changed, not to the listings in their regions; rows are
+    # upserted in key order so concurrent writers lock them in the same order.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION adjust_region_listing_summaries(deltas region_listing_delta[]) RETURNS void AS $$
+        BEGIN
+            IF cardinality(deltas) = 0 THEN
+                RETURN;
+            END IF;
+
+            INSERT INTO region_listing_prices AS r (region, price, listings)
+            SELECT d.region, d.price, sum(d.sign)
+            FROM unnest(deltas) d
+            WHERE d.region IS NOT NULL
+            GROUP BY d.region, d.price
+            HAVING sum(d.sign) <> 0
+            ORDER BY d.region, d.price
+            ON CONFLICT (region, price) DO UPDATE SET listings = r.listings + EXCLUDED.listings;
+
+            DELETE FROM region_listing_prices r
+            USING (SELECT DISTINCT region, price FROM unnest(deltas)) d
+            WHERE r.region = d.region AND r.price = d.price AND r.listings <= 0;
+
+            INSERT INTO region_listing_summaries AS s
+                (region, available_plots, price_sum, sized_plots, total_area_sqm, updated_at)
+            SELECT
+                d.region,
+                sum(d.sign),
+                sum(d.sign * d.price),
+                count(d.area_sqm) FILTER (WHERE d.sign > 0) - count(d.area_sqm) FILTER (WHERE d.sign < 0),
+                COALESCE(sum(d.sign * d.area_sqm), 0),
+                now()
+            FROM unnest(deltas) d
+            WHERE d.region IS NOT NULL
+            GROUP BY d.region
+            ORDER BY d.region
+            ON CONFLICT (region) DO UPDATE SET
+                available_plots = s.available_plots + EXCLUDED.available_plots,
+                price_sum = s.price_sum + EXCLUDED.price_sum,
+                sized_plots = s.sized_plots + EXCLUDED.sized_plots,
+                total_area_sqm = COALESCE(s.total_area_sqm, 0) + EXCLUDED.total_area_sqm;
+
+            UPDATE region_listing_summaries s SET
+                min_price = (SELECT min(r.price) FROM region_listing_prices r WHERE r.region = s.region),
+                max_price = (SELECT max(r.price) FROM region_listing_prices r WHERE r.region = s.region),
+                avg_price = CASE WHEN s.available_plots > 0 THEN s.price_sum / s.available_plots END,
+                total_area_sqm = CASE WHEN s.sized_plots > 0 THEN s.total_area_sqm END,
+                updated_at = now()
+            WHERE s.region IN (SELECT region FROM unnest(deltas));
+
+            DELETE FROM region_listing_summaries s
+            WHERE s.available_plots <= 0 AND s.region IN (SELECT region FROM unnest(deltas));
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Full recompute of some regions, for the migration and
+    # scripts/rebuild_region_summaries.py only. The table locks wait for
+    # writers whose deltas are in flight and hold off new ones, so the
+    # aggregate and later deltas never overlap.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION refresh_region_listing_summaries(regions text[]) RETURNS void AS $$
+        BEGIN
+            LOCK TABLE region_listing_prices, region_listing_summaries IN SHARE ROW EXCLUSIVE MODE;
+
+            DELETE FROM region_listing_prices WHERE region = ANY(regions);
+            DELETE FROM region_listing_summaries WHERE region = ANY(regions);
+
+            INSERT INTO region_listing_prices (region, price, listings)
+            SELECT p.region, l.price, count(*)
+            FROM plot_listings l
+            JOIN parcels p ON p.id = l.parcel_id
+            WHERE l.status = 'active' AND p.region = ANY(regions)
+            GROUP BY p.region, l.price;
+
+            INSERT INTO region_listing_summaries
+                (region, available_plots, min_price, max_price, avg_price, price_sum, sized_plots, total_area_sqm, updated_at)
+            SELECT p.region, count(*), min(l.price), max(l.price), avg(l.price), sum(l.price),
+                   count(p.area_sqm), sum(p.area_sqm), now()
+            FROM plot_listings l
+            JOIN parcels p ON p.id = l.parcel_id
+            WHERE l.status = 'active' AND p.region = ANY(regions)
+            GROUP BY p.region;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Listing writes move active listings in and out of the regions of
+    # their parcels; updates that keep status, price and parcel are skipped
+    op.execute("""
+        CREATE OR REPLACE FUNCTION plot_listings_refresh_region_summaries() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM adjust_region_listing_summaries(ARRAY(
+                    SELECT ROW(p.region, n.price, p.area_sqm, 1)::region_listing_delta
+                    FROM new_rows n JOIN parcels p ON p.id = n.parcel_id
+                    WHERE n.status = 'active'
+                ));
+            ELSIF TG_OP = 'UPDATE' THEN
+                PERFORM adjust_region_listing_summaries(ARRAY(
+                    SELECT ROW(p.region, o.price, p.area_sqm, -1)::region_listing_delta
+                    FROM old_rows o
+                    JOIN new_rows n ON n.id = o.id
+                    JOIN parcels p ON p.id = o.parcel_id
+                    WHERE o.status = 'active'
+                    AND (n.status, n.price, n.parcel_id) IS DISTINCT FROM (o.status, o.price, o.parcel_id)
+                    UNION ALL
+                    SELECT ROW(p.region, n.price, p.area_sqm, 1)::region_listing_delta
+                    FROM new_rows n
+                    JOIN old_rows o ON o.id = n.id
+                    JOIN parcels p ON p.id = n.parcel_id
+                    WHERE n.status = 'active'
+                    AND (n.status, n.price, n.parcel_id) IS DISTINCT FROM (o.status, o.price, o.parcel_id)
+                ));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM adjust_region_listing_summaries(ARRAY(
+                    SELECT ROW(p.region, o.price, p.area_sqm, -1)::region_listing_delta
+                    FROM old_rows o JOIN parcels p ON p.id = o.parcel_id
+                    WHERE o.status = 'active'
+                ));
+            ELSE
+                DELETE FROM region_listing_prices;
+                DELETE FROM region_listing_summaries;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Parcel writes move the active listings of parcels whose area or region
+    # changed, or that were deleted. This runs before parcels_release_keys
+    # cascades the delete to the listings, whose own trigger then no longer
+    # finds the parcel and so does not subtract them a second time.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION parcels_refresh_region_summaries() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                PERFORM adjust_region_listing_summaries(ARRAY(
+                    SELECT ROW(o.region, l.price, o.area_sqm, -1)::region_listing_delta
+                    FROM old_rows o
+                    JOIN new_rows n ON n.id = o.id
+                    JOIN plot_listings l ON l.parcel_id = o.id
+                    WHERE l.status = 'active'
+                    AND (n.region, n.area_sqm) IS DISTINCT FROM (o.region, o.area_sqm)
+                    UNION ALL
+                    SELECT ROW(n.region, l.price, n.area_sqm, 1)::region_listing_delta
+                    FROM new_rows n
+                    JOIN old_rows o ON o.id = n.id
+                    JOIN plot_listings l ON l.parcel_id = n.id
+                    WHERE l.status = 'active'
+                    AND (n.region, n.area_sqm) IS DISTINCT FROM (o.region, o.area_sqm)
+                ));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM adjust_region_listing_summaries(ARRAY(
+                    SELECT ROW(o.region, l.price, o.area_sqm, -1)::region_listing_delta
+                    FROM old_rows o JOIN plot_listings l ON l.parcel_id = o.id
+                    WHERE l.status = 'active'
+                ));
+            ELSE
+                DELETE FROM region_listing_prices;
+                DELETE FROM region_listing_summaries;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    op.execute("SELECT refresh_region_listing_summaries(ARRAY(SELECT DISTINCT region FROM parcels))")
+
+
+def downgrade() -> None:
+    # The full per-region recompute of a3d7e5c1f924
+    op.execute("""
+        CREATE OR REPLACE FUNCTION refresh_region_listing_summaries(regions text[]) RETURNS void AS $$
+        DECLARE
+            target text;
+        BEGIN
+            FOR target IN SELECT DISTINCT r FROM unnest(regions) r WHERE r IS NOT NULL ORDER BY 1 LOOP
+                PERFORM pg_advisory_xact_lock(hashtext('region_listing_summaries:' || target));
+            END LOOP;
+
+            DELETE FROM region_listing_summaries s
+            WHERE s.region = ANY(regions)
+            AND NOT EXISTS (
+                SELECT 1 FROM plot_listings l JOIN parcels p ON p.id = l.parcel_id
+                WHERE l.status = 'active' AND p.region = s.region
+            );
+
+            INSERT INTO region_listing_summaries
+                (region, available_plots, min_price, max_price, avg_price, total_area_sqm, updated_at)
+            SELECT p.region, count(*), min(l.price), max(l.price), avg(l.price), sum(p.area_sqm), now()
+            FROM plot_listings l
+            JOIN parcels p ON p.id = l.parcel_id
+            WHERE l.status = 'active' AND p.region = ANY(regions)
+            GROUP BY p.region
+            ON CONFLICT (region) DO UPDATE SET
+                available_plots = EXCLUDED.available_plots,
+                min_price = EXCLUDED.min_price,
+                max_price = EXCLUDED.max_price,
+                avg_price = EXCLUDED.avg_price,
+                total_area_sqm = EXCLUDED.total_area_sqm,
+                updated_at = EXCLUDED.updated_at;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION plot_listings_refresh_region_summaries() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM refresh_region_listing_summaries(ARRAY(
+                    SELECT p.region FROM new_rows n JOIN parcels p ON p.id = n.parcel_id
+                ));
+            ELSIF TG_OP = 'UPDATE' THEN
+                PERFORM refresh_region_listing_summaries(ARRAY(
+                    SELECT p.region
+                    FROM new_rows n
+                    JOIN old_rows o ON o.id = n.id
+                    JOIN parcels p ON p.id IN (n.parcel_id, o.parcel_id)
+                    WHERE (n.status, n.price, n.parcel_id) IS DISTINCT FROM (o.status, o.price, o.parcel_id)
+                ));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM refresh_region_listing_summaries(ARRAY(
+                    SELECT p.region FROM old_rows o JOIN parcels p ON p.id = o.parcel_id
+                ));
+            ELSE
+                DELETE FROM region_listing_summaries;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION parcels_refresh_region_summaries() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                PERFORM refresh_region_listing_summaries(ARRAY(
+                    SELECT unnest(ARRAY[n.region, o.region])
+                    FROM new_rows n
+                    JOIN old_rows o ON o.id = n.id
+                    WHERE (n.region, n.area_sqm) IS DISTINCT FROM (o.region, o.area_sqm)
+                    AND EXISTS (SELECT 1 FROM plot_listings l WHERE l.parcel_id = n.id)
+                ));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM refresh_region_listing_summaries(ARRAY(
+                    SELECT o.region FROM old_rows o
+                    WHERE EXISTS (SELECT 1 FROM plot_listings l WHERE l.parcel_id = o.id)
+                ));
+            ELSE
+                DELETE FROM region_listing_summaries;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("DROP FUNCTION IF EXISTS adjust_region_listing_summaries(region_listing_delta[])")
+    op.execute("DROP TYPE IF EXISTS region_listing_delta")
+    op.drop_table('region_listing_prices')
+    op.drop_column('region_listing_summaries', 'sized_plots')
+    op.drop_column('region_listing_summaries', 'price_sum')
@@ -0,0 +1,64 @@
+"""Generalize parcel geometry by snapping to a grid
+
+Revision ID: d2a6f4b9c371
+Revises: c8e3f1a5d6b2
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a6f4b9c371'
+down_revision = 'c8e3f1a5d6b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ST_SimplifyPreserveTopology works on one parcel at a time, so the
+    # boundary two neighbours share was simplified differently on each side,
+    # leaving gaps and slivers at low zoom. Snapping to a fixed grid moves a
+    # shared vertex to the same point in both parcels, and dropping the
+    # repeated points it leaves behind removes the detail. Parcels smaller
+    # than a grid cell collapse; they keep their full geometry.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION snap_parcel_geometry(geom geometry, grid float8) RETURNS geometry AS $$
+            SELECT CASE WHEN ST_IsEmpty(snapped) OR ST_Area(snapped) = 0 THEN geom ELSE snapped END
+            FROM (SELECT ST_RemoveRepeatedPoints(ST_SnapToGrid(geom, grid)) AS snapped) s
+        $$ LANGUAGE sql IMMUTABLE STRICT
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION generalize_parcel_geometry() RETURNS trigger AS $$
+        BEGIN
+            NEW.geometry_lod1 := snap_parcel_geometry(NEW.geometry, 0.0001);
+            NEW.geometry_lod2 := snap_parcel_geometry(NEW.geometry, 0.0005);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        UPDATE parcels SET
+            geometry_lod1 = snap_parcel_geometry(geometry, 0.0001),
+            geometry_lod2 = snap_parcel_geometry(geometry, 0.0005)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION generalize_parcel_geometry() RETURNS trigger AS $$
+        BEGIN
+            NEW.geometry_lod1 := ST_SimplifyPreserveTopology(NEW.geometry, 0.0001);
+            NEW.geometry_lod2 := ST_SimplifyPreserveTopology(NEW.geometry, 0.0005);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        UPDATE parcels SET
+            geometry_lod1 = ST_SimplifyPreserveTopology(geometry, 0.0001),
+            geometry_lod2 = ST_SimplifyPreserveTopology(geometry, 0.0005)
+    """)
+    op.execute("DROP FUNCTION IF EXISTS snap_parcel_geometry(geometry, float8)")
@@ -0,0 +1,114 @@
+"""Precomputed parcel adjacency
+
+Revision ID: d93a6e4f2c18
+Revises: c52e7b3d8f61
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = 'd93a6e4f2c18'
+down_revision = 'c52e7b3d8f61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = sa.inspect(op.get_bind()).get_table_names()
+
+    # Both directions are stored so a lookup is a primary key range scan
+    if 'parcel_neighbors' not in existing:
+        op.create_table(
+            'parcel_neighbors',
+            sa.Column('parcel_id', sa.Integer(), sa.ForeignKey('parcels.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('neighbor_id', sa.Integer(), sa.ForeignKey('parcels.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('shared_length_m', sa.Float(), nullable=False),
+        )
+    op.execute("CREATE INDEX IF NOT EXISTS ix_parcel_neighbors_neighbor_id ON parcel_neighbors (neighbor_id)")
+
+    # Parcels touching or intersecting the given ones, with the length of
+    # boundary they share (0 for parcels meeting at a corner)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION upsert_parcel_neighbors(ids integer[]) RETURNS void AS $$
+            WITH pairs AS (
+                SELECT
+                    a.id AS a_id,
+                    b.id AS b_id,
+                    ST_Length(ST_CollectionExtract(
+                        ST_Intersection(ST_Boundary(a.geometry), ST_Boundary(b.geometry)), 2
+                    )::geography) AS shared_length_m
+                FROM parcels a
+                JOIN parcels b
+                    ON b.geometry && a.geometry
+                    AND b.id <> a.id
+                    AND ST_Intersects(a.geometry, b.geometry)
+                WHERE a.id = ANY(ids)
+            ),
+            both_ways AS (
+                SELECT a_id AS parcel_id, b_id AS neighbor_id, shared_length_m FROM pairs
+                UNION ALL
+                SELECT b_id, a_id, shared_length_m FROM pairs
+            )
+            INSERT INTO parcel_neighbors (parcel_id, neighbor_id, shared_length_m)
+            SELECT DISTINCT ON (parcel_id, neighbor_id) parcel_id, neighbor_id, shared_length_m
+            FROM both_ways
+            ON CONFLICT (parcel_id, neighbor_id) DO UPDATE SET shared_length_m = EXCLUDED.shared_length_m
+        $$ LANGUAGE sql
+    """)
+
+    # Statement-level triggers with transition tables, so bulk imports do
+    # one set-based join per statement; deletes are handled by the FKs
+    op.execute("""
+        CREATE OR REPLACE FUNCTION parcel_neighbors_after_insert() RETURNS trigger AS $$
+        BEGIN
+            PERFORM upsert_parcel_neighbors(ARRAY(SELECT id FROM new_rows));
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION parcel_neighbors_after_update() RETURNS trigger AS $$
+        DECLARE
+            changed integer[];
+        BEGIN
+            changed := ARRAY(
+                SELECT n.id
+                FROM new_rows n
+                JOIN old_rows o ON o.id = n.id
+                WHERE NOT ST_OrderingEquals(n.geometry, o.geometry)
+            );
+            IF cardinality(changed) > 0 THEN
+                DELETE FROM parcel_neighbors WHERE parcel_id = ANY(changed) OR neighbor_id = ANY(changed);
+                PERFORM upsert_parcel_neighbors(changed);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER parcels_neighbors_insert
+            AFTER INSERT ON parcels
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION parcel_neighbors_after_insert()
+    """)
+    op.execute("""
+        CREATE TRIGGER parcels_neighbors_update
+            AFTER UPDATE ON parcels
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION parcel_neighbors_after_update()
+    """)
+
+    op.execute("SELECT upsert_parcel_neighbors(ARRAY(SELECT id FROM parcels))")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS parcels_neighbors_update ON parcels")
+    op.execute("DROP TRIGGER IF EXISTS parcels_neighbors_insert ON parcels")
+    op.execute("DROP FUNCTION IF EXISTS parcel_neighbors_after_update()")
+    op.execute("DROP FUNCTION IF EXISTS parcel_neighbors_after_insert()")
+    op.execute("DROP FUNCTION IF EXISTS upsert_parcel_neighbors(integer[])")
+    op.drop_table('parcel_neighbors')
@@ -0,0 +1,55 @@
+"""Trigram and full-text parcel search
+
+Revision ID: e19d5b7c3a42
+Revises: b74c2e9a1f03
+Create Date: 2026-10-17 11:45:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = 'e19d5b7c3a42'
+down_revision = 'b74c2e9a1f03'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_COLUMNS = ['parcel_id', 'owner_name', 'address', 'land_use', 'region']
+
+# Same expression as PARCEL_SEARCH_VECTOR in app/models/parcel.py
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(parcel_id, '') || ' ' || coalesce(owner_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(address, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(region, '') || ' ' || coalesce(district, '') || ' ' || coalesce(ward, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(land_use, '') || ' ' || coalesce(zoning, '')), 'D')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for column in TRIGRAM_COLUMNS:
+        op.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_parcels_{column}_trgm
+            ON parcels USING gin ({column} gin_trgm_ops)
+        """)
+
+    # Stored generated column: maintained by Postgres on every insert and
+    # update. Adding it rewrites the table once.
+    op.execute(f"""
+        ALTER TABLE parcels ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_parcels_search_vector
+        ON parcels USING gin (search_vector)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_parcels_search_vector")
+    op.drop_column('parcels', 'search_vector')
+    for column in TRIGRAM_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS idx_parcels_{column}_trgm")
@@ -0,0 +1,35 @@
+"""Make the listing and inquiry keyset columns NOT NULL
+
+Revision ID: e7b3c5a9f216
+Revises: d2a6f4b9c371
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3c5a9f216'
+down_revision = 'd2a6f4b9c371'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The keyset predicates compare (featured, created_at, id) as a row; a
+    # NULL in either column makes the comparison NULL and the row was never
+    # returned after the first page.
+    op.execute("UPDATE plot_listings SET featured = false WHERE featured IS NULL")
+    op.execute("UPDATE plot_listings SET created_at = coalesce(updated_at, now()) WHERE created_at IS NULL")
+    op.execute("UPDATE plot_inquiries SET created_at = now() WHERE created_at IS NULL")
+    op.alter_column('plot_listings', 'featured', nullable=False, server_default=sa.text('false'))
+    op.alter_column('plot_listings', 'created_at', nullable=False)
+    op.alter_column('plot_inquiries', 'created_at', nullable=False)
+
+
+def downgrade() -> None:
+    op.alter_column('plot_inquiries', 'created_at', nullable=True)
+    op.alter_column('plot_listings', 'created_at', nullable=True)
+    op.alter_column('plot_listings', 'featured', nullable=True, server_default=None)
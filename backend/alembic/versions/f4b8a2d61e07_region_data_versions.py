@@ -0,0 +1,140 @@
+"""Per-region data versions for parcels and listings
+
+Revision ID: f4b8a2d61e07
+Revises: d93a6e4f2c18
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b8a2d61e07'
+down_revision = 'd93a6e4f2c18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One data_versions row per (table, region), named <table>:region:<region>.
+    # Regions are bumped in name order so concurrent writers lock the rows
+    # in the same order.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_region_data_versions(table_name text, regions text[]) RETURNS void AS $$
+            INSERT INTO data_versions (name, version, updated_at)
+            SELECT table_name || ':region:' || region, 1, now()
+            FROM (SELECT DISTINCT unnest(regions) AS region) r
+            WHERE region IS NOT NULL
+            ORDER BY region
+            ON CONFLICT (name) DO UPDATE
+                SET version = data_versions.version + 1,
+                    updated_at = now()
+        $$ LANGUAGE sql
+    """)
+
+    # Transition tables give the regions a whole statement touched; a
+    # TRUNCATE has none, so it bumps every region of the table
+    op.execute("""
+        CREATE OR REPLACE FUNCTION parcels_bump_region_versions() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM bump_region_data_versions('parcels', ARRAY(SELECT region FROM new_rows));
+            ELSIF TG_OP = 'UPDATE' THEN
+                PERFORM bump_region_data_versions('parcels', ARRAY(
+                    SELECT region FROM new_rows UNION SELECT region FROM old_rows
+                ));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM bump_region_data_versions('parcels', ARRAY(SELECT region FROM old_rows));
+            ELSE
+                UPDATE data_versions SET version = version + 1, updated_at = now()
+                WHERE name LIKE 'parcels:region:%';
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Listings have no region of their own; it comes from their parcel
+    op.execute("""
+        CREATE OR REPLACE FUNCTION plot_listings_bump_region_versions() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM bump_region_data_versions('plot_listings', ARRAY(
+                    SELECT p.region FROM new_rows n JOIN parcels p ON p.id = n.parcel_id
+                ));
+            ELSIF TG_OP = 'UPDATE' THEN
+                PERFORM bump_region_data_versions('plot_listings', ARRAY(
+                    SELECT p.region FROM new_rows n JOIN parcels p ON p.id = n.parcel_id
+                    UNION
+                    SELECT p.region FROM old_rows o JOIN parcels p ON p.id = o.parcel_id
+                ));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM bump_region_data_versions('plot_listings', ARRAY(
+                    SELECT p.region FROM old_rows o JOIN parcels p ON p.id = o.parcel_id
+                ));
+            ELSE
+                UPDATE data_versions SET version = version + 1, updated_at = now()
+                WHERE name LIKE 'plot_listings:region:%';
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Triggers with transition tables may only have one event each
+    for table in ('parcels', 'plot_listings'):
+        op.execute(f"""
+            CREATE TRIGGER {table}_region_versions_insert
+                AFTER INSERT ON {table}
+                REFERENCING NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION {table}_bump_region_versions()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_region_versions_update
+                AFTER UPDATE ON {table}
+                REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION {table}_bump_region_versions()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_region_versions_delete
+                AFTER DELETE ON {table}
+                REFERENCING OLD TABLE AS old_rows
+                FOR EACH STATEMENT EXECUTE FUNCTION {table}_bump_region_versions()
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_region_versions_truncate
+                AFTER TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION {table}_bump_region_versions()
+        """)
+
+    op.execute("""
+        CREATE TRIGGER plot_listings_bump_data_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON plot_listings
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()
+    """)
+
+    op.execute("INSERT INTO data_versions (name, version) VALUES ('plot_listings', 1) ON CONFLICT DO NOTHING")
+    op.execute("""
+        INSERT INTO data_versions (name, version)
+        SELECT DISTINCT 'parcels:region:' || region, 1 FROM parcels WHERE region IS NOT NULL
+        ON CONFLICT DO NOTHING
+    """)
+    op.execute("""
+        INSERT INTO data_versions (name, version)
+        SELECT DISTINCT 'plot_listings:region:' || p.region, 1
+        FROM plot_listings l JOIN parcels p ON p.id = l.parcel_id
+        WHERE p.region IS NOT NULL
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS plot_listings_bump_data_version ON plot_listings")
+    for table in ('parcels', 'plot_listings'):
+        for event in ('insert', 'update', 'delete', 'truncate'):
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_region_versions_{event} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_bump_region_versions()")
+    op.execute("DROP FUNCTION IF EXISTS bump_region_data_versions(text, text[])")
+    op.execute("DELETE FROM data_versions WHERE name = 'plot_listings' OR name LIKE '%:region:%'")
@@ -0,0 +1,118 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import os
+import re
+import uuid
+
+from app.core.conditional import is_not_modified, validator_headers
+from app.core.database import get_async_db
+from app.models.user import User
+from app.schemas.export import ExportJobCreate, ExportJobResponse
+from app.services.export_service import (
+    ExportService, EXPORT_EXTENSIONS, EXPORT_MEDIA_TYPES, export_file_path, read_export_range, run_export
+)
+from app.api.auth import get_current_active_user
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+async def get_own_job(job_id: uuid.UUID, current_user: User, db: AsyncSession):
+    job = await db.run_sync(lambda session: ExportService(session).get_job(job_id))
+    if not job or (job.created_by != current_user.id and current_user.role != 'admin'):
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
+
+@router.post("/", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_export(
+    job_data: ExportJobCreate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Start exporting a region, bbox or search result; poll GET /exports/{job_id} for progress"""
+    try:
+        job = await db.run_sync(lambda session: ExportService(session).create_job(job_data, current_user.id))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    background_tasks.add_task(run_export, job.id)
+    return job
+
+@router.get("/", response_model=List[ExportJobResponse])
+async def get_exports(
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the current user's export jobs"""
+    return await db.run_sync(lambda session: ExportService(session).get_jobs(current_user.id))
+
+@router.get("/{job_id}", response_model=ExportJobResponse)
+async def get_export(
+    job_id: uuid.UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get export status and progress"""
+    return await get_own_job(job_id, current_user, db)
+
+@router.get("/{job_id}/download")
+async def download_export(
+    job_id: uuid.UUID,
+    request: Request,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Download a finished export; supports Range requests so interrupted downloads can resume"""
+    job = await get_own_job(job_id, current_user, db)
+    if job.status != "completed" or not os.path.exists(export_file_path(job)):
+        raise HTTPException(status_code=409, detail="Export is not ready")
+
+    size = job.file_size
+    # A finished export never changes, so its id and size identify the file
+    etag = f'"export-{job.id}-{size}"'
+    headers = validator_headers(etag, job.completed_at, cache_control="private, no-cache")
+    if is_not_modified(request, etag, job.completed_at):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    headers.update({
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="parcels-{job.id}{EXPORT_EXTENSIONS[job.format]}"',
+    })
+    media_type = EXPORT_MEDIA_TYPES[job.format]
+
+    # A Range for a different file than the one the client holds is ignored
+    # and the whole file sent instead (RFC 9110 13.1.5)
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() not in (etag, headers.get("Last-Modified")):
+        range_header = None
+
+    if not range_header:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(read_export_range(job, 0, size - 1), media_type=media_type, headers=headers)
+
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        raise HTTPException(status_code=416, detail="Invalid range", headers={"Content-Range": f"bytes */{size}"})
+
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        read_export_range(job, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers
+    )
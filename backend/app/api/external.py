@@ -1,25 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import uuid
 
-from app.core.database import get_db
+from app.core.conditional import is_not_modified, make_etag, validator_headers
+from app.core.database import get_async_db
 from app.models.listing import ApiKey
 from app.schemas.listing import PlotListingResponse, PlotInquiryCreate, PlotInquiryResponse
+from app.services.data_version_service import DataVersionService
 from app.services.listing_service import ListingService
 from app.services.external_service import ExternalApiService
+from app.api.listings import serialize_listings
 
 router = APIRouter(prefix="/external", tags=["external-api"])
 
-def verify_api_key(
+async def verify_api_key(
     x_api_key: str = Header(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ApiKey:
     """Verify API key for external access"""
-    api_key = db.query(ApiKey).filter(
+    api_key = (await db.execute(select(ApiKey).where(
         ApiKey.api_key == x_api_key,
         ApiKey.is_active == True
-    ).first()
+    ))).scalars().first()
     
     if not api_key:
         raise HTTPException(status_code=401, detail="Invalid API key")
@@ -27,12 +31,13 @@ def verify_api_key(
     # Update last used timestamp
     from datetime import datetime
     api_key.last_used = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     return api_key
 
 @router.get("/plots", response_model=List[PlotListingResponse])
 async def get_available_plots(
+    response: Response,
     region: Optional[str] = Query(None, description="Filter by region"),
     min_price: Optional[float] = Query(None, description="Minimum price filter"),
     max_price: Optional[float] = Query(None, description="Maximum price filter"),
@@ -40,39 +45,52 @@ async def get_available_plots(
     max_area: Optional[float] = Query(None, description="Maximum area in sqm"),
     featured_only: bool = Query(False, description="Show only featured plots"),
     limit: int = Query(20, le=50, description="Maximum number of results"),
-    offset: int = Query(0, description="Pagination offset"),
+    offset: int = Query(0, description="Pagination offset (deprecated, use cursor)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
     api_key: ApiKey = Depends(verify_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get available plots for external websites
     
     This endpoint allows external real estate websites to fetch available land plots
-    with various filtering options. Requires valid API key.
+    with various filtering options. Requires valid API key. When more plots are
+    available, the cursor for the next page is returned in the X-Next-Cursor header.
     """
-    service = ListingService(db)
-    
     # Check API key permissions
     if "read" not in api_key.permissions:
         raise HTTPException(status_code=403, detail="API key does not have read permissions")
     
-    return service.get_listings(
-        region=region,
-        status="active",
-        featured=featured_only if featured_only else None,
-        min_price=min_price,
-        max_price=max_price,
-        min_area=min_area,
-        max_area=max_area,
-        limit=limit,
-        offset=offset
-    )
+    def load(session):
+        service = ListingService(session)
+        listings = service.get_listings(
+            region=region,
+            status="active",
+            featured=featured_only if featured_only else None,
+            min_price=min_price,
+            max_price=max_price,
+            min_area=min_area,
+            max_area=max_area,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+        return serialize_listings(listings), service.listing_cursor(listings, limit)
+    
+    try:
+        listings, next_cursor = await db.run_sync(load)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return listings
 
 @router.get("/plots/{listing_id}", response_model=PlotListingResponse)
 async def get_plot_details(
     listing_id: uuid.UUID,
     api_key: ApiKey = Depends(verify_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get detailed information about a specific plot
@@ -83,8 +101,11 @@ async def get_plot_details(
     if "read" not in api_key.permissions:
         raise HTTPException(status_code=403, detail="API key does not have read permissions")
     
-    service = ListingService(db)
-    listing = service.get_listing_by_id(listing_id)
+    def load(session):
+        listing = ListingService(session).get_listing_by_id(listing_id)
+        return PlotListingResponse.model_validate(listing) if listing else None
+    
+    listing = await db.run_sync(load)
     
     if not listing:
         raise HTTPException(status_code=404, detail="Plot not found")
@@ -99,7 +120,7 @@ async def submit_plot_inquiry(
     inquiry_data: PlotInquiryCreate,
     source_website: str = Header(..., alias="X-Source-Website"),
     api_key: ApiKey = Depends(verify_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Submit customer inquiry for a plot
@@ -118,31 +139,41 @@ async def submit_plot_inquiry(
         "website_domain": api_key.website_domain
     }
     
-    service = ListingService(db)
-    return service.create_inquiry(inquiry_data)
+    return await db.run_sync(lambda session: ListingService(session).create_inquiry(inquiry_data))
 
 @router.get("/regions")
 async def get_available_regions(
+    request: Request,
+    response: Response,
     api_key: ApiKey = Depends(verify_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get list of available regions with plot counts
     
     Returns regions where plots are available for sale,
-    along with basic statistics.
+    along with basic statistics. Send the returned ETag in
+    If-None-Match to get 304 Not Modified while nothing changed.
     """
     if "read" not in api_key.permissions:
         raise HTTPException(status_code=403, detail="API key does not have read permissions")
     
-    service = ExternalApiService(db)
-    return service.get_regions_summary()
+    versions, last_modified = await db.run_sync(
+        lambda session: DataVersionService(session).get_versions(["plot_listings", "parcels"])
+    )
+    etag = make_etag(request, versions)
+    headers = validator_headers(etag, last_modified, cache_control="private, no-cache")
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    
+    return await db.run_sync(lambda session: ExternalApiService(session).get_regions_summary())
 
 @router.get("/stats")
 async def get_plot_statistics(
     region: Optional[str] = Query(None),
     api_key: ApiKey = Depends(verify_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get plot statistics for integration
@@ -153,15 +184,14 @@ async def get_plot_statistics(
     if "read" not in api_key.permissions:
         raise HTTPException(status_code=403, detail="API key does not have read permissions")
     
-    service = ExternalApiService(db)
-    return service.get_plot_statistics(region)
+    return await db.run_sync(lambda session: ExternalApiService(session).get_plot_statistics(region))
 
 @router.post("/webhook/plot-viewed")
 async def track_plot_view(
     listing_id: uuid.UUID,
     viewer_data: dict,
     api_key: ApiKey = Depends(verify_api_key),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Track plot views from external websites
@@ -169,5 +199,6 @@ async def track_plot_view(
     Allows external websites to report when users view plot details,
     helping with analytics and lead tracking.
     """
-    service = ExternalApiService(db)
-    return service.track_plot_view(listing_id, viewer_data, api_key.key_name)
\ No newline at end of file
+    return await db.run_sync(
+        lambda session: ExternalApiService(session).track_plot_view(listing_id, viewer_data, api_key.key_name)
+    )
\ No newline at end of file
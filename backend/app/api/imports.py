@@ -0,0 +1,111 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import json
+import os
+import uuid
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.models.user import User
+from app.schemas.listing import ShapefileResponse
+from app.api.auth import get_current_active_user
+
+# app.services.import_service loads fiona, shapely and numpy, so the handlers
+# import it when they first run rather than every worker at boot
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+@router.post("/", response_model=ShapefileResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_parcel_import(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="Zipped shapefile (.zip) or GeoPackage (.gpkg)"),
+    coordinate_system: Optional[str] = Form(None, description="Source CRS (e.g. EPSG:21037) when the file has none"),
+    layer: Optional[str] = Form(None, description="Layer name for multi-layer GeoPackages"),
+    field_map: Optional[str] = Form(None, description='JSON object mapping source fields to parcel fields, e.g. {"PLOT_NO": "parcel_id"}'),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Upload a parcel file and load it in the background; poll GET /imports/{import_id} for progress"""
+    from app.services.import_service import ImportService, run_parcel_import, store_upload
+
+    if current_user.role not in ['admin', 'manager']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to import parcels"
+        )
+
+    try:
+        mapping = json.loads(field_map) if field_map else None
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="field_map must be a JSON object")
+    if mapping is not None and not isinstance(mapping, dict):
+        raise HTTPException(status_code=400, detail="field_map must be a JSON object")
+
+    try:
+        filename, file_size = await store_upload(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    shapefile = await db.run_sync(
+        lambda session: ImportService(session).create_import(
+            filename,
+            file.filename,
+            file_size,
+            uploaded_by=current_user.id,
+            coordinate_system=coordinate_system,
+            layer=layer,
+            field_map=mapping
+        )
+    )
+
+    background_tasks.add_task(run_parcel_import, shapefile.id)
+    return shapefile
+
+@router.get("/{import_id}", response_model=ShapefileResponse)
+async def get_parcel_import(
+    import_id: uuid.UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get import status, feature count and processing log"""
+    from app.services.import_service import ImportService
+
+    if current_user.role not in ['admin', 'manager']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view imports"
+        )
+
+    shapefile = await db.run_sync(lambda session: ImportService(session).get_import(import_id))
+    if not shapefile:
+        raise HTTPException(status_code=404, detail="Import not found")
+
+    return shapefile
+
+@router.get("/{import_id}/validation")
+async def get_parcel_import_validation(
+    import_id: uuid.UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Download the per-feature geometry validation and overlap report (NDJSON)"""
+    from app.services.import_service import ImportService
+
+    if current_user.role not in ['admin', 'manager']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view imports"
+        )
+
+    shapefile = await db.run_sync(lambda session: ImportService(session).get_import(import_id))
+    if not shapefile:
+        raise HTTPException(status_code=404, detail="Import not found")
+
+    report = (shapefile.file_metadata or {}).get("validation_report")
+    path = os.path.join(settings.upload_dir, report) if report else None
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Validation report not available")
+
+    return FileResponse(path, media_type="application/x-ndjson", filename=f"{import_id}-validation.ndjson")
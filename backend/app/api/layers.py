@@ -0,0 +1,178 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Query, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import uuid
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.models.user import User
+from app.schemas.listing import ShapefileResponse, SpatialLayerCreate, SpatialLayerResponse
+from app.services.layer_service import LayerService
+from app.services.tile_service import TileService
+from app.api.auth import get_current_active_user, get_optional_user
+
+# app.services.import_service loads fiona, shapely and numpy, so the handlers
+# import it when they first run rather than every worker at boot
+
+router = APIRouter(prefix="/layers", tags=["layers"])
+
+async def get_visible_layer(
+    layer_id: uuid.UUID,
+    current_user: Optional[User] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Public layers for everyone, private layers for signed-in users"""
+    layer = await db.run_sync(
+        lambda session: LayerService(session).get_layer(layer_id, include_private=current_user is not None)
+    )
+    if not layer:
+        raise HTTPException(status_code=404, detail="Layer not found")
+    return layer
+
+@router.get("/", response_model=List[SpatialLayerResponse])
+async def get_layers(
+    current_user: Optional[User] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get overlay layers with their style configuration"""
+    return await db.run_sync(
+        lambda session: LayerService(session).get_layers(include_private=current_user is not None)
+    )
+
+@router.post("/sources", response_model=ShapefileResponse, status_code=status.HTTP_201_CREATED)
+async def upload_layer_source(
+    file: UploadFile = File(..., description="Zipped shapefile (.zip) or GeoPackage (.gpkg)"),
+    coordinate_system: Optional[str] = Form(None, description="Source CRS (e.g. EPSG:21037) when the file has none"),
+    layer: Optional[str] = Form(None, description="Layer name for multi-layer GeoPackages"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Upload a layer's source file without loading it anywhere; pass its id as source_shapefile to POST /layers"""
+    from app.services.import_service import ImportService, store_upload
+
+    if current_user.role not in ['admin', 'manager']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to create layers"
+        )
+
+    try:
+        filename, file_size = await store_upload(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await db.run_sync(
+        lambda session: ImportService(session).create_import(
+            filename,
+            file.filename,
+            file_size,
+            uploaded_by=current_user.id,
+            coordinate_system=coordinate_system,
+            layer=layer
+        )
+    )
+
+@router.post("/", response_model=SpatialLayerResponse)
+async def create_layer(
+    layer_data: SpatialLayerCreate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a layer from an uploaded file and import its features in the background"""
+    from app.services.import_service import run_layer_import
+
+    if current_user.role not in ['admin', 'manager']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to create layers"
+        )
+
+    try:
+        layer = await db.run_sync(lambda session: LayerService(session).create_layer(layer_data, current_user.id))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    background_tasks.add_task(run_layer_import, layer.id)
+    return layer
+
+@router.post("/{layer_id}/import", response_model=SpatialLayerResponse, status_code=status.HTTP_202_ACCEPTED)
+async def reimport_layer(
+    layer_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
+    file: Optional[UploadFile] = File(None, description="Replacement zipped shapefile or GeoPackage"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Re-import a layer from its source file, or from a replacement upload; invalidates its cached tiles"""
+    from app.services.import_service import ImportService, run_layer_import, store_upload
+
+    if current_user.role not in ['admin', 'manager']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to import layers"
+        )
+
+    layer = await db.run_sync(lambda session: LayerService(session).get_layer(layer_id, include_private=True))
+    if not layer:
+        raise HTTPException(status_code=404, detail="Layer not found")
+
+    if file is not None:
+        try:
+            filename, file_size = await store_upload(file)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        def replace_source(session):
+            source = ImportService(session).create_import(filename, file.filename, file_size, uploaded_by=current_user.id)
+            return LayerService(session).set_source(layer, source.id)
+
+        layer = await db.run_sync(replace_source)
+
+    background_tasks.add_task(run_layer_import, layer.id)
+    return layer
+
+@router.get("/{layer_id}/features")
+async def get_layer_features(
+    bbox: str = Query(..., description="Bounding box: minX,minY,maxX,maxY"),
+    limit: int = Query(1000, le=5000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    layer=Depends(get_visible_layer),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a layer's features within a bounding box as GeoJSON"""
+    try:
+        coords = [float(x) for x in bbox.split(',')]
+        if len(coords) != 4:
+            raise ValueError("Invalid bbox format")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid bbox format")
+
+    try:
+        content = await db.run_sync(
+            lambda session: LayerService(session).get_features_in_bbox(layer.id, coords, limit, cursor)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return Response(content=content, media_type="application/geo+json")
+
+@router.get("/{layer_id}/tiles/{z}/{x}/{y}.mvt")
+async def get_layer_tile(
+    z: int,
+    x: int,
+    y: int,
+    layer=Depends(get_visible_layer),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a layer as a Mapbox Vector Tile"""
+    try:
+        tile = await db.run_sync(lambda session: TileService(session).get_layer_tile(layer, z, x, y))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return Response(
+        content=tile,
+        media_type="application/vnd.mapbox-vector-tile",
+        headers={"Cache-Control": f"{'public' if layer.is_public else 'private'}, max-age={settings.tile_cache_max_age}"}
+    )
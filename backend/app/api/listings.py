@@ -1,22 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import uuid
 
-from app.core.database import get_db
+from app.core.conditional import is_not_modified, make_etag, validator_headers
+from app.core.database import get_async_db
 from app.models.user import User
 from app.models.listing import PlotListing, PlotInquiry
 from app.schemas.listing import (
-    PlotListingCreate, PlotListingUpdate, PlotListingResponse,
+    PlotListingCreate, PlotListingUpdate, PlotListingResponse, PlotListingNearbyResponse,
     PlotInquiryCreate, PlotInquiryResponse
 )
+from app.services.data_version_service import DataVersionService
 from app.services.listing_service import ListingService
 from app.api.auth import get_current_active_user, get_current_user
 
 router = APIRouter(prefix="/listings", tags=["listings"])
 
+def serialize_listings(listings: List[PlotListing]) -> List[PlotListingResponse]:
+    """Build responses inside run_sync, where lazy relationships can still load"""
+    return [PlotListingResponse.model_validate(listing) for listing in listings]
+
 @router.get("/", response_model=List[PlotListingResponse])
 async def get_listings(
+    response: Response,
     region: Optional[str] = Query(None),
     status: str = Query("active"),
     featured: Optional[bool] = Query(None),
@@ -25,43 +32,143 @@ async def get_listings(
     min_area: Optional[float] = Query(None),
     max_area: Optional[float] = Query(None),
     limit: int = Query(50, le=100),
-    offset: int = Query(0),
-    db: Session = Depends(get_db)
+    offset: int = Query(0, description="Deprecated, use cursor"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get plot listings with filters"""
-    service = ListingService(db)
-    return service.get_listings(
-        region=region,
-        status=status,
-        featured=featured,
-        min_price=min_price,
-        max_price=max_price,
-        min_area=min_area,
-        max_area=max_area,
-        limit=limit,
-        offset=offset
-    )
+    """Get plot listings with filters; the next page cursor is in X-Next-Cursor"""
+    def load(session):
+        service = ListingService(session)
+        listings = service.get_listings(
+            region=region,
+            status=status,
+            featured=featured,
+            min_price=min_price,
+            max_price=max_price,
+            min_area=min_area,
+            max_area=max_area,
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+        return serialize_listings(listings), service.listing_cursor(listings, limit)
+    
+    try:
+        listings, next_cursor = await db.run_sync(load)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return listings
+
+@router.get("/nearest", response_model=List[PlotListingNearbyResponse])
+async def get_nearest_listings(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    region: Optional[str] = Query(None),
+    status: str = Query("active"),
+    featured: Optional[bool] = Query(None),
+    min_price: Optional[float] = Query(None),
+    max_price: Optional[float] = Query(None),
+    min_area: Optional[float] = Query(None),
+    max_area: Optional[float] = Query(None),
+    limit: int = Query(20, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the listings closest to a point, nearest first, with distance in metres"""
+    def load(session):
+        nearest = ListingService(session).get_nearest_listings(
+            lat=lat,
+            lng=lng,
+            region=region,
+            status=status,
+            featured=featured,
+            min_price=min_price,
+            max_price=max_price,
+            min_area=min_area,
+            max_area=max_area,
+            limit=limit
+        )
+        return [
+            PlotListingNearbyResponse(
+                **PlotListingResponse.model_validate(listing).model_dump(),
+                distance_m=distance_m
+            )
+            for listing, distance_m in nearest
+        ]
+    
+    return await db.run_sync(load)
 
 @router.get("/featured", response_model=List[PlotListingResponse])
 async def get_featured_listings(
+    request: Request,
+    response: Response,
     region: Optional[str] = Query(None),
     limit: int = Query(10, le=20),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get featured plot listings"""
-    service = ListingService(db)
-    return service.get_listings(
-        region=region,
-        status="active",
-        featured=True,
-        limit=limit
+    """Get featured plot listings; supports If-None-Match against the listing data version"""
+    versions, last_modified = await db.run_sync(
+        lambda session: DataVersionService(session).get_scoped_versions(
+            ["plot_listings", "parcels"], [region] if region else None
+        )
+    )
+    etag = make_etag(request, versions)
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    
+    return await db.run_sync(
+        lambda session: serialize_listings(ListingService(session).get_listings(
+            region=region,
+            status="active",
+            featured=True,
+            limit=limit
+        ))
     )
 
+@router.get("/inquiries", response_model=List[PlotInquiryResponse])
+async def get_inquiries(
+    response: Response,
+    status: Optional[str] = Query(None),
+    limit: int = Query(50, le=100),
+    offset: int = Query(0, description="Deprecated, use cursor"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get plot inquiries (for staff); the next page cursor is in X-Next-Cursor"""
+    if current_user.role not in ['admin', 'manager', 'agent']:
+        # `status` is the query parameter here, not fastapi.status
+        raise HTTPException(
+            status_code=403,
+            detail="Not authorized to view inquiries"
+        )
+    
+    def load(session):
+        service = ListingService(session)
+        inquiries = service.get_inquiries(status=status, limit=limit, offset=offset, cursor=cursor)
+        return inquiries, service.inquiry_cursor(inquiries, limit)
+    
+    try:
+        inquiries, next_cursor = await db.run_sync(load)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return inquiries
+
 @router.get("/{listing_id}", response_model=PlotListingResponse)
-async def get_listing(listing_id: uuid.UUID, db: Session = Depends(get_db)):
+async def get_listing(listing_id: uuid.UUID, db: AsyncSession = Depends(get_async_db)):
     """Get specific listing details"""
-    service = ListingService(db)
-    listing = service.get_listing_by_id(listing_id)
+    def load(session):
+        listing = ListingService(session).get_listing_by_id(listing_id)
+        return PlotListingResponse.model_validate(listing) if listing else None
+    
+    listing = await db.run_sync(load)
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
     return listing
@@ -70,7 +177,7 @@ async def get_listing(listing_id: uuid.UUID, db: Session = Depends(get_db)):
 async def create_listing(
     listing_data: PlotListingCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create new plot listing"""
     if current_user.role not in ['admin', 'manager', 'agent']:
@@ -79,19 +186,21 @@ async def create_listing(
             detail="Not authorized to create listings"
         )
     
-    service = ListingService(db)
-    return service.create_listing(listing_data, current_user.id)
+    return await db.run_sync(
+        lambda session: PlotListingResponse.model_validate(
+            ListingService(session).create_listing(listing_data, current_user.id)
+        )
+    )
 
 @router.put("/{listing_id}", response_model=PlotListingResponse)
 async def update_listing(
     listing_id: uuid.UUID,
     listing_update: PlotListingUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update plot listing"""
-    service = ListingService(db)
-    listing = service.get_listing_by_id(listing_id)
+    listing = await db.run_sync(lambda session: ListingService(session).get_listing_by_id(listing_id))
     
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
@@ -104,17 +213,20 @@ async def update_listing(
             detail="Not authorized to update this listing"
         )
     
-    return service.update_listing(listing_id, listing_update)
+    return await db.run_sync(
+        lambda session: PlotListingResponse.model_validate(
+            ListingService(session).update_listing(listing_id, listing_update)
+        )
+    )
 
 @router.delete("/{listing_id}")
 async def delete_listing(
     listing_id: uuid.UUID,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete plot listing"""
-    service = ListingService(db)
-    listing = service.get_listing_by_id(listing_id)
+    listing = await db.run_sync(lambda session: ListingService(session).get_listing_by_id(listing_id))
     
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
@@ -127,43 +239,24 @@ async def delete_listing(
             detail="Not authorized to delete this listing"
         )
     
-    service.delete_listing(listing_id)
+    await db.run_sync(lambda session: ListingService(session).delete_listing(listing_id))
     return {"message": "Listing deleted successfully"}
 
 # Inquiry endpoints
 @router.post("/inquiries", response_model=PlotInquiryResponse)
 async def create_inquiry(
     inquiry_data: PlotInquiryCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create plot inquiry (public endpoint)"""
-    service = ListingService(db)
-    return service.create_inquiry(inquiry_data)
-
-@router.get("/inquiries", response_model=List[PlotInquiryResponse])
-async def get_inquiries(
-    status: Optional[str] = Query(None),
-    limit: int = Query(50, le=100),
-    offset: int = Query(0),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Get plot inquiries (for staff)"""
-    if current_user.role not in ['admin', 'manager', 'agent']:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view inquiries"
-        )
-    
-    service = ListingService(db)
-    return service.get_inquiries(status=status, limit=limit, offset=offset)
+    return await db.run_sync(lambda session: ListingService(session).create_inquiry(inquiry_data))
 
 @router.put("/inquiries/{inquiry_id}/respond")
 async def respond_to_inquiry(
     inquiry_id: uuid.UUID,
     response_message: str,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Respond to plot inquiry"""
     if current_user.role not in ['admin', 'manager', 'agent']:
@@ -172,5 +265,6 @@ async def respond_to_inquiry(
             detail="Not authorized to respond to inquiries"
         )
     
-    service = ListingService(db)
-    return service.respond_to_inquiry(inquiry_id, current_user.id, response_message)
\ No newline at end of file
+    return await db.run_sync(
+        lambda session: ListingService(session).respond_to_inquiry(inquiry_id, current_user.id, response_message)
+    )
\ No newline at end of file
@@ -1,74 +1,324 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.core.database import get_db
-from app.services.parcel_service import ParcelService
-from app.schemas.parcel import ParcelCollection, ParcelCreate, SearchParams
+from app.core.conditional import is_not_modified, make_etag, validator_headers
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
+from app.core.serialization import FastJSONResponse
+from app.services.data_version_service import DataVersionService
+from app.services.parcel_service import ParcelService, TOPOJSON_QUANTIZATION
+from app.services.tile_service import TileService
+from app.schemas.parcel import (
+    ParcelCollection, ParcelCreate, ParcelBulkCreate, ParcelBulkResponse,
+    ParcelLookupRequest, ParcelLookupResponse, ParcelLookupResult, ParcelNearby, ParcelNeighborSummary, SearchParams
+)
 
 router = APIRouter(prefix="/parcels", tags=["parcels"])
 
+STREAM_MEDIA_TYPES = {
+    "geojson": "application/geo+json",
+    "ndjson": "application/x-ndjson",
+}
+
+BINARY_MEDIA_TYPES = {
+    "flatgeobuf": "application/flatgeobuf",
+    "wkb": "application/vnd.landparcel.wkb",
+    "twkb": "application/vnd.landparcel.twkb",
+}
+
+FORMAT_PATTERN = "^(geojson|ndjson|topojson|flatgeobuf|wkb|twkb)$"
+
+def negotiate_format(request: Request, format: Optional[str]) -> str:
+    """The explicit format parameter, else the first binary type in Accept, else geojson"""
+    if format:
+        return format
+    
+    accept = request.headers.get("accept", "")
+    for media_range in accept.split(","):
+        media_type = media_range.split(";")[0].strip()
+        for fmt, binary_type in BINARY_MEDIA_TYPES.items():
+            if media_type == binary_type:
+                return fmt
+        if media_type == STREAM_MEDIA_TYPES["ndjson"]:
+            return "ndjson"
+    return "geojson"
+
+def stream_response(chunks, fmt: str) -> StreamingResponse:
+    # Streams read a server-side cursor on the sync session from get_db,
+    # which Starlette iterates in its threadpool. That session is closed
+    # only after the response has been sent, so the cursor stays open
+    # while the body streams.
+    return StreamingResponse(chunks, media_type=STREAM_MEDIA_TYPES[fmt])
+
 @router.get("/", response_model=ParcelCollection)
 async def get_parcels(
+    request: Request,
     regions: Optional[str] = Query(None, description="Comma-separated list of regions"),
     bbox: Optional[str] = Query(None, description="Bounding box: minX,minY,maxX,maxY"),
     limit: int = Query(1000, le=5000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Map zoom level; low zooms get simplified geometry"),
+    format: Optional[str] = Query(
+        None, pattern=FORMAT_PATTERN,
+        description="geojson, ndjson (always streamed), topojson, flatgeobuf, wkb or twkb; defaults from the Accept header"
+    ),
+    stream: bool = Query(False, description="Stream the response from a server-side cursor"),
+    quantization: int = Query(
+        TOPOJSON_QUANTIZATION, ge=1000, le=100000000,
+        description="TopoJSON grid size; coordinates snap to 1/quantization of the page extent"
+    ),
+    db: AsyncSession = Depends(get_async_db),
+    sync_db: Session = Depends(get_db)
 ):
-    """Get parcels by regions or bounding box"""
-    service = ParcelService(db)
+    """Get parcels by regions or bounding box, ordered by id and paged with cursors
+
+    Responses carry an ETag derived from the parcel data version (per region
+    when regions are given); a matching If-None-Match gets 304 without
+    running the query. Pages are encoded into GeoJSON, TopoJSON or binary
+    geometry in the same call that queries them, so they run on the sync
+    session in the threadpool rather than in run_sync on the event loop.
+    """
+    format = negotiate_format(request, format)
+    streaming = (stream or format == "ndjson") and format != "topojson"
     
     region_list = []
     if regions:
         region_list = [r.strip() for r in regions.split(',')]
     
+    coords = None
     if bbox:
         try:
             coords = [float(x) for x in bbox.split(',')]
             if len(coords) != 4:
                 raise ValueError("Invalid bbox format")
-            return service.get_parcels_in_bbox(coords, region_list, limit)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid bbox format")
     
-    return service.get_parcels_by_region(region_list, limit)
+    versions, last_modified = await db.run_sync(
+        lambda session: DataVersionService(session).get_scoped_versions(["parcels"], region_list)
+    )
+    etag = make_etag(request, versions, variant=f"{format}:{streaming}")
+    headers = validator_headers(etag, last_modified)
+    headers["Vary"] = "Accept"
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        if format in BINARY_MEDIA_TYPES:
+            content, total, next_cursor = await run_in_threadpool(
+                ParcelService(sync_db).get_parcels_binary, format, region_list, coords, limit, zoom, cursor
+            )
+            headers["X-Feature-Count"] = str(total)
+            if next_cursor:
+                headers["X-Next-Cursor"] = next_cursor
+            return Response(content=content, media_type=BINARY_MEDIA_TYPES[format], headers=headers)
+        if format == "topojson":
+            result = Response(
+                content=await run_in_threadpool(
+                    ParcelService(sync_db).get_parcels_topojson, region_list, coords, limit, zoom, cursor, quantization
+                ),
+                media_type="application/json"
+            )
+        elif coords and streaming:
+            result = stream_response(
+                ParcelService(sync_db).stream_parcels_in_bbox(coords, region_list, limit, format, zoom, cursor), format
+            )
+        elif coords:
+            result = Response(
+                content=await run_in_threadpool(
+                    ParcelService(sync_db).get_parcels_in_bbox, coords, region_list, limit, zoom, cursor
+                ),
+                media_type="application/json"
+            )
+        elif streaming:
+            result = stream_response(
+                ParcelService(sync_db).stream_parcels_by_region(region_list, limit, format, zoom, cursor), format
+            )
+        else:
+            result = Response(
+                content=await run_in_threadpool(
+                    ParcelService(sync_db).get_parcels_by_region, region_list, limit, zoom, cursor
+                ),
+                media_type="application/json"
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    result.headers.update(headers)
+    return result
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+async def get_parcel_tile(z: int, x: int, y: int, db: AsyncSession = Depends(get_async_db)):
+    """Get parcels as a Mapbox Vector Tile"""
+    try:
+        tile = await db.run_sync(lambda session: TileService(session).get_parcel_tile(z, x, y))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return Response(
+        content=tile,
+        media_type="application/vnd.mapbox-vector-tile",
+        headers={"Cache-Control": f"public, max-age={settings.tile_cache_max_age}"}
+    )
+
+@router.get("/clusters")
+async def get_parcel_clusters(
+    bbox: str = Query(..., description="Bounding box: minX,minY,maxX,maxY"),
+    zoom: int = Query(..., ge=0, le=22),
+    regions: Optional[str] = Query(None, description="Comma-separated list of regions"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get parcel and listing counts, area and valuation per grid cell for low zoom maps"""
+    region_list = []
+    if regions:
+        region_list = [r.strip() for r in regions.split(',')]
+    
+    try:
+        coords = [float(x) for x in bbox.split(',')]
+        if len(coords) != 4:
+            raise ValueError("Invalid bbox format")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid bbox format")
+    
+    try:
+        clusters = await db.run_sync(lambda session: ParcelService(session).get_parcel_clusters(coords, zoom, region_list))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return FastJSONResponse(
+        content=clusters,
+        headers={"Cache-Control": f"public, max-age={settings.tile_cache_max_age}"}
+    )
+
+@router.get("/at", response_model=ParcelLookupResult)
+async def get_parcels_at(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the parcels containing a point"""
+    results = await db.run_sync(lambda session: ParcelService(session).find_parcels_at([(lat, lng)]))
+    return results[0]
+
+@router.post("/at", response_model=ParcelLookupResponse)
+async def lookup_parcels_at(
+    request: ParcelLookupRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Resolve a batch of points (e.g. a GPS track) to the parcels containing them"""
+    points = [(point.lat, point.lng) for point in request.points]
+    try:
+        results = await db.run_sync(lambda session: ParcelService(session).find_parcels_at(points))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ParcelLookupResponse(results=results)
+
+@router.get("/nearest", response_model=List[ParcelNearby])
+async def get_nearest_parcels(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    regions: Optional[str] = Query(None, description="Comma-separated list of regions"),
+    min_area: Optional[float] = Query(None),
+    max_area: Optional[float] = Query(None),
+    land_use: Optional[str] = Query(None),
+    limit: int = Query(20, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the parcels closest to a point, nearest first, with distance in metres"""
+    region_list = []
+    if regions:
+        region_list = [r.strip() for r in regions.split(',')]
+    
+    return await db.run_sync(
+        lambda session: ParcelService(session).get_nearest_parcels(
+            lat, lng, region_list, min_area, max_area, land_use, limit
+        )
+    )
 
 @router.get("/{parcel_id}")
-async def get_parcel(parcel_id: str, db: Session = Depends(get_db)):
+async def get_parcel(
+    parcel_id: str,
+    request: Request,
+    format: Optional[str] = Query(
+        None, pattern="^(geojson|flatgeobuf|wkb|twkb)$",
+        description="geojson (with measurements), flatgeobuf, wkb or twkb; defaults from the Accept header"
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get specific parcel details"""
-    service = ParcelService(db)
-    parcel = service.get_parcel_by_id(parcel_id)
+    format = negotiate_format(request, format)
+    if format in BINARY_MEDIA_TYPES:
+        content = await db.run_sync(lambda session: ParcelService(session).get_parcel_binary(parcel_id, format))
+        if content is None:
+            raise HTTPException(status_code=404, detail="Parcel not found")
+        return Response(content=content, media_type=BINARY_MEDIA_TYPES[format])
+    
+    parcel = await db.run_sync(lambda session: ParcelService(session).get_parcel_by_id(parcel_id))
     if not parcel:
         raise HTTPException(status_code=404, detail="Parcel not found")
-    return parcel
+    return FastJSONResponse(content=parcel)
+
+@router.get("/{parcel_id}/neighbors", response_model=List[ParcelNeighborSummary])
+async def get_parcel_neighbors(parcel_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Get adjacent parcels with the length of boundary they share"""
+    neighbors = await db.run_sync(lambda session: ParcelService(session).get_parcel_neighbors(parcel_id))
+    if neighbors is None:
+        raise HTTPException(status_code=404, detail="Parcel not found")
+    return neighbors
 
 @router.get("/search/")
 async def search_parcels(
-    field: str = Query(..., description="Search field"),
+    field: str = Query(..., description="Search field, or 'all' to search every field"),
     value: str = Query(..., description="Search value"),
     regions: Optional[str] = Query(None, description="Comma-separated list of regions"),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, le=5000),
+    format: str = Query("geojson", pattern="^(geojson|ndjson)$", description="geojson or ndjson (always streamed)"),
+    stream: bool = Query(False, description="Stream the response from a server-side cursor"),
+    db: AsyncSession = Depends(get_async_db),
+    stream_db: Session = Depends(get_db)
 ):
-    """Search parcels by field"""
-    service = ParcelService(db)
-    
+    """Search parcels by field, best matches first"""
     region_list = []
     if regions:
         region_list = [r.strip() for r in regions.split(',')]
     
     try:
-        return service.search_parcels(field, value, region_list)
+        if stream or format == "ndjson":
+            return stream_response(
+                ParcelService(stream_db).stream_search_parcels(field, value, region_list, limit, format), format
+            )
+        content = await db.run_sync(lambda session: ParcelService(session).search_parcels(field, value, region_list, limit))
+        return Response(content=content, media_type="application/json")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/bulk", response_model=ParcelBulkResponse)
+async def create_parcels_bulk(
+    collection: ParcelBulkCreate,
+    upsert: bool = Query(False, description="Update parcels whose parcel_id already exists instead of skipping them"),
+    db: Session = Depends(get_db)
+):
+    """Create parcels from a FeatureCollection in one transaction, with a result per feature
+
+    Validating up to BULK_MAX_FEATURES geometries is CPU-bound, so this runs
+    on the sync session in the threadpool.
+    """
+    try:
+        return await run_in_threadpool(ParcelService(db).create_parcels_bulk, collection.features, upsert=upsert)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/", response_model=dict)
 async def create_parcel(
     parcel: ParcelCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create new parcel"""
-    service = ParcelService(db)
     try:
-        db_parcel = service.create_parcel(parcel)
+        db_parcel = await db.run_sync(lambda session: ParcelService(session).create_parcel(parcel))
         return {"message": "Parcel created successfully", "parcel_id": db_parcel.parcel_id}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
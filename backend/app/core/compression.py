@@ -0,0 +1,153 @@
+from typing import Optional
+import zlib
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Encodings in order of preference when the client accepts several equally
+ENCODINGS = ["br", "gzip"]
+
+# Already-compressed bodies that are not worth compressing again
+UNCOMPRESSIBLE_TYPES = ("application/zip", "application/geopackage+sqlite3", "image/")
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """The best of ENCODINGS allowed by an Accept-Encoding header, or None"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        parts = item.strip().split(";")
+        coding = parts[0].strip().lower()
+        weight = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding] = weight
+
+    best = None
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > 0 and (best is None or weight > weights.get(best, weights.get("*", 0.0))):
+            best = encoding
+    return best
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """The ETag of the encoded representation: a strong ETag must differ per Content-Encoding"""
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self.brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self.gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        # Streamed chunks are flushed so clients can start parsing before
+        # the response ends
+        if self.encoding == "br":
+            out = self.brotli.process(data)
+            return out + (self.brotli.finish() if final else self.brotli.flush())
+        out = self.gzip.compress(data)
+        return out + self.gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class CompressionMiddleware:
+    """Brotli or gzip response compression negotiated from Accept-Encoding
+
+    Like Starlette's GZipMiddleware, but also offers brotli, works with
+    streamed responses and leaves Range requests, partial content and
+    already-encoded responses untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        encoding = negotiate_encoding(headers.get("accept-encoding", ""))
+        if encoding is None or "range" in headers:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(
+            send,
+            _Compressor(encoding, self.gzip_level, self.brotli_quality),
+            self.minimum_size,
+            headers.get("if-none-match", "")
+        )
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    def __init__(self, send: Send, compressor: _Compressor, minimum_size: int, if_none_match: str):
+        self.downstream = send
+        self.compressor = compressor
+        self.minimum_size = minimum_size
+        self.if_none_match = if_none_match
+        self.start_message: Optional[Message] = None
+        self.compressing: Optional[bool] = None
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressing is None:
+            self.compressing = self._should_compress(body, more_body)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if self.start_message["status"] in (200, 304):
+                headers.add_vary_header("Accept-Encoding")
+            if self.compressing:
+                headers["Content-Encoding"] = self.compressor.encoding
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], self.compressor.encoding)
+                del headers["Content-Length"]
+                if not more_body:
+                    body = self.compressor.compress(body, final=True)
+                    headers["Content-Length"] = str(len(body))
+                    await self.downstream(self.start_message)
+                    await self.downstream({"type": "http.response.body", "body": body})
+                    return
+            elif self.start_message["status"] == 304 and "etag" in headers:
+                # A 304 carries the ETag of the representation the client
+                # holds: encoded only if that 200 was compressed, which a
+                # body under minimum_size was not
+                encoded = encoded_etag(headers["etag"], self.compressor.encoding)
+                if encoded in [tag.strip().removeprefix("W/") for tag in self.if_none_match.split(",")]:
+                    headers["ETag"] = encoded
+            await self.downstream(self.start_message)
+
+        if self.compressing:
+            body = self.compressor.compress(body, final=not more_body)
+        await self.downstream({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    def _should_compress(self, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=self.start_message["headers"])
+        if self.start_message["status"] != 200 or "content-encoding" in headers:
+            return False
+        if headers.get("content-type", "").startswith(UNCOMPRESSIBLE_TYPES):
+            return False
+        # File downloads keep their Content-Length and byte offsets so that
+        # Range requests against them stay valid
+        if headers.get("content-disposition", "").startswith("attachment"):
+            return False
+        return more_body or len(body) >= self.minimum_size
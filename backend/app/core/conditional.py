@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+import hashlib
+
+from fastapi import Request
+
+def make_etag(request: Request, versions: Dict[str, int], variant: str = "") -> str:
+    """Strong ETag for a representation: the path, query and data versions it was built from"""
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    state = ",".join(f"{name}={versions[name]}" for name in sorted(versions))
+    digest = hashlib.sha1(f"{request.url.path}?{query}|{variant}|{state}".encode()).hexdigest()
+    return f'"{digest}"'
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Whether If-None-Match (or, without it, If-Modified-Since) matches the current state"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match uses the weak comparison; compressed responses carry
+        # the same tag with a -gzip/-br suffix
+        tags = [_base_etag(tag.strip()) for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+def _base_etag(tag: str) -> str:
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ('-gzip"', '-br"'):
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+def validator_headers(
+    etag: str,
+    last_modified: Optional[datetime],
+    cache_control: str = "no-cache"
+) -> Dict[str, str]:
+    """ETag, Last-Modified and Cache-Control headers; no-cache makes clients revalidate every time"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
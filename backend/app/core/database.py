@@ -1,18 +1,71 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from typing import Any, Dict
+import uuid
 from app.core.config import settings
+from app.core.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+
+def async_database_url(url: str) -> str:
+    """The asyncpg form of a postgresql:// URL; libpq's sslmode becomes asyncpg's ssl"""
+    async_url = make_url(url).set(drivername="postgresql+asyncpg")
+    if "sslmode" in async_url.query:
+        async_url = async_url.update_query_dict({"ssl": async_url.query["sslmode"]})
+        async_url = async_url.difference_update_query(["sslmode"])
+    return async_url.render_as_string(hide_password=False)
+
+def pool_options() -> Dict[str, Any]:
+    """Engine and pool arguments from settings, shared by the sync and async engines"""
+    return {
+        "echo": settings.db_echo,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+def asyncpg_connect_args() -> Dict[str, Any]:
+    """asyncpg arguments; PgBouncer in transaction mode may hand each transaction
+    a different server connection, so prepared statements are neither cached
+    nor given names that could clash with another client's"""
+    if not settings.db_pgbouncer:
+        return {}
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
 
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
-    echo=True  # Set to False in production
+    poolclass=InstrumentedQueuePool,
+    **pool_options()
 )
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# asyncpg engine for request handlers. Services are written against a sync
+# Session; handlers run them with `await db.run_sync(...)`, which gives them
+# a Session on this engine whose queries await asyncpg instead of blocking.
+# The Python code in between still runs on the event loop thread, so
+# CPU-heavy work (password hashing, large encodes) belongs in
+# run_in_threadpool, not in run_sync. Scripts, Alembic and background jobs
+# keep using SessionLocal.
+async_engine = create_async_engine(
+    settings.async_database_url or async_database_url(settings.database_url),
+    poolclass=InstrumentedAsyncQueuePool,
+    connect_args=asyncpg_connect_args(),
+    **pool_options()
+)
+
+# Objects returned from run_sync stay readable after the session commits
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create Base class
 Base = declarative_base()
 
@@ -22,4 +75,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
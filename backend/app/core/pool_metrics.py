@@ -0,0 +1,87 @@
+from collections import deque
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Checkout latencies kept for the percentiles in PoolMetrics.snapshot
+LATENCY_WINDOW = 1000
+
+class PoolMetrics:
+    """Checkout counters and recent checkout latencies of one connection pool"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds: float, waited: bool, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self._latencies.append(seconds)
+            if waited:
+                self.waits += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = {"checkouts": self.checkouts, "waits": self.waits, "timeouts": self.timeouts}
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000
+
+        return {
+            **counters,
+            "checkout_ms": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": latencies[-1] * 1000 if latencies else 0.0,
+            },
+        }
+
+class _TimedCheckout:
+    """Times every checkout and counts those that had to wait for a connection to be returned"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        # No idle connection and no overflow left: this checkout queues
+        waited = self.checkedin() == 0 and 0 <= self._max_overflow <= self.overflow()
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, waited, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start, waited)
+        return connection
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+def pool_status(pool) -> Dict[str, Any]:
+    """Current usage of a pool plus its checkout metrics, for this worker process"""
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
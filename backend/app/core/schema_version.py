@@ -0,0 +1,54 @@
+import ast
+import os
+import re
+from typing import Set
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+VERSIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic", "versions"
+)
+
+_REVISION_LINE = re.compile(r"^(revision|down_revision)\s*=\s*(.+)$", re.MULTILINE)
+
+def migration_heads(versions_dir: str = VERSIONS_DIR) -> Set[str]:
+    """Head revisions of the Alembic migration scripts
+
+    Read from the `revision = ...` lines rather than through Alembic's
+    ScriptDirectory, which would import every migration module.
+    """
+    revisions, parents = set(), set()
+    for filename in os.listdir(versions_dir):
+        if not filename.endswith(".py"):
+            continue
+        with open(os.path.join(versions_dir, filename)) as f:
+            header = dict(_REVISION_LINE.findall(f.read()))
+        if "revision" not in header:
+            continue
+
+        revisions.add(ast.literal_eval(header["revision"]))
+        down_revision = ast.literal_eval(header.get("down_revision", "None"))
+        if isinstance(down_revision, (tuple, list)):
+            parents.update(down_revision)
+        elif down_revision:
+            parents.add(down_revision)
+
+    return revisions - parents
+
+async def check_schema_version(engine: AsyncEngine):
+    """Refuse to start unless the database has been migrated to this build's head revision"""
+    heads = migration_heads()
+    async with engine.connect() as connection:
+        try:
+            current = set((await connection.execute(text("SELECT version_num FROM alembic_version"))).scalars())
+        except ProgrammingError:
+            # No alembic_version table: never migrated
+            current = set()
+
+    if current != heads:
+        raise RuntimeError(
+            f"Database schema is at {', '.join(sorted(current)) or 'no revision'} but this build expects "
+            f"{', '.join(sorted(heads))}; run `alembic upgrade head`"
+        )
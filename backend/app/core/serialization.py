@@ -0,0 +1,24 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value: Any) -> bytes:
+    """Serialize to JSON bytes with orjson; datetimes become RFC 3339 strings and Decimals floats"""
+    return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def raw_json(text: str) -> orjson.Fragment:
+    """Embed JSON text produced elsewhere, e.g. by ST_AsGeoJSON, without parsing it"""
+    return orjson.Fragment(text)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps, skipping jsonable_encoder and response_model validation"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,15 +1,28 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.api import parcels, auth, listings, external
-from app.core.database import engine, Base
+from app.api import parcels, auth, listings, external, imports, layers, exports
+from app.core.database import async_engine, engine
+from app.core.pool_metrics import pool_status
+from app.core.schema_version import check_schema_version
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is owned by Alembic migrations; workers only confirm the
+    # database is at the revision this build expects
+    if settings.db_startup_check == "version":
+        await check_schema_version(async_engine)
+    elif settings.db_startup_check != "off":
+        raise RuntimeError(f"Unknown DB_STARTUP_CHECK {settings.db_startup_check!r}; expected version or off")
+    yield
+    await async_engine.dispose()
 
 app = FastAPI(
     title=settings.project_name,
-    openapi_url=f"{settings.api_v1_str}/openapi.json"
+    openapi_url=f"{settings.api_v1_str}/openapi.json",
+    lifespan=lifespan
 )
 
 # Set up CORS
@@ -19,6 +32,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Feature-Count", "Content-Range", "Content-Disposition", "ETag", "Last-Modified"],
+)
+
+# Compress responses with brotli or gzip, whichever the client prefers
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.gzip_level,
+    brotli_quality=settings.brotli_quality,
 )
 
 # Include routers
@@ -26,6 +48,9 @@ app.include_router(parcels.router, prefix=settings.api_v1_str)
 app.include_router(auth.router, prefix=settings.api_v1_str)
 app.include_router(listings.router, prefix=settings.api_v1_str)
 app.include_router(external.router, prefix=settings.api_v1_str)
+app.include_router(imports.router, prefix=settings.api_v1_str)
+app.include_router(layers.router, prefix=settings.api_v1_str)
+app.include_router(exports.router, prefix=settings.api_v1_str)
 
 @app.get("/")
 async def root():
@@ -45,6 +70,15 @@ async def health_check():
         ]
     }
 
+@app.get("/health/db-pool")
+async def db_pool_health():
+    """Connection pool usage and checkout latency of this worker's engines"""
+    return {
+        "pgbouncer": settings.db_pgbouncer,
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.pool)
+    }
+
 @app.get("/api-docs")
 async def api_documentation():
     return {
@@ -55,7 +89,10 @@ async def api_documentation():
             "authentication": "/api/v1/auth/*",
             "parcels": "/api/v1/parcels/*", 
             "listings": "/api/v1/listings/*",
-            "external_integration": "/api/v1/external/*"
+            "external_integration": "/api/v1/external/*",
+            "imports": "/api/v1/imports/*",
+            "layers": "/api/v1/layers/*",
+            "exports": "/api/v1/exports/*"
         },
         "documentation": "/docs",
         "contact": "admin@landparcel.com"
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    # Table (or table:scope) name, bumped by triggers on every write
+    name = Column(String(150), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Text, DateTime, JSON, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.core.database import Base
+import uuid
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    format = Column(String(20), nullable=False)
+    # Parcel selection: regions, bbox and/or search field and value
+    selection = Column(JSON, nullable=False)
+    status = Column(String(50), default='pending', index=True)
+    feature_count = Column(Integer)
+    processed_count = Column(Integer, default=0)
+    filename = Column(String(255))
+    file_size = Column(BigInteger)
+    error = Column(Text)
+    created_by = Column(UUID(as_uuid=True), ForeignKey('users.id'))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True))
+
+    @property
+    def progress(self):
+        """Share of features written, 0.0 to 1.0"""
+        if self.status == 'completed':
+            return 1.0
+        if not self.feature_count:
+            return None
+        return min((self.processed_count or 0) / self.feature_count, 1.0)
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, DateTime, JSON, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Numeric, Boolean, DateTime, JSON, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from geoalchemy2 import Geometry
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -9,32 +10,57 @@ class PlotListing(Base):
     __tablename__ = "plot_listings"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    parcel_id = Column(Integer, ForeignKey('parcels.id', ondelete='CASCADE'), nullable=False)
+    parcel_id = Column(Integer, ForeignKey('parcel_keys.id', ondelete='CASCADE'), nullable=False, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text)
     price = Column(Numeric(15, 2), nullable=False)
     price_per_sqm = Column(Numeric(10, 2))
     status = Column(String(50), default='active', index=True)
-    featured = Column(Boolean, default=False, index=True)
+    featured = Column(Boolean, default=False, server_default="false", nullable=False, index=True)
     amenities = Column(JSON, default=[])
     images = Column(JSON, default=[])
     contact_person = Column(String(255))
     contact_phone = Column(String(20))
     contact_email = Column(String(255))
     listed_by = Column(UUID(as_uuid=True), ForeignKey('users.id'))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    parcel = relationship("Parcel", backref="listings")
+    parcel = relationship("Parcel", primaryjoin="foreign(PlotListing.parcel_id) == Parcel.id", backref="listings")
     listed_by_user = relationship("User", back_populates="listings")
     inquiries = relationship("PlotInquiry", back_populates="listing")
 
+class RegionListingSummary(Base):
+    __tablename__ = "region_listing_summaries"
+    
+    # Active listings per region, adjusted by deltas from triggers on
+    # plot_listings and parcels; see ExternalApiService.rebuild_region_summaries
+    region = Column(String(100), primary_key=True)
+    available_plots = Column(Integer, nullable=False)
+    min_price = Column(Numeric(15, 2))
+    max_price = Column(Numeric(15, 2))
+    avg_price = Column(Numeric)
+    total_area_sqm = Column(Numeric)
+    # Running sum behind avg_price, and the listings counted in total_area_sqm
+    price_sum = Column(Numeric, nullable=False, default=0)
+    sized_plots = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class RegionListingPrice(Base):
+    __tablename__ = "region_listing_prices"
+    
+    # Active listings per region and price, so the rollup's min/max price
+    # survive a listing leaving the region without rescanning it
+    region = Column(String(100), primary_key=True)
+    price = Column(Numeric(15, 2), primary_key=True)
+    listings = Column(Integer, nullable=False)
+
 class PlotInquiry(Base):
     __tablename__ = "plot_inquiries"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    parcel_id = Column(Integer, ForeignKey('parcels.id', ondelete='CASCADE'), nullable=False)
+    parcel_id = Column(Integer, ForeignKey('parcel_keys.id', ondelete='CASCADE'), nullable=False)
     listing_id = Column(UUID(as_uuid=True), ForeignKey('plot_listings.id', ondelete='CASCADE'))
     customer_name = Column(String(255), nullable=False)
     customer_email = Column(String(255), nullable=False)
@@ -44,12 +70,12 @@ class PlotInquiry(Base):
     status = Column(String(50), default='pending', index=True)
     source_website = Column(String(255))
     referral_data = Column(JSON)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     responded_at = Column(DateTime(timezone=True))
     responded_by = Column(UUID(as_uuid=True), ForeignKey('users.id'))
     
     # Relationships
-    parcel = relationship("Parcel", backref="inquiries")
+    parcel = relationship("Parcel", primaryjoin="foreign(PlotInquiry.parcel_id) == Parcel.id", backref="inquiries")
     listing = relationship("PlotListing", back_populates="inquiries")
     responder = relationship("User", back_populates="inquiries_responded")
 
@@ -66,7 +92,8 @@ class ShapefileData(Base):
     processed = Column(Boolean, default=False)
     processing_status = Column(String(50), default='pending')
     processing_log = Column(Text)
-    metadata = Column(JSON)
+    # "metadata" is reserved on declarative models, so map the column under another name
+    file_metadata = Column("metadata", JSON)
     geometry_type = Column(String(50))
     coordinate_system = Column(String(100))
     feature_count = Column(Integer)
@@ -91,4 +118,14 @@ class SpatialLayer(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
-    source_shapefile_data = relationship("ShapefileData", back_populates="spatial_layers")
\ No newline at end of file
+    source_shapefile_data = relationship("ShapefileData", back_populates="spatial_layers")
+
+class SpatialLayerFeature(Base):
+    __tablename__ = "spatial_layer_features"
+    
+    id = Column(BigInteger, primary_key=True)
+    layer_id = Column(UUID(as_uuid=True), ForeignKey('spatial_layers.id', ondelete='CASCADE'), nullable=False, index=True)
+    geometry = Column(Geometry('GEOMETRY', srid=4326, spatial_index=False), nullable=False)
+    properties = Column(JSONB)
+
+Index('idx_spatial_layer_features_geometry', SpatialLayerFeature.geometry, postgresql_using='gist')
\ No newline at end of file
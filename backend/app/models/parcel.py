@@ -1,15 +1,31 @@
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Text, Index
+from sqlalchemy import Column, Integer, String, Numeric, Float, DateTime, Text, Index, Computed, ForeignKey
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
 from geoalchemy2 import Geometry
 from app.core.database import Base
 
+# Weighted full-text document for "search everything"; 'simple' keeps
+# names and plot numbers unstemmed
+PARCEL_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(parcel_id, '') || ' ' || coalesce(owner_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(address, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(region, '') || ' ' || coalesce(district, '') || ' ' || coalesce(ward, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(land_use, '') || ' ' || coalesce(zoning, '')), 'D')"
+)
+
 class Parcel(Base):
     __tablename__ = "parcels"
+    # List-partitioned by region, one partition per region plus a default.
+    # Unique keys have to include region; the global ones are in parcel_keys.
+    __table_args__ = {"postgresql_partition_by": "LIST (region)"}
     
-    id = Column(Integer, primary_key=True, index=True)
-    parcel_id = Column(String(50), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    parcel_id = Column(String(50), nullable=False)
     geometry = Column(Geometry('POLYGON', srid=4326), nullable=False)
-    region = Column(String(100), nullable=False, index=True)
+    # Simplified copies served at low zoom, maintained by a database trigger
+    geometry_lod1 = Column(Geometry('GEOMETRY', srid=4326, spatial_index=False))
+    geometry_lod2 = Column(Geometry('GEOMETRY', srid=4326, spatial_index=False))
+    region = Column(String(100), primary_key=True, index=True)
     district = Column(String(100))
     ward = Column(String(100))
     area_sqm = Column(Numeric(15, 2))
@@ -22,10 +38,34 @@ class Parcel(Base):
     valuation = Column(Numeric(15, 2))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    search_vector = Column(TSVECTOR, Computed(PARCEL_SEARCH_VECTOR, persisted=True))
+
+class ParcelKey(Base):
+    __tablename__ = "parcel_keys"
+    
+    # One row per parcel, kept in step with parcels by triggers; foreign
+    # keys to a parcel reference this table
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    parcel_id = Column(String(50), unique=True, nullable=False, index=True)
+    region = Column(String(100), nullable=False)
+
+class ParcelNeighbor(Base):
+    __tablename__ = "parcel_neighbors"
+    
+    # Stored in both directions; maintained by triggers on parcels
+    parcel_id = Column(Integer, ForeignKey('parcel_keys.id', ondelete='CASCADE'), primary_key=True)
+    neighbor_id = Column(Integer, ForeignKey('parcel_keys.id', ondelete='CASCADE'), primary_key=True, index=True)
+    shared_length_m = Column(Float, nullable=False)
+
+Index('ix_parcels_parcel_id', Parcel.parcel_id, Parcel.region, unique=True)
 
 # Create spatial index
 Index('idx_parcels_geometry', Parcel.geometry, postgresql_using='gist')
 
+# Full-text index; the pg_trgm indexes used by field search are created
+# by the search migration since they need the extension
+Index('idx_parcels_search_vector', Parcel.search_vector, postgresql_using='gin')
+
 class ShapefileImport(Base):
     __tablename__ = "shapefile_imports"
     
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+import uuid
+
+class ExportSelection(BaseModel):
+    regions: List[str] = []
+    bbox: Optional[List[float]] = Field(None, min_length=4, max_length=4, description="minX,minY,maxX,maxY")
+    search_field: Optional[str] = None
+    search_value: Optional[str] = None
+
+class ExportJobCreate(ExportSelection):
+    format: str = Field(..., pattern="^(geojson|csv|shp|gpkg)$")
+
+class ExportJobResponse(BaseModel):
+    id: uuid.UUID
+    format: str
+    selection: ExportSelection
+    status: str
+    feature_count: Optional[int] = None
+    processed_count: Optional[int] = None
+    progress: Optional[float] = None
+    file_size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
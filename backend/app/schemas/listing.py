@@ -43,6 +43,9 @@ class PlotListingResponse(PlotListingBase):
     class Config:
         from_attributes = True
 
+class PlotListingNearbyResponse(PlotListingResponse):
+    distance_m: float
+
 class PlotInquiryBase(BaseModel):
     customer_name: str
     customer_email: EmailStr
@@ -82,7 +85,9 @@ class ShapefileResponse(BaseModel):
     upload_date: datetime
     processed: bool
     processing_status: str
+    processing_log: Optional[str] = None
     geometry_type: Optional[str] = None
+    coordinate_system: Optional[str] = None
     feature_count: Optional[int] = None
     
     class Config:
@@ -102,8 +107,12 @@ class SpatialLayerResponse(BaseModel):
     name: str
     description: Optional[str] = None
     layer_type: str
+    source_shapefile: Optional[uuid.UUID] = None
+    properties_schema: Optional[Dict[str, Any]] = None
+    style_config: Optional[Dict[str, Any]] = None
     is_public: bool
     created_at: datetime
+    updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
\ No newline at end of file
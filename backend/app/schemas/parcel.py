@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from decimal import Decimal
@@ -50,6 +50,56 @@ class ParcelCollection(BaseModel):
     type: str = "FeatureCollection"
     features: List[ParcelFeature]
     total: int
+    next_cursor: Optional[str] = None
+
+class ParcelBulkCreate(BaseModel):
+    type: str = "FeatureCollection"
+    # Features are validated one by one so a bad feature is reported in
+    # the results instead of rejecting the whole request
+    features: List[Dict[str, Any]]
+
+class ParcelBulkResult(BaseModel):
+    index: int
+    parcel_id: Optional[str] = None
+    status: str  # created, updated, exists or invalid
+    error: Optional[str] = None
+
+class ParcelBulkResponse(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[ParcelBulkResult]
+
+class ParcelPoint(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+
+class ParcelLookupRequest(BaseModel):
+    points: List[ParcelPoint]
+
+class ParcelSummary(BaseModel):
+    parcel_id: str
+    region: str
+    district: Optional[str] = None
+    ward: Optional[str] = None
+    area_sqm: Optional[float] = None
+    land_use: Optional[str] = None
+    zoning: Optional[str] = None
+
+class ParcelNearby(ParcelSummary):
+    distance_m: float
+
+class ParcelNeighborSummary(ParcelSummary):
+    shared_length_m: float
+
+class ParcelLookupResult(BaseModel):
+    index: int
+    lat: float
+    lng: float
+    parcels: List[ParcelSummary]
+
+class ParcelLookupResponse(BaseModel):
+    results: List[ParcelLookupResult]
 
 class SearchParams(BaseModel):
     field: str
@@ -0,0 +1,57 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import or_
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.models.data_version import DataVersion
+
+# Tables whose writes bump only their per-region rows; the version of the
+# whole table is its own (no longer bumped) row plus the sum of those, which
+# grows whenever any region's does
+REGION_VERSIONED_TABLES = ("parcels", "plot_listings")
+
+def region_version_name(table: str, region: str) -> str:
+    """data_versions entry of one region of a table, bumped by triggers on writes touching it"""
+    return f"{table}:region:{region}"
+
+class DataVersionService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_version(self, name: str) -> int:
+        """Get the current data version for a table, 0 if it was never written"""
+        versions, _ = self.get_versions([name])
+        return versions[name]
+
+    def get_versions(self, names: List[str]) -> Tuple[Dict[str, int], Optional[datetime]]:
+        """Get several data versions (0 if never written) and when the latest of them changed"""
+        tables = [name for name in names if name in REGION_VERSIONED_TABLES]
+        rows = (
+            self.db.query(DataVersion.name, DataVersion.version, DataVersion.updated_at)
+            .filter(or_(
+                DataVersion.name.in_(names),
+                *[DataVersion.name.startswith(region_version_name(table, ""), autoescape=True) for table in tables]
+            ))
+            .all()
+        )
+
+        versions = {name: 0 for name in names}
+        last_modified = None
+        for row in rows:
+            if row.name in versions:
+                versions[row.name] += row.version
+            table, scoped, _ = row.name.partition(":region:")
+            if scoped and table in tables:
+                versions[table] += row.version
+            if row.updated_at and (last_modified is None or row.updated_at > last_modified):
+                last_modified = row.updated_at
+
+        return versions, last_modified
+
+    def get_scoped_versions(self, tables: List[str], regions: Optional[List[str]] = None) -> Tuple[Dict[str, int], Optional[datetime]]:
+        """Versions of whole tables, or only of the given regions of them"""
+        if regions:
+            names = [region_version_name(table, region) for table in tables for region in regions]
+        else:
+            names = list(tables)
+        return self.get_versions(names)
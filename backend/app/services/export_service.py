@@ -0,0 +1,340 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Optional, List, Dict, Any, Iterator, Tuple
+from datetime import datetime
+import json
+import os
+import shutil
+import tempfile
+import uuid
+import zipfile
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models.export_job import ExportJob
+from app.schemas.export import ExportJobCreate
+from app.services.parcel_service import ParcelService, properties_json_sql
+
+EXPORT_EXTENSIONS = {
+    "geojson": ".geojson",
+    "csv": ".csv",
+    "shp": ".zip",
+    "gpkg": ".gpkg",
+}
+
+EXPORT_MEDIA_TYPES = {
+    "geojson": "application/geo+json",
+    "csv": "text/csv",
+    "shp": "application/zip",
+    "gpkg": "application/geopackage+sqlite3",
+}
+
+# Attribute columns written by the shapefile and GeoPackage exports, as
+# (column, fiona type, shapefile field name); shapefile names are limited
+# to 10 characters
+EXPORT_FIELDS = [
+    ("parcel_id", "str:50", "parcel_id"),
+    ("region", "str:100", "region"),
+    ("district", "str:100", "district"),
+    ("ward", "str:100", "ward"),
+    ("area_sqm", "float", "area_sqm"),
+    ("perimeter_m", "float", "perim_m"),
+    ("owner_name", "str:255", "owner_name"),
+    ("owner_id", "str:50", "owner_id"),
+    ("address", "str:254", "address"),
+    ("land_use", "str:100", "land_use"),
+    ("zoning", "str:50", "zoning"),
+    ("valuation", "float", "valuation"),
+]
+
+# processed_count is written back after this many features
+PROGRESS_INTERVAL = 10000
+
+# Rows fetched per round trip when writing with fiona
+EXPORT_BATCH_SIZE = 2000
+
+def export_file_path(job: ExportJob) -> str:
+    return os.path.join(settings.export_dir, job.filename)
+
+def read_export_range(job: ExportJob, start: int, end: int, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+    """Read bytes start..end (inclusive) of a finished export; needs no database session"""
+    with open(export_file_path(job), "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+class ExportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(self, job_data: ExportJobCreate, created_by: uuid.UUID) -> ExportJob:
+        """Register an export job; run_export does the work"""
+        selection = job_data.model_dump(exclude={"format"})
+        # Validate the selection now rather than in the background job
+        ParcelService(self.db).selection_clause(
+            selection["regions"], selection["bbox"], selection["search_field"], selection["search_value"]
+        )
+
+        job = ExportJob(
+            format=job_data.format,
+            selection=selection,
+            status="pending",
+            created_by=created_by
+        )
+
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+
+        return job
+
+    def get_job(self, job_id: uuid.UUID) -> Optional[ExportJob]:
+        """Get an export job with its progress"""
+        return self.db.query(ExportJob).filter(ExportJob.id == job_id).first()
+
+    def get_jobs(self, created_by: uuid.UUID, limit: int = 50) -> List[ExportJob]:
+        """Get a user's export jobs, newest first"""
+        return (
+            self.db.query(ExportJob)
+            .filter(ExportJob.created_by == created_by)
+            .order_by(ExportJob.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+
+def run_export(job_id: uuid.UUID):
+    """Write an export job's parcels to a file in settings.export_dir
+
+    GeoJSON and CSV are produced by PostgreSQL with COPY ... TO STDOUT and
+    written straight to disk; shapefiles and GeoPackages are written with
+    fiona from a server-side cursor. The file is written under a temporary
+    name and renamed when complete. Meant to run outside the request, e.g.
+    from a BackgroundTasks job.
+    """
+    job = _update_job(job_id)
+    if job is None:
+        return
+
+    os.makedirs(settings.export_dir, exist_ok=True)
+    filename = f"{job.id}{EXPORT_EXTENSIONS[job.format]}"
+    path = os.path.join(settings.export_dir, filename)
+
+    db = SessionLocal()
+    try:
+        selection = job.selection
+        where, params = ParcelService(db).selection_clause(
+            selection.get("regions"), selection.get("bbox"),
+            selection.get("search_field"), selection.get("search_value")
+        )
+        feature_count = db.execute(text(f"SELECT count(*) FROM parcels WHERE {where}"), params).scalar()
+    except Exception as e:
+        _update_job(job_id, status="failed", error=str(e))
+        return
+    finally:
+        db.close()
+
+    _update_job(job_id, status="processing", feature_count=feature_count, processed_count=0)
+
+    progress = _ProgressCounter(job_id)
+    tmp_path = path + ".part"
+    try:
+        if job.format == "geojson":
+            _export_geojson(where, params, tmp_path, progress)
+        elif job.format == "csv":
+            _export_csv(where, params, tmp_path, progress)
+        else:
+            _export_fiona(job.format, where, params, tmp_path, progress)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        _update_job(job_id, status="failed", error=str(e))
+        return
+
+    _update_job(
+        job_id,
+        status="completed",
+        filename=filename,
+        file_size=os.path.getsize(path),
+        processed_count=progress.count,
+        completed_at=datetime.utcnow()
+    )
+
+class _ProgressCounter:
+    """Counts written features and stores the count every PROGRESS_INTERVAL"""
+
+    def __init__(self, job_id: uuid.UUID):
+        self.job_id = job_id
+        self.count = 0
+        self.reported = 0
+
+    def add(self, count: int):
+        self.count += count
+        if self.count - self.reported >= PROGRESS_INTERVAL:
+            self.reported = self.count
+            _update_job(self.job_id, processed_count=self.count)
+
+class _LineJoiningWriter:
+    """File-like COPY target that joins one-JSON-value-per-line output with commas"""
+
+    def __init__(self, out, progress: _ProgressCounter):
+        self.out = out
+        self.progress = progress
+        self.rows = 0
+        self.at_line_start = True
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+
+        parts = data.split(b"\n")
+        for i, part in enumerate(parts):
+            if i > 0:
+                # The previous part ended a row
+                self.rows += 1
+                self.progress.add(1)
+                self.at_line_start = True
+            if part:
+                if self.at_line_start and self.rows:
+                    self.out.write(b",\n")
+                self.out.write(part)
+                self.at_line_start = False
+
+class _LineCountingWriter:
+    """File-like COPY target that counts rows as they are written"""
+
+    def __init__(self, out, progress: _ProgressCounter):
+        self.out = out
+        self.progress = progress
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        self.out.write(data)
+        self.progress.add(data.count(b"\n"))
+
+def _copy_sql(query: str, params: Dict[str, Any], options: str) -> Tuple[Any, str]:
+    """Open a raw connection and inline the parameters of a COPY (query) TO STDOUT
+
+    COPY does not accept bind parameters, so they are rendered client-side
+    by psycopg2's mogrify, which quotes them safely.
+    """
+    compiled = text(query).compile(dialect=engine.dialect)
+    connection = engine.raw_connection()
+    cursor = connection.cursor()
+    select = cursor.mogrify(compiled.string, params).decode()
+    return connection, f"COPY ({select}) TO STDOUT WITH ({options})"
+
+def _export_geojson(where: str, params: Dict[str, Any], path: str, progress: _ProgressCounter):
+    # A delimiter and quote that never occur in JSON make CSV COPY emit each
+    # feature verbatim, one per line
+    query = f"""
+        SELECT json_build_object(
+            'type', 'Feature',
+            'id', parcel_id,
+            'geometry', ST_AsGeoJSON(geometry)::json,
+            'properties', {properties_json_sql()}
+        )::text
+        FROM parcels
+        WHERE {where}
+        ORDER BY id
+    """
+    connection, copy = _copy_sql(query, params, "FORMAT csv, DELIMITER E'\\x1f', QUOTE E'\\x1e'")
+    try:
+        with open(path, "wb") as out:
+            out.write(b'{"type":"FeatureCollection","features":[\n')
+            connection.cursor().copy_expert(copy, _LineJoiningWriter(out, progress))
+            out.write(b'\n]}\n')
+    finally:
+        connection.close()
+
+def _export_csv(where: str, params: Dict[str, Any], path: str, progress: _ProgressCounter):
+    columns = ", ".join(column for column, _, _ in EXPORT_FIELDS)
+    query = f"""
+        SELECT {columns}, created_at, updated_at, ST_AsText(geometry) AS wkt
+        FROM parcels
+        WHERE {where}
+        ORDER BY id
+    """
+    connection, copy = _copy_sql(query, params, "FORMAT csv, HEADER")
+    try:
+        with open(path, "wb") as out:
+            connection.cursor().copy_expert(copy, _LineCountingWriter(out, progress))
+    finally:
+        connection.close()
+
+def _export_fiona(fmt: str, where: str, params: Dict[str, Any], path: str, progress: _ProgressCounter):
+    # Deferred so that only export jobs load GDAL
+    import fiona
+
+    shapefile = fmt == "shp"
+    names = [shp_name if shapefile else column for column, _, shp_name in EXPORT_FIELDS]
+    schema = {
+        "geometry": "Polygon",
+        "properties": {name: field_type for name, (_, field_type, _) in zip(names, EXPORT_FIELDS)},
+    }
+
+    columns = ", ".join(column for column, _, _ in EXPORT_FIELDS)
+    query = text(f"""
+        SELECT {columns}, ST_AsGeoJSON(geometry) AS geometry
+        FROM parcels
+        WHERE {where}
+        ORDER BY id
+    """)
+
+    workdir = tempfile.mkdtemp(dir=settings.export_dir)
+    target = os.path.join(workdir, "parcels.shp" if shapefile else "parcels.gpkg")
+
+    db = SessionLocal()
+    try:
+        result = db.execute(query, params, execution_options={"stream_results": True, "yield_per": EXPORT_BATCH_SIZE})
+        driver = "ESRI Shapefile" if shapefile else "GPKG"
+        with fiona.open(target, "w", driver=driver, crs="EPSG:4326", schema=schema, layer="parcels") as dst:
+            for rows in result.partitions():
+                dst.writerecords([
+                    {
+                        "type": "Feature",
+                        "geometry": json.loads(row.geometry),
+                        "properties": _record_properties(row, names),
+                    }
+                    for row in rows
+                ])
+                progress.add(len(rows))
+
+        if shapefile:
+            with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+                for name in os.listdir(workdir):
+                    archive.write(os.path.join(workdir, name), name)
+        else:
+            shutil.move(target, path)
+    finally:
+        db.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def _record_properties(row, names: List[str]) -> Dict[str, Any]:
+    properties = {}
+    for name, (column, field_type, _) in zip(names, EXPORT_FIELDS):
+        value = getattr(row, column)
+        properties[name] = float(value) if field_type == "float" and value is not None else value
+    return properties
+
+def _update_job(job_id: uuid.UUID, **fields) -> Optional[ExportJob]:
+    """Update an export job in its own short transaction"""
+    db = SessionLocal()
+    try:
+        job = db.query(ExportJob).filter(ExportJob.id == job_id).first()
+        if job is None:
+            return None
+        for field, value in fields.items():
+            setattr(job, field, value)
+        db.commit()
+        db.refresh(job)
+        db.expunge(job)
+        return job
+    finally:
+        db.close()
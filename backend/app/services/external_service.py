@@ -1,33 +1,90 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import desc, text
 from typing import Dict, Any, List
+import json
 import uuid
 from datetime import datetime
 
-from app.models.listing import PlotListing, PlotInquiry
-from app.models.parcel import Parcel
+from app.models.listing import PlotListing, PlotInquiry, RegionListingSummary
+
+# Same aggregate as refresh_region_listing_summaries() in the database
+REGION_SUMMARY_SQL = """
+    SELECT
+        p.region,
+        count(*) AS available_plots,
+        min(l.price) AS min_price,
+        max(l.price) AS max_price,
+        avg(l.price) AS avg_price,
+        sum(p.area_sqm) AS total_area_sqm
+    FROM plot_listings l
+    JOIN parcels p ON p.id = l.parcel_id
+    WHERE l.status = 'active'
+    GROUP BY p.region
+"""
+
+# Percentiles reported by get_plot_statistics, and the number of equal-width
+# buckets between the minimum and maximum in its histograms
+STATISTICS_PERCENTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+HISTOGRAM_BUCKETS = 10
+
+def _summary_columns(column: str) -> str:
+    """min/max/avg/percentile select list for one column of the `active` CTE"""
+    percentiles = ", ".join(str(p) for p in STATISTICS_PERCENTILES)
+    return f"""
+        min({column}) AS {column}_min,
+        max({column}) AS {column}_max,
+        avg({column}) AS {column}_avg,
+        percentile_cont(ARRAY[{percentiles}]) WITHIN GROUP (ORDER BY {column}) AS {column}_percentiles"""
+
+def _histogram_column(column: str) -> str:
+    """Per-bucket counts of one column, an array of HISTOGRAM_BUCKETS integers"""
+    return f"""(
+        SELECT array_agg(COALESCE(counts.plots, 0) ORDER BY buckets.bucket)
+        FROM generate_series(1, {HISTOGRAM_BUCKETS}) AS buckets(bucket)
+        LEFT JOIN (
+            SELECT
+                CASE WHEN totals.{column}_max > totals.{column}_min
+                    THEN LEAST(width_bucket({column}, totals.{column}_min, totals.{column}_max, {HISTOGRAM_BUCKETS}), {HISTOGRAM_BUCKETS})
+                    ELSE 1
+                END AS bucket,
+                count(*) AS plots
+            FROM active
+            WHERE {column} IS NOT NULL
+            GROUP BY 1
+        ) counts ON counts.bucket = buckets.bucket
+    ) AS {column}_histogram"""
+
+def _summary(row, column: str) -> Dict[str, Any]:
+    percentiles = row[f"{column}_percentiles"] or [None] * len(STATISTICS_PERCENTILES)
+    return {
+        'min': float(row[f"{column}_min"] or 0),
+        'max': float(row[f"{column}_max"] or 0),
+        'average': float(row[f"{column}_avg"] or 0),
+        'median': float(percentiles[STATISTICS_PERCENTILES.index(0.5)] or 0),
+        'percentiles': {
+            f"p{round(p * 100)}": float(value or 0) for p, value in zip(STATISTICS_PERCENTILES, percentiles)
+        }
+    }
+
+def _histogram(row, column: str) -> List[Dict[str, Any]]:
+    """Bucket bounds and counts; the last bucket includes the maximum"""
+    low = float(row[f"{column}_min"] or 0)
+    width = (float(row[f"{column}_max"] or 0) - low) / HISTOGRAM_BUCKETS
+    return [
+        {'min': low + width * i, 'max': low + width * (i + 1), 'count': count}
+        for i, count in enumerate(row[f"{column}_histogram"] or [])
+    ]
 
 class ExternalApiService:
     def __init__(self, db: Session):
         self.db = db
     
     def get_regions_summary(self) -> List[Dict[str, Any]]:
-        """Get summary of available regions with plot counts"""
-        query = self.db.query(
-            Parcel.region,
-            func.count(PlotListing.id).label('available_plots'),
-            func.min(PlotListing.price).label('min_price'),
-            func.max(PlotListing.price).label('max_price'),
-            func.avg(PlotListing.price).label('avg_price'),
-            func.sum(Parcel.area_sqm).label('total_area')
-        ).join(
-            PlotListing, Parcel.id == PlotListing.parcel_id
-        ).filter(
-            PlotListing.status == 'active'
-        ).group_by(Parcel.region).all()
+        """Get summary of available regions with plot counts from the region rollup"""
+        summaries = self.db.query(RegionListingSummary).order_by(RegionListingSummary.region).all()
         
         regions = []
-        for row in query:
+        for row in summaries:
             regions.append({
                 'region': row.region,
                 'available_plots': row.available_plots,
@@ -36,56 +93,126 @@ class ExternalApiService:
                     'max': float(row.max_price) if row.max_price else 0,
                     'average': float(row.avg_price) if row.avg_price else 0
                 },
-                'total_area_sqm': float(row.total_area) if row.total_area else 0
+                'total_area_sqm': float(row.total_area_sqm) if row.total_area_sqm else 0
             })
         
         return regions
     
+    def check_region_summaries(self) -> List[str]:
+        """Regions whose rollup row differs from a fresh aggregate of the base tables"""
+        query = text(f"""
+            WITH fresh AS ({REGION_SUMMARY_SQL})
+            SELECT COALESCE(f.region, s.region) AS region
+            FROM fresh f
+            FULL JOIN region_listing_summaries s ON s.region = f.region
+            WHERE (f.available_plots, f.min_price, f.max_price, f.avg_price, f.total_area_sqm)
+                IS DISTINCT FROM (s.available_plots, s.min_price, s.max_price, s.avg_price, s.total_area_sqm)
+            ORDER BY 1
+        """)
+        return list(self.db.execute(query).scalars())
+    
+    def rebuild_region_summaries(self) -> int:
+        """Recompute every region's rollup rows from the base tables; returns the number of regions
+
+        Blocks listing and parcel writers until it commits.
+        """
+        regions = self.db.execute(text("""
+            SELECT array_agg(region) FROM (
+                SELECT region FROM region_listing_summaries
+                UNION
+                SELECT DISTINCT p.region FROM plot_listings l JOIN parcels p ON p.id = l.parcel_id
+            ) r
+        """)).scalar() or []
+        self.db.execute(text("SELECT refresh_region_listing_summaries(:regions)"), {"regions": regions})
+        self.db.commit()
+        return len(regions)
+    
     def get_plot_statistics(self, region: str = None) -> Dict[str, Any]:
-        """Get plot statistics for external integration"""
-        query = self.db.query(PlotListing).join(Parcel).filter(PlotListing.status == 'active')
+        """Get plot statistics for external integration
         
-        if region:
-            query = query.filter(Parcel.region == region)
+        Everything is computed by one aggregate query over active listings
+        joined to their parcels, so the cost stays a single round trip
+        however many listings there are.
+        """
+        region_filter = "AND p.region = :region" if region else ""
+        row = self.db.execute(text(f"""
+            WITH active AS (
+                SELECT
+                    l.price,
+                    l.featured,
+                    -- Zero areas are left out of the area statistics, as unknown ones are
+                    NULLIF(p.area_sqm, 0) AS area_sqm,
+                    COALESCE(l.price_per_sqm, l.price / NULLIF(p.area_sqm, 0)) AS price_per_sqm,
+                    COALESCE(p.land_use, 'Unknown') AS land_use
+                FROM plot_listings l
+                JOIN parcels p ON p.id = l.parcel_id
+                WHERE l.status = 'active' {region_filter}
+            ),
+            totals AS (
+                SELECT
+                    count(*) AS total_plots,
+                    count(*) FILTER (WHERE featured) AS featured_plots,
+                    {_summary_columns("price")},
+                    {_summary_columns("area_sqm")},
+                    sum(area_sqm) AS area_sqm_total,
+                    {_summary_columns("price_per_sqm")}
+                FROM active
+            )
+            SELECT
+                totals.*,
+                (
+                    SELECT json_object_agg(land_use, plots)::text
+                    FROM (SELECT land_use, count(*) AS plots FROM active GROUP BY land_use) land_uses
+                ) AS land_use_distribution,
+                {_histogram_column("price")},
+                {_histogram_column("area_sqm")}
+            FROM totals
+        """), {"region": region}).mappings().one()
         
-        listings = query.all()
-        
-        if not listings:
+        if not row["total_plots"]:
             return {
                 'total_plots': 0,
                 'region': region,
                 'statistics': {}
             }
         
-        prices = [float(listing.price) for listing in listings]
-        areas = [float(listing.parcel.area_sqm) for listing in listings if listing.parcel.area_sqm]
-        
-        # Land use distribution
-        land_use_dist = {}
-        for listing in listings:
-            land_use = listing.parcel.land_use or 'Unknown'
-            land_use_dist[land_use] = land_use_dist.get(land_use, 0) + 1
-        
-        # Featured plots count
-        featured_count = sum(1 for listing in listings if listing.featured)
+        price = _summary(row, "price")
+        area = _summary(row, "area_sqm")
+        price_per_sqm = _summary(row, "price_per_sqm")
         
         return {
-            'total_plots': len(listings),
+            'total_plots': row["total_plots"],
             'region': region,
-            'featured_plots': featured_count,
+            'featured_plots': row["featured_plots"],
             'price_statistics': {
-                'min_price': min(prices) if prices else 0,
-                'max_price': max(prices) if prices else 0,
-                'average_price': sum(prices) / len(prices) if prices else 0,
+                'min_price': price['min'],
+                'max_price': price['max'],
+                'average_price': price['average'],
+                'median_price': price['median'],
+                'percentiles': price['percentiles'],
                 'currency': 'TZS'
             },
             'area_statistics': {
-                'min_area_sqm': min(areas) if areas else 0,
-                'max_area_sqm': max(areas) if areas else 0,
-                'average_area_sqm': sum(areas) / len(areas) if areas else 0,
-                'total_area_sqm': sum(areas) if areas else 0
+                'min_area_sqm': area['min'],
+                'max_area_sqm': area['max'],
+                'average_area_sqm': area['average'],
+                'median_area_sqm': area['median'],
+                'percentiles': area['percentiles'],
+                'total_area_sqm': float(row["area_sqm_total"] or 0)
+            },
+            'price_per_sqm_statistics': {
+                'min_price_per_sqm': price_per_sqm['min'],
+                'max_price_per_sqm': price_per_sqm['max'],
+                'average_price_per_sqm': price_per_sqm['average'],
+                'median_price_per_sqm': price_per_sqm['median'],
+                'percentiles': price_per_sqm['percentiles'],
+                'currency': 'TZS'
+            },
+            'histograms': {
+                'price': _histogram(row, "price"),
+                'area_sqm': _histogram(row, "area_sqm")
             },
-            'land_use_distribution': land_use_dist,
+            'land_use_distribution': json.loads(row["land_use_distribution"] or "{}"),
             'last_updated': datetime.utcnow().isoformat()
         }
     
@@ -137,8 +264,9 @@ class ExternalApiService:
                     'description': 'Get available plots with filtering',
                     'parameters': [
                         'region', 'min_price', 'max_price', 'min_area', 'max_area', 
-                        'featured_only', 'limit', 'offset'
-                    ]
+                        'featured_only', 'limit', 'cursor'
+                    ],
+                    'pagination': 'Pass the X-Next-Cursor response header as cursor to get the next page'
                 },
                 'get_plot_details': {
                     'method': 'GET',
@@ -0,0 +1,557 @@
+from sqlalchemy.orm import Session
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional, List, Dict, Any, Iterator, Callable, Tuple
+from datetime import datetime
+import csv
+import io
+import itertools
+import json
+import os
+import uuid
+
+import fiona
+from fiona.transform import transform_geom
+import shapely
+from shapely.geometry import shape
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models.listing import ShapefileData, SpatialLayer
+from app.services.layer_service import layer_version_name
+from app.services.validation_service import GeometryValidator, VALID, INVALID
+
+TARGET_CRS = "EPSG:4326"
+
+# Upload extensions we can open with fiona, and the file_type recorded for them
+SUPPORTED_FILE_TYPES = {
+    ".zip": "shapefile",
+    ".gpkg": "geopackage",
+}
+
+# Parcel columns that can be filled from feature properties
+PARCEL_FIELDS = [
+    "parcel_id", "region", "district", "ward", "area_sqm", "perimeter_m",
+    "owner_name", "owner_id", "address", "land_use", "zoning", "valuation"
+]
+
+# Only the first errors are written to processing_log; the rest are counted
+MAX_LOGGED_ERRORS = 100
+
+# Imports smaller than this validate in-process instead of starting a pool
+PARALLEL_VALIDATION_MIN_FEATURES = 20000
+
+async def store_upload(upload: UploadFile) -> Tuple[str, int]:
+    """Save an uploaded zipped shapefile or GeoPackage under upload_dir; returns the stored filename and size"""
+    extension = os.path.splitext(upload.filename or "")[1].lower()
+    if extension not in SUPPORTED_FILE_TYPES:
+        raise ValueError("Upload must be a zipped shapefile (.zip) or a GeoPackage (.gpkg)")
+
+    os.makedirs(settings.upload_dir, exist_ok=True)
+    filename = f"{uuid.uuid4()}{extension}"
+    path = os.path.join(settings.upload_dir, filename)
+
+    # Disk writes block, so they go to the threadpool like UploadFile's own reads
+    file_size = 0
+    out = await run_in_threadpool(open, path, "wb")
+    try:
+        while chunk := await upload.read(1024 * 1024):
+            await run_in_threadpool(out.write, chunk)
+            file_size += len(chunk)
+    finally:
+        await run_in_threadpool(out.close)
+
+    return filename, file_size
+
+class ImportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_import(
+        self,
+        filename: str,
+        original_name: Optional[str],
+        file_size: int,
+        uploaded_by: uuid.UUID,
+        coordinate_system: Optional[str] = None,
+        layer: Optional[str] = None,
+        field_map: Optional[Dict[str, str]] = None
+    ) -> ShapefileData:
+        """Register a file saved by store_upload for import"""
+        shapefile = ShapefileData(
+            filename=filename,
+            original_name=original_name,
+            file_size=file_size,
+            file_type=SUPPORTED_FILE_TYPES[os.path.splitext(filename)[1]],
+            uploaded_by=uploaded_by,
+            processing_status="pending",
+            coordinate_system=coordinate_system,
+            file_metadata={"layer": layer, "field_map": field_map or {}}
+        )
+
+        self.db.add(shapefile)
+        self.db.commit()
+        self.db.refresh(shapefile)
+
+        return shapefile
+
+    def get_import(self, import_id: uuid.UUID) -> Optional[ShapefileData]:
+        """Get an import with its progress"""
+        return self.db.query(ShapefileData).filter(ShapefileData.id == import_id).first()
+
+def run_parcel_import(import_id: uuid.UUID):
+    """Load an uploaded file into parcels
+
+    Features are read in chunks with fiona, reprojected to EPSG:4326,
+    validated (and repaired with make_valid where possible) on a process
+    pool, COPYed into a temporary staging table and merged into parcels in a
+    single transaction (upserting on parcel_id). Overlaps with each other and
+    with existing parcels are found with indexed `&&` joins in the database,
+    confirmed on the pool batch by batch and written, with the validation
+    results, to a per-feature NDJSON report next to the upload
+    (file_metadata["validation_report"]). Progress and per-feature errors are
+    recorded on the ShapefileData row from a separate session so they are
+    visible while the load is running. Meant to run outside the request, e.g.
+    from a BackgroundTasks job.
+    """
+    progress = ImportProgress(import_id)
+    if progress.shapefile is None:
+        return
+
+    def load(cursor, source, source_crs, options) -> str:
+        field_map = _field_map(source.schema["properties"].keys(), options.get("field_map") or {})
+        _create_staging_table(cursor)
+
+        workers = settings.validation_workers or None
+        if len(source) < PARALLEL_VALIDATION_MIN_FEATURES:
+            workers = 1
+
+        with GeometryValidator(workers) as validator:
+            for chunk_number, features in enumerate(_chunks(source, settings.import_chunk_size)):
+                offset = chunk_number * settings.import_chunk_size
+                rows = _prepare_rows(features, offset, source_crs, field_map, validator, progress)
+                _copy_rows(cursor, "parcel_import_staging", ["feature_index", "geometry"] + PARCEL_FIELDS, rows)
+                progress.loaded(len(features), len(rows))
+
+            _detect_overlaps(cursor, validator, progress.report)
+
+        report_name = f"{progress.shapefile.filename}.validation.ndjson"
+        progress.report.write(os.path.join(settings.upload_dir, report_name))
+        progress.set_metadata(validation_report=report_name)
+
+        return f"Merged {_merge_staging(cursor)} parcels; {progress.report.summary()}"
+
+    _run_import(progress, load)
+
+def run_layer_import(layer_id: uuid.UUID):
+    """Replace a spatial layer's features with those of its source ShapefileData
+
+    Any geometry type is accepted and all attributes are kept as JSON
+    properties. The old features are deleted, the new ones COPYed in and the
+    layer's data version bumped in one transaction, so cached tiles of the
+    layer are invalidated exactly when the new features become visible.
+    """
+    db = SessionLocal()
+    try:
+        layer = db.query(SpatialLayer).filter(SpatialLayer.id == layer_id).first()
+        import_id = layer.source_shapefile if layer else None
+    finally:
+        db.close()
+
+    if import_id is None:
+        return
+    progress = ImportProgress(import_id)
+    if progress.shapefile is None:
+        return
+
+    def load(cursor, source, source_crs, options) -> str:
+        cursor.execute("DELETE FROM spatial_layer_features WHERE layer_id = %s", (str(layer_id),))
+
+        loaded = 0
+        for chunk_number, features in enumerate(_chunks(source, settings.import_chunk_size)):
+            offset = chunk_number * settings.import_chunk_size
+            rows = _prepare_layer_rows(features, offset, source_crs, layer_id, progress)
+            _copy_rows(cursor, "spatial_layer_features", ["layer_id", "geometry", "properties"], rows)
+            progress.loaded(len(features), len(rows))
+            loaded += len(rows)
+
+        cursor.execute(
+            "UPDATE spatial_layers SET properties_schema = %s, updated_at = now() WHERE id = %s",
+            (json.dumps(dict(source.schema["properties"])), str(layer_id))
+        )
+        cursor.execute("""
+            INSERT INTO data_versions (name, version) VALUES (%s, 1)
+            ON CONFLICT (name) DO UPDATE SET version = data_versions.version + 1, updated_at = now()
+        """, (layer_version_name(layer_id),))
+
+        return f"Loaded {loaded} features into layer {layer_id}"
+
+    _run_import(progress, load)
+
+def _run_import(progress: "ImportProgress", load: Callable[..., str]):
+    """Open the upload behind `progress` and run `load` in one database transaction"""
+    shapefile = progress.shapefile
+    path = os.path.join(settings.upload_dir, shapefile.filename)
+    uri = f"zip://{os.path.abspath(path)}" if shapefile.file_type == "shapefile" else path
+    options = shapefile.file_metadata or {}
+
+    connection = engine.raw_connection()
+    try:
+        with fiona.open(uri, layer=options.get("layer")) as source:
+            source_crs = shapefile.coordinate_system or source.crs_wkt
+            if not source_crs:
+                raise ValueError("Source has no coordinate system; pass coordinate_system")
+            if not shapefile.coordinate_system and source.crs.to_epsg() == 4326:
+                source_crs = TARGET_CRS
+
+            progress.start(
+                feature_count=len(source),
+                geometry_type=source.schema.get("geometry"),
+                coordinate_system=shapefile.coordinate_system or source.crs.to_string()
+            )
+
+            summary = load(connection.cursor(), source, source_crs, options)
+            connection.commit()
+    except Exception as e:
+        connection.rollback()
+        progress.fail(str(e))
+        return
+    finally:
+        connection.close()
+
+    progress.complete(summary)
+
+class ValidationReport:
+    """Per-feature validation results of a parcel import, written as NDJSON
+
+    Only staged features and their issues are kept in memory; every
+    feature gets a line in the report, in source order.
+    """
+
+    def __init__(self):
+        self.staged_indexes: List[int] = []
+        self.staged_ids: List[str] = []
+        self.issues: Dict[int, Dict[str, Any]] = {}
+        self.counts: Dict[str, int] = {}
+
+    def staged(self, index: int, parcel_id: str, status: str, reason: Optional[str] = None):
+        self.staged_indexes.append(index)
+        self.staged_ids.append(parcel_id)
+        if status != VALID:
+            self._issue(index, parcel_id, status, reason)
+
+    def rejected(self, index: int, parcel_id: Optional[str], status: str, reason: str):
+        self._issue(index, parcel_id, status, reason)
+
+    def overlap(self, index: int, parcel_id: str, other_parcel_id: str):
+        """Record an overlap for the staged feature at source `index`"""
+        issue = self.issues.get(index) or self._issue(index, parcel_id, VALID, None)
+        if not issue["overlaps"]:
+            self.counts["overlapping"] = self.counts.get("overlapping", 0) + 1
+        issue["overlaps"].append(other_parcel_id)
+
+    def summary(self) -> str:
+        if not self.counts:
+            return "all geometries valid, no overlaps"
+        return ", ".join(f"{count} {status}" for status, count in sorted(self.counts.items()))
+
+    def write(self, path: str):
+        staged = dict(zip(self.staged_indexes, self.staged_ids))
+        with open(path, "w") as out:
+            for index in sorted(staged.keys() | self.issues.keys()):
+                entry = self.issues.get(index) or {
+                    "index": index, "parcel_id": staged[index], "status": VALID, "reason": None, "overlaps": []
+                }
+                out.write(json.dumps(entry) + "\n")
+
+    def _issue(self, index: int, parcel_id: Optional[str], status: str, reason: Optional[str]) -> Dict[str, Any]:
+        if status != VALID:
+            self.counts[status] = self.counts.get(status, 0) + 1
+        issue = {"index": index, "parcel_id": parcel_id, "status": status, "reason": reason, "overlaps": []}
+        self.issues[index] = issue
+        return issue
+
+class ImportProgress:
+    """Writes import progress to shapefile_data in its own short transactions"""
+
+    def __init__(self, import_id: uuid.UUID):
+        self.import_id = import_id
+        self.read = 0
+        self.staged = 0
+        self.errors: List[str] = []
+        self.error_count = 0
+        self.report = ValidationReport()
+        self.shapefile = self._update()
+
+    def start(self, **fields):
+        self._update(processing_status="processing", processing_log=self._log("Import started"), **fields)
+
+    def error(self, index: int, message: str, status: str = "skipped", parcel_id: Optional[str] = None):
+        self.error_count += 1
+        self.report.rejected(index, parcel_id, status, message)
+        if len(self.errors) < MAX_LOGGED_ERRORS:
+            self.errors.append(f"Feature {index}: {message}")
+
+    def set_metadata(self, **values):
+        self.shapefile = self._update(file_metadata={**(self.shapefile.file_metadata or {}), **values})
+
+    def loaded(self, read: int, staged: int):
+        self.read += read
+        self.staged += staged
+        self._update(processing_log=self._log(f"Read {self.read} features, staged {self.staged}"))
+
+    def complete(self, summary: str):
+        self._update(
+            processed=True,
+            processing_status="completed" if not self.error_count else "completed_with_errors",
+            processing_log=self._log(summary)
+        )
+
+    def fail(self, message: str):
+        self._update(processing_status="failed", processing_log=self._log(f"Import failed: {message}"))
+
+    def _log(self, message: str) -> str:
+        lines = [f"{datetime.utcnow().isoformat()} {message}"]
+        if self.error_count:
+            lines.append(f"{self.error_count} features skipped:")
+            lines.extend(self.errors)
+            if self.error_count > len(self.errors):
+                lines.append(f"... and {self.error_count - len(self.errors)} more")
+        return "\n".join(lines)
+
+    def _update(self, **fields) -> Optional[ShapefileData]:
+        db = SessionLocal()
+        try:
+            shapefile = db.query(ShapefileData).filter(ShapefileData.id == self.import_id).first()
+            if shapefile is None:
+                return None
+            for field, value in fields.items():
+                setattr(shapefile, field, value)
+            db.commit()
+            db.refresh(shapefile)
+            db.expunge(shapefile)
+            return shapefile
+        finally:
+            db.close()
+
+def _chunks(source, size: int) -> Iterator[List[Any]]:
+    iterator = iter(source)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+def _field_map(source_fields, overrides: Dict[str, str]) -> Dict[str, str]:
+    """Map parcel columns to source property names, matching names case-insensitively"""
+    by_name = {name.lower(): name for name in source_fields}
+    field_map = {field: by_name[field] for field in PARCEL_FIELDS if field in by_name}
+    field_map.update({target: source for source, target in overrides.items() if target in PARCEL_FIELDS})
+
+    missing = [field for field in ("parcel_id", "region") if field not in field_map]
+    if missing:
+        raise ValueError(f"Source has no field for: {', '.join(missing)}")
+
+    return field_map
+
+def _reproject(features, source_crs) -> List[Any]:
+    """Geometries of a chunk of features in EPSG:4326, transformed in one call"""
+    geometries = [feature.geometry for feature in features]
+    if source_crs != TARGET_CRS:
+        geometries = transform_geom(source_crs, TARGET_CRS, geometries)
+    return geometries
+
+def _prepare_rows(
+    features,
+    offset: int,
+    source_crs,
+    field_map: Dict[str, str],
+    validator: GeometryValidator,
+    progress: ImportProgress
+) -> List[List[Any]]:
+    """Reproject and validate a chunk of features into staging rows"""
+    geometries = _reproject(features, source_crs)
+
+    candidates = []
+    polygons = []
+    for index, (feature, geometry) in enumerate(zip(features, geometries), start=offset):
+        try:
+            polygon = _to_polygon(geometry)
+        except ValueError as e:
+            progress.error(index, str(e))
+            continue
+
+        properties = feature.properties
+        values = {field: properties.get(source) for field, source in field_map.items()}
+        if not values.get("parcel_id") or not values.get("region"):
+            progress.error(index, "missing parcel_id or region")
+            continue
+
+        candidates.append([index, None] + [values.get(field) for field in PARCEL_FIELDS])
+        polygons.append(polygon)
+
+    if not candidates:
+        return []
+
+    wkbs, statuses, reasons = validator.validate(shapely.to_wkb(polygons).tolist())
+
+    rows = []
+    valid_wkbs = []
+    for row, wkb, status, reason in zip(candidates, wkbs, statuses, reasons):
+        index, parcel_id = row[0], str(row[2])
+        if status == INVALID:
+            progress.error(index, f"invalid geometry: {reason}", status=INVALID, parcel_id=parcel_id)
+            continue
+        progress.report.staged(index, parcel_id, status, reason)
+        rows.append(row)
+        valid_wkbs.append(wkb)
+
+    # Hex EWKB for the whole chunk in one vectorized call
+    if rows:
+        ewkbs = shapely.to_wkb(shapely.set_srid(shapely.from_wkb(valid_wkbs), 4326), hex=True, include_srid=True)
+        for row, ewkb in zip(rows, ewkbs):
+            row[1] = ewkb
+
+    return rows
+
+def _detect_overlaps(cursor, validator: GeometryValidator, report: ValidationReport):
+    """Report staged parcels overlapping each other or existing parcels they do not replace
+
+    Candidate pairs come from `&&` joins on the indexed staging table and
+    parcels, streamed from a server-side cursor; each batch is confirmed on
+    the validator's workers, so memory is bounded by the batch rather than
+    by the import or the area it covers.
+    """
+    cursor.execute("CREATE INDEX ON parcel_import_staging USING gist (geometry)")
+    cursor.execute("CREATE INDEX ON parcel_import_staging (parcel_id)")
+    cursor.execute("ANALYZE parcel_import_staging")
+
+    # Repeated rows for one parcel_id collapse into a single parcel on merge,
+    # so they are not overlaps; staged pairs are reported on both features
+    candidates = cursor.connection.cursor(name="parcel_import_overlaps")
+    candidates.itersize = settings.import_chunk_size
+    candidates.execute("""
+        SELECT s.feature_index, s.parcel_id, ST_AsBinary(s.geometry),
+               o.feature_index, o.parcel_id, ST_AsBinary(o.geometry)
+        FROM parcel_import_staging s
+        JOIN parcel_import_staging o
+            ON o.geometry && s.geometry
+            AND o.feature_index > s.feature_index
+            AND o.parcel_id <> s.parcel_id
+        UNION ALL
+        SELECT s.feature_index, s.parcel_id, ST_AsBinary(s.geometry),
+               NULL, p.parcel_id, ST_AsBinary(p.geometry)
+        FROM parcel_import_staging s
+        JOIN parcels p ON p.geometry && s.geometry
+        WHERE NOT EXISTS (SELECT 1 FROM parcel_import_staging x WHERE x.parcel_id = p.parcel_id)
+    """)
+    try:
+        while pairs := candidates.fetchmany(settings.import_chunk_size):
+            flags = validator.confirm_overlaps([bytes(pair[2]) for pair in pairs], [bytes(pair[5]) for pair in pairs])
+            for (index, parcel_id, _, other_index, other_parcel_id, _), flag in zip(pairs, flags):
+                if not flag:
+                    continue
+                report.overlap(index, parcel_id, other_parcel_id)
+                if other_index is not None:
+                    report.overlap(other_index, other_parcel_id, parcel_id)
+    finally:
+        candidates.close()
+
+def _prepare_layer_rows(features, offset: int, source_crs, layer_id: uuid.UUID, progress: ImportProgress) -> List[List[Any]]:
+    """Reproject a chunk of features and turn them into spatial_layer_features rows"""
+    geometries = _reproject(features, source_crs)
+
+    rows = []
+    shapes = []
+    for index, (feature, geometry) in enumerate(zip(features, geometries), start=offset):
+        if geometry is None:
+            progress.error(index, "missing geometry")
+            continue
+
+        rows.append([str(layer_id), None, json.dumps(dict(feature.properties), default=str)])
+        shapes.append(shape(geometry))
+
+    if rows:
+        wkbs = shapely.to_wkb(shapely.set_srid(shapes, 4326), hex=True, include_srid=True)
+        for row, wkb in zip(rows, wkbs):
+            row[1] = wkb
+
+    return rows
+
+def _to_polygon(geometry):
+    if geometry is None:
+        raise ValueError("missing geometry")
+
+    geom = shape(geometry)
+    if geom.geom_type == "MultiPolygon" and len(geom.geoms) == 1:
+        geom = geom.geoms[0]
+    if geom.geom_type != "Polygon":
+        raise ValueError(f"expected Polygon, got {geom.geom_type}")
+
+    return geom
+
+def _create_staging_table(cursor):
+    cursor.execute("""
+        CREATE TEMP TABLE parcel_import_staging (
+            feature_index integer,
+            geometry geometry(POLYGON, 4326),
+            parcel_id varchar(50),
+            region varchar(100),
+            district varchar(100),
+            ward varchar(100),
+            area_sqm numeric(15, 2),
+            perimeter_m numeric(10, 2),
+            owner_name varchar(255),
+            owner_id varchar(50),
+            address text,
+            land_use varchar(100),
+            zoning varchar(50),
+            valuation numeric(15, 2)
+        ) ON COMMIT DROP
+    """)
+
+def _copy_rows(cursor, table: str, columns: List[str], rows: List[List[Any]]):
+    if not rows:
+        return
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+def _merge_staging(cursor) -> int:
+    """Upsert staged rows into parcels; the last feature wins for duplicate parcel_ids"""
+    columns = ", ".join(PARCEL_FIELDS)
+    updates = ", ".join(f"{field} = EXCLUDED.{field}" for field in PARCEL_FIELDS if field not in ("parcel_id", "region"))
+
+    # ON CONFLICT only matches a parcel already in the staged region; one
+    # registered under another region would fail register_parcel_key() and
+    # the whole import with it. Move those to their new region first so the
+    # upsert below finds and updates them.
+    cursor.execute("""
+        UPDATE parcels p
+        SET region = s.region, updated_at = now()
+        FROM (
+            SELECT DISTINCT ON (parcel_id) parcel_id, region
+            FROM parcel_import_staging
+            ORDER BY parcel_id, feature_index DESC
+        ) s
+        JOIN parcel_keys k ON k.parcel_id = s.parcel_id
+        WHERE p.id = k.id AND p.region = k.region AND k.region <> s.region
+    """)
+
+    cursor.execute(f"""
+        INSERT INTO parcels (geometry, {columns})
+        SELECT DISTINCT ON (parcel_id)
+            geometry,
+            parcel_id, region, district, ward,
+            COALESCE(area_sqm, ST_Area(geometry::geography)),
+            COALESCE(perimeter_m, ST_Perimeter(geometry::geography)),
+            owner_name, owner_id, address, land_use, zoning, valuation
+        FROM parcel_import_staging
+        ORDER BY parcel_id, feature_index DESC
+        ON CONFLICT (parcel_id, region) DO UPDATE SET
+            geometry = EXCLUDED.geometry,
+            {updates},
+            updated_at = now()
+    """)
+
+    return cursor.rowcount
@@ -0,0 +1,101 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Optional, List
+import uuid
+
+from app.models.listing import SpatialLayer, ShapefileData
+from app.schemas.listing import SpatialLayerCreate
+from app.services.parcel_service import collection_bytes, decode_parcel_cursor, parcel_cursor
+
+def layer_version_name(layer_id: uuid.UUID) -> str:
+    """data_versions entry of a spatial layer, bumped by every import into it"""
+    return f"spatial_layer:{layer_id}"
+
+class LayerService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_layers(self, include_private: bool = False) -> List[SpatialLayer]:
+        """Get spatial layers, only public ones unless include_private"""
+        query = self.db.query(SpatialLayer)
+        if not include_private:
+            query = query.filter(SpatialLayer.is_public == True)
+        return query.order_by(SpatialLayer.name).all()
+
+    def get_layer(self, layer_id: uuid.UUID, include_private: bool = False) -> Optional[SpatialLayer]:
+        """Get a spatial layer by ID"""
+        query = self.db.query(SpatialLayer).filter(SpatialLayer.id == layer_id)
+        if not include_private:
+            query = query.filter(SpatialLayer.is_public == True)
+        return query.first()
+
+    def create_layer(self, layer_data: SpatialLayerCreate, created_by: uuid.UUID) -> SpatialLayer:
+        """Create a spatial layer backed by a ShapefileData uploaded through POST /layers/sources"""
+        source = self.db.query(ShapefileData).filter(ShapefileData.id == layer_data.source_shapefile).first()
+        if not source:
+            raise ValueError("Source shapefile not found")
+
+        layer = SpatialLayer(
+            name=layer_data.name,
+            description=layer_data.description,
+            layer_type=layer_data.layer_type,
+            source_shapefile=layer_data.source_shapefile,
+            properties_schema=layer_data.properties_schema,
+            style_config=layer_data.style_config,
+            is_public=layer_data.is_public,
+            created_by=created_by
+        )
+
+        self.db.add(layer)
+        self.db.commit()
+        self.db.refresh(layer)
+
+        return layer
+
+    def set_source(self, layer: SpatialLayer, source_id: uuid.UUID) -> SpatialLayer:
+        """Point a layer at a newly uploaded ShapefileData before re-importing it"""
+        layer.source_shapefile = source_id
+        self.db.commit()
+        self.db.refresh(layer)
+        return layer
+
+    def get_features_in_bbox(
+        self,
+        layer_id: uuid.UUID,
+        bbox: List[float],
+        limit: int = 1000,
+        cursor: Optional[str] = None
+    ) -> bytes:
+        """Get a page of a layer's features within a bounding box as GeoJSON built by the database"""
+        minx, miny, maxx, maxy = bbox
+        after_id = decode_parcel_cursor(cursor)
+
+        query = text("""
+            SELECT
+                COALESCE(json_agg(f.feature ORDER BY f.id), '[]'::json)::text AS features,
+                count(*) AS total,
+                max(f.id) AS last_id
+            FROM (
+                SELECT
+                    id,
+                    json_build_object(
+                        'type', 'Feature',
+                        'id', id,
+                        'geometry', ST_AsGeoJSON(geometry)::json,
+                        'properties', COALESCE(properties, '{}'::jsonb)
+                    ) AS feature
+                FROM spatial_layer_features
+                WHERE layer_id = :layer_id
+                AND geometry && ST_MakeEnvelope(:minx, :miny, :maxx, :maxy, 4326)
+                AND id > :after_id
+                ORDER BY id
+                LIMIT :limit
+            ) f
+        """)
+
+        result = self.db.execute(query, {
+            "layer_id": layer_id, "minx": minx, "miny": miny, "maxx": maxx, "maxy": maxy,
+            "after_id": after_id, "limit": limit
+        }).first()
+
+        return collection_bytes(result.features, result.total, parcel_cursor(result.last_id, result.total, limit))
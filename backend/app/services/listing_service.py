@@ -1,12 +1,15 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
-from typing import Optional, List
+from sqlalchemy import and_, or_, desc, tuple_, func, cast, Float
+from typing import Optional, List, Tuple
+from geoalchemy2 import Geography
 import uuid
 from datetime import datetime
 
+from app.core.pagination import encode_cursor, decode_cursor
 from app.models.listing import PlotListing, PlotInquiry
 from app.models.parcel import Parcel
 from app.schemas.listing import PlotListingCreate, PlotListingUpdate, PlotInquiryCreate
+from app.services.parcel_service import nearest_by_geodesic_distance
 
 class ListingService:
     def __init__(self, db: Session):
@@ -22,11 +25,95 @@ class ListingService:
         min_area: Optional[float] = None,
         max_area: Optional[float] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[PlotListing]:
-        """Get plot listings with filters"""
-        query = self.db.query(PlotListing).join(Parcel)
+        """Get plot listings with filters
         
+        Pages with a keyset cursor from listing_cursor() when given, falling
+        back to offset otherwise.
+        """
+        query = self._filter_listings(
+            self.db.query(PlotListing).join(PlotListing.parcel),
+            region, status, featured, min_price, max_price, min_area, max_area
+        )
+        
+        if cursor:
+            featured_key, created_at, listing_id = decode_cursor(cursor, 3)
+            try:
+                after = (bool(featured_key), datetime.fromisoformat(created_at), uuid.UUID(listing_id))
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+            query = query.filter(
+                tuple_(PlotListing.featured, PlotListing.created_at, PlotListing.id) < tuple_(*after)
+            )
+        
+        # Order by featured first, then by creation date; id makes the
+        # order total so cursors never skip or repeat rows
+        query = query.order_by(
+            desc(PlotListing.featured), desc(PlotListing.created_at), desc(PlotListing.id)
+        )
+        
+        if cursor:
+            return query.limit(limit).all()
+        return query.offset(offset).limit(limit).all()
+    
+    def get_nearest_listings(
+        self,
+        lat: float,
+        lng: float,
+        region: Optional[str] = None,
+        status: str = "active",
+        featured: Optional[bool] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_area: Optional[float] = None,
+        max_area: Optional[float] = None,
+        limit: int = 20
+    ) -> List[Tuple[PlotListing, float]]:
+        """Get the listings closest to a point with their geodesic distance in metres
+        
+        Candidates come from an index-assisted `<->` scan of parcel
+        geometries, so the cost depends on `limit` rather than on the number
+        of listings; only the candidates get an exact geodesic distance.
+        """
+        point = func.ST_SetSRID(func.ST_MakePoint(lng, lat), 4326)
+        planar_distance = Parcel.geometry.op("<->", return_type=Float)(point)
+        distance = func.ST_Distance(cast(Parcel.geometry, Geography), cast(point, Geography)).label("distance_m")
+        
+        def fetch(candidates: int):
+            nearest = self._filter_listings(
+                self.db.query(PlotListing.id, planar_distance.label("planar_distance")).join(PlotListing.parcel),
+                region, status, featured, min_price, max_price, min_area, max_area
+            ).order_by(planar_distance).limit(candidates).all()
+            if not nearest:
+                return [], 0, 0.0
+            
+            rows = (
+                self.db.query(PlotListing, distance)
+                .join(PlotListing.parcel)
+                .filter(PlotListing.id.in_([row.id for row in nearest]))
+                .order_by(distance, PlotListing.id)
+                .limit(limit)
+                .all()
+            )
+            return rows, len(nearest), float(nearest[-1].planar_distance)
+        
+        rows = nearest_by_geodesic_distance(fetch, lambda row: float(row.distance_m), lat, limit)
+        return [(listing, float(distance_m)) for listing, distance_m in rows]
+    
+    def _filter_listings(
+        self,
+        query,
+        region: Optional[str],
+        status: Optional[str],
+        featured: Optional[bool],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        min_area: Optional[float],
+        max_area: Optional[float]
+    ):
+        """Apply the listing search filters to a query joined with Parcel"""
         # Apply filters
         if status:
             query = query.filter(PlotListing.status == status)
@@ -49,10 +136,14 @@ class ListingService:
         if max_area:
             query = query.filter(Parcel.area_sqm <= max_area)
         
-        # Order by featured first, then by creation date
-        query = query.order_by(desc(PlotListing.featured), desc(PlotListing.created_at))
-        
-        return query.offset(offset).limit(limit).all()
+        return query
+    
+    def listing_cursor(self, listings: List[PlotListing], limit: int) -> Optional[str]:
+        """Cursor for the page after `listings`, None on the last page"""
+        if len(listings) < limit:
+            return None
+        last = listings[-1]
+        return encode_cursor([last.featured, last.created_at.isoformat(), str(last.id)])
     
     def get_listing_by_id(self, listing_id: uuid.UUID) -> Optional[PlotListing]:
         """Get listing by ID"""
@@ -153,18 +244,36 @@ class ListingService:
         self,
         status: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> List[PlotInquiry]:
-        """Get plot inquiries"""
+        """Get plot inquiries, newest first"""
         query = self.db.query(PlotInquiry)
         
         if status:
             query = query.filter(PlotInquiry.status == status)
         
-        query = query.order_by(desc(PlotInquiry.created_at))
+        if cursor:
+            created_at, inquiry_id = decode_cursor(cursor, 2)
+            try:
+                after = (datetime.fromisoformat(created_at), uuid.UUID(inquiry_id))
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+            query = query.filter(tuple_(PlotInquiry.created_at, PlotInquiry.id) < tuple_(*after))
+        
+        query = query.order_by(desc(PlotInquiry.created_at), desc(PlotInquiry.id))
         
+        if cursor:
+            return query.limit(limit).all()
         return query.offset(offset).limit(limit).all()
     
+    def inquiry_cursor(self, inquiries: List[PlotInquiry], limit: int) -> Optional[str]:
+        """Cursor for the page after `inquiries`, None on the last page"""
+        if len(inquiries) < limit:
+            return None
+        last = inquiries[-1]
+        return encode_cursor([last.created_at.isoformat(), str(last.id)])
+    
     def respond_to_inquiry(self, inquiry_id: uuid.UUID, responded_by: uuid.UUID, response_message: str):
         """Respond to plot inquiry"""
         inquiry = self.db.query(PlotInquiry).filter(PlotInquiry.id == inquiry_id).first()
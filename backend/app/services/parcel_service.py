@@ -1,72 +1,286 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import text, and_, or_
-from typing import List, Optional, Dict, Any
-from app.models.parcel import Parcel
-from app.schemas.parcel import ParcelCreate, ParcelUpdate, ParcelCollection, ParcelFeature
+from sqlalchemy import text, and_, or_, func, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import ValidationError
+from typing import List, Optional, Dict, Any, Callable, Iterator, Tuple
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.serialization import dumps, raw_json
+from app.models.parcel import Parcel, ParcelKey
+from app.schemas.parcel import (
+    ParcelBase, ParcelCreate, ParcelUpdate,
+    ParcelBulkResult, ParcelBulkResponse, ParcelSummary, ParcelNearby, ParcelNeighborSummary, ParcelLookupResult
+)
 import json
-from shapely.geometry import shape
-from geoalchemy2.shape import from_shape
+import math
+import struct
+
+# numpy, shapely and the TopoJSON encoder are imported where they are used,
+# so loading this module at worker boot does not pull them in
+
+# Rows fetched per round trip from the server-side cursor when streaming
+STREAM_BATCH_SIZE = 500
+
+SEARCH_FIELDS = ["owner_name", "parcel_id", "address", "land_use", "region"]
+
+# POST /parcels/bulk limits; each insert statement carries at most
+# BULK_INSERT_BATCH_SIZE rows to stay well under the bind parameter limit
+BULK_MAX_FEATURES = 10000
+BULK_INSERT_BATCH_SIZE = 1000
+
+# `<->` orders by planar distance in degrees, which is not the geodesic
+# order; kNN searches re-rank this many candidates per result by geodesic
+# distance, and multiply the candidates by it again until no row beyond
+# them can be closer (see nearest_by_geodesic_distance)
+KNN_CANDIDATE_FACTOR = 2
+
+# Shortest ground length of a degree of latitude (at the equator), in metres
+METRES_PER_DEGREE_MIN = 110574.0
+
+# Cluster grid cells per tile width at a zoom level, and the most cells one
+# request may cover
+CLUSTER_GRID_DIVISIONS = 8
+CLUSTER_MAX_CELLS = 20000
+
+# Points accepted by one POST /parcels/at call
+LOOKUP_MAX_POINTS = 10000
+
+# Default TopoJSON grid: coordinates snap to 1/1e6 of the page extent,
+# well under a metre for a region
+TOPOJSON_QUANTIZATION = 1000000
+
+# Condition on a query by :parcel_id that lets the planner prune parcels to
+# the one partition holding it; parcel_id alone would probe every partition
+PARCEL_REGION_LOOKUP = "region = (SELECT region FROM parcel_keys WHERE parcel_id = :parcel_id)"
+
+# Searches every field at once through search_vector plus fuzzy owner/address matches
+SEARCH_ALL = "all"
+
+# Precomputed generalized geometries used below a zoom level, as
+# (max zoom, column, GeoJSON coordinate decimals). The columns are kept in
+# sync by the parcels_generalize_geometry trigger, which snaps parcels to a
+# shared grid so neighbours keep a common boundary.
+GENERALIZATION_LEVELS = [
+    (10, "geometry_lod2", 4),
+    (13, "geometry_lod1", 5),
+]
+
+def generalized_geometry(zoom: Optional[int]) -> Tuple[str, int]:
+    """Get the geometry expression and coordinate precision to serve at a zoom level"""
+    if zoom is not None:
+        for max_zoom, column, decimals in GENERALIZATION_LEVELS:
+            if zoom <= max_zoom:
+                return f"COALESCE({column}, geometry)", decimals
+    return "geometry", 9
+
+# Columns of ParcelFeature.properties, in output order
+PARCEL_PROPERTIES = [
+    "parcel_id", "region", "district", "ward", "area_sqm", "perimeter_m", "owner_name",
+    "owner_id", "address", "land_use", "zoning", "valuation", "created_at", "updated_at",
+]
+
+def parcel_feature(row) -> Dict[str, Any]:
+    """A GeoJSON Feature for a parcel row whose geometry is ST_AsGeoJSON text, ready for dumps"""
+    return {
+        "type": "Feature",
+        "id": row.parcel_id,
+        "geometry": raw_json(row.geometry),
+        "properties": {name: getattr(row, name) for name in PARCEL_PROPERTIES},
+    }
+
+def properties_json_sql() -> str:
+    """The properties object of a parcel row, matching ParcelFeature.properties"""
+    return """
+        json_build_object(
+            'parcel_id', parcel_id,
+            'region', region,
+            'district', district,
+            'ward', ward,
+            'area_sqm', area_sqm::float8,
+            'perimeter_m', perimeter_m::float8,
+            'owner_name', owner_name,
+            'owner_id', owner_id,
+            'address', address,
+            'land_use', land_use,
+            'zoning', zoning,
+            'valuation', valuation::float8,
+            'created_at', created_at,
+            'updated_at', updated_at
+        )
+    """
+
+def feature_json_sql(geometry: str = "geometry", decimals: int = 9) -> str:
+    """One GeoJSON Feature per parcel row, matching the ParcelFeature schema"""
+    return f"""
+    json_build_object(
+        'type', 'Feature',
+        'id', parcel_id,
+        'geometry', ST_AsGeoJSON({geometry}, {decimals})::json,
+        'properties', {properties_json_sql()}
+    )
+    """
+
+def collection_bytes(features_json: str, total: int, next_cursor: Optional[str] = None) -> bytes:
+    """Wrap a JSON array of features in a ParcelCollection without re-parsing it"""
+    return (
+        b'{"type":"FeatureCollection","features":' + features_json.encode()
+        + b',"total":' + str(total).encode()
+        + b',"next_cursor":' + (f'"{next_cursor}"' if next_cursor else "null").encode() + b'}'
+    )
+
+def binary_parcels_sql(fmt: str, where: str, zoom: Optional[int]) -> str:
+    """Aggregate a page of parcels (ordered by id, LIMIT :limit) into a binary format
+
+    flatgeobuf is a complete FlatGeobuf file from ST_AsFlatGeobuf. wkb and
+    twkb are a big-endian uint32 length and a JSON array with the
+    properties of every feature (the attribute sidecar), followed by a
+    uint32 length and the geometry bytes of each feature, in the same order.
+    """
+    geometry, decimals = generalized_geometry(zoom)
+
+    if fmt == "flatgeobuf":
+        return f"""
+            SELECT ST_AsFlatGeobuf(f, false, 'geom') AS data, count(*) AS total, max(f.id) AS last_id
+            FROM (
+                SELECT
+                    id, parcel_id, region, district, ward,
+                    area_sqm::float8 AS area_sqm, perimeter_m::float8 AS perimeter_m,
+                    owner_name, owner_id, address, land_use, zoning,
+                    valuation::float8 AS valuation, created_at, updated_at,
+                    {geometry} AS geom
+                FROM parcels
+                WHERE {where}
+                ORDER BY id
+                LIMIT :limit
+            ) f
+        """
+
+    if fmt == "wkb":
+        encoded = f"ST_AsBinary({geometry})"
+    elif fmt == "twkb":
+        encoded = f"ST_AsTWKB({geometry}, {decimals})"
+    else:
+        raise ValueError(f"Unsupported binary format: {fmt}")
+
+    return f"""
+        SELECT
+            COALESCE(json_agg(f.properties ORDER BY f.id), '[]'::json)::text AS properties,
+            COALESCE(string_agg(int4send(length(f.geom)) || f.geom, ''::bytea ORDER BY f.id), ''::bytea) AS geometries,
+            count(*) AS total,
+            max(f.id) AS last_id
+        FROM (
+            SELECT id, {properties_json_sql()} AS properties, {encoded} AS geom
+            FROM parcels
+            WHERE {where}
+            ORDER BY id
+            LIMIT :limit
+        ) f
+    """
+
+def binary_parcels_bytes(fmt: str, result) -> bytes:
+    """Response body for a row of binary_parcels_sql"""
+    if fmt == "flatgeobuf":
+        return bytes(result.data) if result.data else b""
+
+    sidecar = result.properties.encode()
+    return struct.pack(">I", len(sidecar)) + sidecar + bytes(result.geometries)
+
+def parcel_cursor(last_id: Optional[int], count: int, limit: int) -> Optional[str]:
+    """Cursor for the page after one ending at last_id, None on the last page"""
+    if last_id is None or count < limit:
+        return None
+    return encode_cursor([last_id])
+
+def decode_parcel_cursor(cursor: Optional[str]) -> int:
+    """Parcel id to continue after; 0 starts from the first page"""
+    if not cursor:
+        return 0
+    (last_id,) = decode_cursor(cursor, 1)
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    return last_id
+
+def min_geodesic_distance(lat: float, degrees: float) -> float:
+    """Lower bound in metres of the geodesic distance from latitude `lat` to anything `degrees` away in lng/lat"""
+    degrees = min(degrees, 90.0)
+    return degrees * METRES_PER_DEGREE_MIN * math.cos(math.radians(min(abs(lat) + degrees, 90.0)))
+
+def nearest_by_geodesic_distance(
+    fetch: Callable[[int], Tuple[List[Any], int, float]],
+    distance: Callable[[Any], float],
+    lat: float,
+    limit: int
+) -> List[Any]:
+    """Run a `<->` kNN search, widening its candidates until the top `limit` by geodesic distance is exact
+
+    `fetch(candidates)` returns the `limit` closest of that many `<->`
+    candidates by geodesic distance, the number of candidates found and the
+    planar distance of the farthest one. Every row outside the candidates is
+    at least that far in degrees, so once that bounds the last result's
+    distance, or there are no more candidates, the results are final.
+    """
+    candidates = limit * KNN_CANDIDATE_FACTOR
+    while True:
+        rows, found, farthest = fetch(candidates)
+        if found < candidates:
+            return rows
+        if len(rows) == limit and min_geodesic_distance(lat, farthest) >= distance(rows[-1]):
+            return rows
+        candidates *= KNN_CANDIDATE_FACTOR
 
 class ParcelService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_parcels_by_region(self, regions: List[str], limit: int = 1000) -> ParcelCollection:
-        """Get parcels by regions"""
-        query = self.db.query(Parcel)
-        
-        if regions:
-            query = query.filter(Parcel.region.in_(regions))
-        
-        parcels = query.limit(limit).all()
+    def get_parcels_by_region(
+        self,
+        regions: List[str],
+        limit: int = 1000,
+        zoom: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> bytes:
+        """Get a page of parcels by regions as a GeoJSON FeatureCollection built by the database"""
+        query = text(f"""
+            SELECT
+                COALESCE(json_agg(f.feature ORDER BY f.id), '[]'::json)::text AS features,
+                count(*) AS total,
+                max(f.id) AS last_id
+            FROM (
+                SELECT id, {feature_json_sql(*generalized_geometry(zoom))} AS feature
+                FROM parcels
+                WHERE id > :after_id
+                {self._region_filter(regions)}
+                ORDER BY id
+                LIMIT :limit
+            ) f
+        """)
         
-        features = []
-        for parcel in parcels:
-            # Get geometry as GeoJSON
-            geom_query = text("""
-                SELECT ST_AsGeoJSON(geometry) as geometry 
-                FROM parcels 
-                WHERE id = :parcel_id
-            """)
-            result = self.db.execute(geom_query, {"parcel_id": parcel.id}).first()
-            
-            geometry = json.loads(result.geometry) if result else None
-            
-            features.append(ParcelFeature(
-                id=parcel.parcel_id,
-                geometry=geometry,
-                properties={
-                    "parcel_id": parcel.parcel_id,
-                    "region": parcel.region,
-                    "district": parcel.district,
-                    "ward": parcel.ward,
-                    "area_sqm": float(parcel.area_sqm) if parcel.area_sqm else None,
-                    "perimeter_m": float(parcel.perimeter_m) if parcel.perimeter_m else None,
-                    "owner_name": parcel.owner_name,
-                    "owner_id": parcel.owner_id,
-                    "address": parcel.address,
-                    "land_use": parcel.land_use,
-                    "zoning": parcel.zoning,
-                    "valuation": float(parcel.valuation) if parcel.valuation else None,
-                    "created_at": parcel.created_at.isoformat() if parcel.created_at else None,
-                    "updated_at": parcel.updated_at.isoformat() if parcel.updated_at else None
-                }
-            ))
+        result = self.db.execute(query, {
+            "regions": regions, "limit": limit, "after_id": decode_parcel_cursor(cursor)
+        }).first()
         
-        return ParcelCollection(
-            features=features,
-            total=len(features)
+        return collection_bytes(
+            result.features, result.total,
+            parcel_cursor(result.last_id, result.total, limit)
         )
     
-    def get_parcels_in_bbox(self, bbox: List[float], regions: List[str] = None, limit: int = 1000) -> ParcelCollection:
-        """Get parcels within bounding box"""
+    def get_parcels_in_bbox(
+        self,
+        bbox: List[float],
+        regions: List[str] = None,
+        limit: int = 1000,
+        zoom: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> bytes:
+        """Get a page of parcels within bounding box as GeoJSON, generalized for the zoom level if given"""
         minx, miny, maxx, maxy = bbox
+        geometry, decimals = generalized_geometry(zoom)
         
-        query = text("""
+        query = text(f"""
             SELECT 
                 id,
                 parcel_id,
-                ST_AsGeoJSON(geometry) as geometry,
+                ST_AsGeoJSON({geometry}, {decimals}) as geometry,
                 region,
                 district,
                 ward,
@@ -85,46 +299,285 @@ class ParcelService:
                 geometry, 
                 ST_MakeEnvelope(:minx, :miny, :maxx, :maxy, 4326)
             )
-            AND (:regions IS NULL OR region = ANY(:regions))
+            AND id > :after_id
+            {self._region_filter(regions)}
+            ORDER BY id
             LIMIT :limit
         """)
         
         result = self.db.execute(query, {
             "minx": minx, "miny": miny, "maxx": maxx, "maxy": maxy, 
-            "regions": regions, "limit": limit
+            "regions": regions, "limit": limit, "after_id": decode_parcel_cursor(cursor)
         })
         
-        features = []
-        for row in result:
-            features.append(ParcelFeature(
-                id=row.parcel_id,
-                geometry=json.loads(row.geometry),
-                properties={
-                    "parcel_id": row.parcel_id,
-                    "region": row.region,
-                    "district": row.district,
-                    "ward": row.ward,
-                    "area_sqm": float(row.area_sqm) if row.area_sqm else None,
-                    "perimeter_m": float(row.perimeter_m) if row.perimeter_m else None,
-                    "owner_name": row.owner_name,
-                    "owner_id": row.owner_id,
-                    "address": row.address,
-                    "land_use": row.land_use,
-                    "zoning": row.zoning,
-                    "valuation": float(row.valuation) if row.valuation else None,
-                    "created_at": row.created_at.isoformat() if row.created_at else None,
-                    "updated_at": row.updated_at.isoformat() if row.updated_at else None
+        rows = result.all()
+        return dumps({
+            "type": "FeatureCollection",
+            "features": [parcel_feature(row) for row in rows],
+            "total": len(rows),
+            "next_cursor": parcel_cursor(rows[-1].id if rows else None, len(rows), limit),
+        })
+    
+    def get_parcel_clusters(
+        self,
+        bbox: List[float],
+        zoom: int,
+        regions: List[str] = None
+    ) -> Dict[str, Any]:
+        """Aggregate parcels and active listings into fixed grid cells for a zoom level
+
+        Cells are 1/CLUSTER_GRID_DIVISIONS of a tile wide and aligned to a
+        global grid, and the bbox is widened to whole cells, so the same
+        cell always has the same totals whatever bbox it was requested
+        with. Parcels are assigned to the cell holding their bounding box
+        centre. Each cell becomes a Point feature at the mean position of
+        its parcels.
+        """
+        cell_size = 360.0 / (2 ** zoom * CLUSTER_GRID_DIVISIONS)
+        minx, miny, maxx, maxy = bbox
+        minx = math.floor(minx / cell_size) * cell_size
+        miny = math.floor(miny / cell_size) * cell_size
+        maxx = math.ceil(maxx / cell_size) * cell_size
+        maxy = math.ceil(maxy / cell_size) * cell_size
+
+        cells = round((maxx - minx) / cell_size) * round((maxy - miny) / cell_size)
+        if cells > CLUSTER_MAX_CELLS:
+            raise ValueError("Bounding box too large for this zoom level")
+
+        query = text(f"""
+            WITH centers AS (
+                SELECT
+                    id,
+                    area_sqm,
+                    valuation,
+                    (ST_XMin(geometry) + ST_XMax(geometry)) / 2 AS x,
+                    (ST_YMin(geometry) + ST_YMax(geometry)) / 2 AS y
+                FROM parcels
+                WHERE geometry && ST_MakeEnvelope(:minx, :miny, :maxx, :maxy, 4326)
+                {self._region_filter(regions)}
+            ),
+            listings AS (
+                SELECT parcel_id, count(*) AS listing_count
+                FROM plot_listings
+                WHERE status = 'active' AND parcel_id IN (SELECT id FROM centers)
+                GROUP BY parcel_id
+            )
+            SELECT
+                floor(c.x / :cell_size)::bigint AS cell_x,
+                floor(c.y / :cell_size)::bigint AS cell_y,
+                avg(c.x) AS lng,
+                avg(c.y) AS lat,
+                count(*) AS parcel_count,
+                coalesce(sum(l.listing_count), 0) AS listing_count,
+                coalesce(sum(c.area_sqm), 0) AS area_sqm,
+                coalesce(sum(c.valuation), 0) AS valuation
+            FROM centers c
+            LEFT JOIN listings l ON l.parcel_id = c.id
+            WHERE c.x >= :minx AND c.x < :maxx AND c.y >= :miny AND c.y < :maxy
+            GROUP BY cell_x, cell_y
+            ORDER BY cell_y, cell_x
+        """)
+
+        result = self.db.execute(query, {
+            "minx": minx, "miny": miny, "maxx": maxx, "maxy": maxy,
+            "cell_size": cell_size, "regions": regions
+        })
+
+        features = [
+            {
+                "type": "Feature",
+                "id": f"{zoom}/{row.cell_x}/{row.cell_y}",
+                "geometry": {"type": "Point", "coordinates": [float(row.lng), float(row.lat)]},
+                "properties": {
+                    "parcel_count": row.parcel_count,
+                    "listing_count": int(row.listing_count),
+                    "area_sqm": float(row.area_sqm),
+                    "valuation": float(row.valuation)
                 }
+            }
+            for row in result
+        ]
+
+        return {
+            "type": "FeatureCollection",
+            "features": features,
+            "bbox": [minx, miny, maxx, maxy],
+            "cell_size": cell_size,
+            "total": sum(feature["properties"]["parcel_count"] for feature in features)
+        }
+
+    def find_parcels_at(self, points: List[Tuple[float, float]]) -> List[ParcelLookupResult]:
+        """Resolve (lat, lng) points to the parcels containing them
+
+        All points go to the database as two arrays and are joined against
+        parcels with ST_Contains, which is answered from the GiST index.
+        Every point gets a result, with an empty list when it is outside
+        all parcels.
+        """
+        if len(points) > LOOKUP_MAX_POINTS:
+            raise ValueError(f"At most {LOOKUP_MAX_POINTS} points per request")
+
+        results = [
+            ParcelLookupResult(index=index, lat=lat, lng=lng, parcels=[])
+            for index, (lat, lng) in enumerate(points)
+        ]
+        if not points:
+            return results
+
+        query = text("""
+            SELECT
+                pts.idx - 1 AS idx,
+                p.parcel_id,
+                p.region,
+                p.district,
+                p.ward,
+                p.area_sqm,
+                p.land_use,
+                p.zoning
+            FROM unnest(CAST(:lats AS double precision[]), CAST(:lngs AS double precision[]))
+                WITH ORDINALITY AS pts(lat, lng, idx)
+            JOIN parcels p
+                ON ST_Contains(p.geometry, ST_SetSRID(ST_MakePoint(pts.lng, pts.lat), 4326))
+            ORDER BY pts.idx, p.id
+        """)
+
+        rows = self.db.execute(query, {
+            "lats": [lat for lat, _ in points],
+            "lngs": [lng for _, lng in points],
+        })
+
+        for row in rows:
+            results[row.idx].parcels.append(ParcelSummary(
+                parcel_id=row.parcel_id,
+                region=row.region,
+                district=row.district,
+                ward=row.ward,
+                area_sqm=float(row.area_sqm) if row.area_sqm else None,
+                land_use=row.land_use,
+                zoning=row.zoning
             ))
-        
-        return ParcelCollection(
-            features=features,
-            total=len(features)
-        )
-    
-    def get_parcel_by_id(self, parcel_id: str) -> Optional[Dict[str, Any]]:
-        """Get single parcel by ID with detailed measurements"""
+
+        return results
+
+    def get_nearest_parcels(
+        self,
+        lat: float,
+        lng: float,
+        regions: List[str],
+        min_area: Optional[float] = None,
+        max_area: Optional[float] = None,
+        land_use: Optional[str] = None,
+        limit: int = 20
+    ) -> List[ParcelNearby]:
+        """Get the parcels closest to a point with their geodesic distance in metres
+
+        The inner query is an index-assisted `<->` kNN scan, so its cost
+        depends on `limit` rather than on the table size; only those
+        candidates get an exact geodesic distance.
+        """
+        filters = self._region_filter(regions)
+        params: Dict[str, Any] = {
+            "lat": lat,
+            "lng": lng,
+            "regions": regions,
+            "limit": limit,
+        }
+        if min_area:
+            filters += " AND area_sqm >= :min_area"
+            params["min_area"] = min_area
+        if max_area:
+            filters += " AND area_sqm <= :max_area"
+            params["max_area"] = max_area
+        if land_use:
+            filters += " AND land_use = :land_use"
+            params["land_use"] = land_use
+
+        # The window aggregates run before LIMIT, over all candidates
+        query = text(f"""
+            WITH point AS (
+                SELECT ST_SetSRID(ST_MakePoint(:lng, :lat), 4326) AS geom
+            ),
+            candidates AS (
+                SELECT p.id, p.parcel_id, p.region, p.district, p.ward,
+                       p.area_sqm, p.land_use, p.zoning, p.geometry,
+                       p.geometry <-> point.geom AS planar_distance
+                FROM parcels p, point
+                WHERE TRUE {filters}
+                ORDER BY p.geometry <-> point.geom
+                LIMIT :candidates
+            )
+            SELECT c.parcel_id, c.region, c.district, c.ward, c.area_sqm, c.land_use, c.zoning,
+                   ST_Distance(c.geometry::geography, point.geom::geography) AS distance_m,
+                   count(*) OVER () AS found,
+                   max(c.planar_distance) OVER () AS farthest
+            FROM candidates c, point
+            ORDER BY distance_m, c.id
+            LIMIT :limit
+        """)
+
+        def fetch(candidates: int):
+            rows = self.db.execute(query, {**params, "candidates": candidates}).all()
+            if not rows:
+                return rows, 0, 0.0
+            return rows, rows[0].found, float(rows[0].farthest)
+
+        rows = nearest_by_geodesic_distance(fetch, lambda row: float(row.distance_m), lat, limit)
+        return [
+            ParcelNearby(
+                parcel_id=row.parcel_id,
+                region=row.region,
+                district=row.district,
+                ward=row.ward,
+                area_sqm=float(row.area_sqm) if row.area_sqm else None,
+                land_use=row.land_use,
+                zoning=row.zoning,
+                distance_m=float(row.distance_m)
+            )
+            for row in rows
+        ]
+
+    def get_parcel_neighbors(self, parcel_id: str) -> Optional[List[ParcelNeighborSummary]]:
+        """Get the parcels adjacent to a parcel, longest shared boundary first; None if it does not exist"""
         query = text("""
+            SELECT
+                p.parcel_id,
+                p.region,
+                p.district,
+                p.ward,
+                p.area_sqm,
+                p.land_use,
+                p.zoning,
+                n.shared_length_m
+            FROM parcel_keys self
+            LEFT JOIN parcel_neighbors n ON n.parcel_id = self.id
+            LEFT JOIN parcel_keys k ON k.id = n.neighbor_id
+            LEFT JOIN parcels p ON p.id = k.id AND p.region = k.region
+            WHERE self.parcel_id = :parcel_id
+            ORDER BY n.shared_length_m DESC, p.parcel_id
+        """)
+
+        rows = self.db.execute(query, {"parcel_id": parcel_id}).all()
+        if not rows:
+            return None
+
+        return [
+            ParcelNeighborSummary(
+                parcel_id=row.parcel_id,
+                region=row.region,
+                district=row.district,
+                ward=row.ward,
+                area_sqm=float(row.area_sqm) if row.area_sqm else None,
+                land_use=row.land_use,
+                zoning=row.zoning,
+                shared_length_m=row.shared_length_m
+            )
+            for row in rows
+            if row.parcel_id is not None
+        ]
+
+    def get_parcel_by_id(self, parcel_id: str) -> Optional[Dict[str, Any]]:
+        """Get single parcel by ID with detailed measurements, for serialization with dumps"""
+        query = text(f"""
             SELECT 
                 id,
                 parcel_id,
@@ -145,7 +598,7 @@ class ParcelService:
                 ST_Area(geometry::geography) as calculated_area,
                 ST_Perimeter(geometry::geography) as calculated_perimeter
             FROM parcels 
-            WHERE parcel_id = :parcel_id
+            WHERE parcel_id = :parcel_id AND {PARCEL_REGION_LOOKUP}
         """)
         
         result = self.db.execute(query, {"parcel_id": parcel_id}).first()
@@ -153,22 +606,10 @@ class ParcelService:
         if not result:
             return None
             
+        parcel = {name: getattr(result, name) for name in PARCEL_PROPERTIES}
         return {
-            "parcel_id": result.parcel_id,
-            "geometry": json.loads(result.geometry),
-            "region": result.region,
-            "district": result.district,
-            "ward": result.ward,
-            "area_sqm": float(result.area_sqm) if result.area_sqm else None,
-            "perimeter_m": float(result.perimeter_m) if result.perimeter_m else None,
-            "owner_name": result.owner_name,
-            "owner_id": result.owner_id,
-            "address": result.address,
-            "land_use": result.land_use,
-            "zoning": result.zoning,
-            "valuation": float(result.valuation) if result.valuation else None,
-            "created_at": result.created_at.isoformat() if result.created_at else None,
-            "updated_at": result.updated_at.isoformat() if result.updated_at else None,
+            **parcel,
+            "geometry": raw_json(result.geometry),
             "measurements": {
                 "area_sqm": float(result.calculated_area),
                 "area_acres": float(result.calculated_area) * 0.000247105,
@@ -177,11 +618,9 @@ class ParcelService:
             }
         }
     
-    def search_parcels(self, field: str, value: str, regions: List[str] = None) -> ParcelCollection:
-        """Search parcels by field"""
-        allowed_fields = ["owner_name", "parcel_id", "address", "land_use", "region"]
-        if field not in allowed_fields:
-            raise ValueError(f"Invalid search field: {field}")
+    def search_parcels(self, field: str, value: str, regions: List[str] = None, limit: int = 100) -> bytes:
+        """Search parcels by field, or every field with field="all", best matches first, as GeoJSON"""
+        condition, rank = self._search_clauses(field)
         
         query = text(f"""
             SELECT 
@@ -202,43 +641,264 @@ class ParcelService:
                 created_at,
                 updated_at
             FROM parcels 
-            WHERE {field} ILIKE :value
-            AND (:regions IS NULL OR region = ANY(:regions))
-            LIMIT 100
+            WHERE {condition}
+            {self._region_filter(regions)}
+            ORDER BY {rank} DESC, id
+            LIMIT :limit
         """)
         
-        result = self.db.execute(query, {"value": f"%{value}%", "regions": regions})
+        rows = self.db.execute(query, self._search_params(value, regions, limit)).all()
+        return dumps({
+            "type": "FeatureCollection",
+            "features": [parcel_feature(row) for row in rows],
+            "total": len(rows),
+            "next_cursor": None,
+        })
+    
+    def stream_parcels_by_region(
+        self,
+        regions: List[str],
+        limit: int = 1000,
+        fmt: str = "geojson",
+        zoom: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """Stream a page of parcels by regions as GeoJSON or newline-delimited GeoJSON"""
+        query = text(f"""
+            SELECT id, {feature_json_sql(*generalized_geometry(zoom))}::text AS feature
+            FROM parcels
+            WHERE id > :after_id
+            {self._region_filter(regions)}
+            ORDER BY id
+            LIMIT :limit
+        """)
         
-        features = []
-        for row in result:
-            features.append(ParcelFeature(
-                id=row.parcel_id,
-                geometry=json.loads(row.geometry),
-                properties={
-                    "parcel_id": row.parcel_id,
-                    "region": row.region,
-                    "district": row.district,
-                    "ward": row.ward,
-                    "area_sqm": float(row.area_sqm) if row.area_sqm else None,
-                    "perimeter_m": float(row.perimeter_m) if row.perimeter_m else None,
-                    "owner_name": row.owner_name,
-                    "owner_id": row.owner_id,
-                    "address": row.address,
-                    "land_use": row.land_use,
-                    "zoning": row.zoning,
-                    "valuation": float(row.valuation) if row.valuation else None,
-                    "created_at": row.created_at.isoformat() if row.created_at else None,
-                    "updated_at": row.updated_at.isoformat() if row.updated_at else None
-                }
-            ))
+        return self._stream_features(query, {
+            "regions": regions, "limit": limit, "after_id": decode_parcel_cursor(cursor)
+        }, fmt, page_limit=limit)
+    
+    def stream_parcels_in_bbox(
+        self,
+        bbox: List[float],
+        regions: List[str] = None,
+        limit: int = 1000,
+        fmt: str = "geojson",
+        zoom: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """Stream a page of parcels within bounding box as GeoJSON or newline-delimited GeoJSON"""
+        minx, miny, maxx, maxy = bbox
+        
+        query = text(f"""
+            SELECT id, {feature_json_sql(*generalized_geometry(zoom))}::text AS feature
+            FROM parcels
+            WHERE ST_Intersects(
+                geometry,
+                ST_MakeEnvelope(:minx, :miny, :maxx, :maxy, 4326)
+            )
+            AND id > :after_id
+            {self._region_filter(regions)}
+            ORDER BY id
+            LIMIT :limit
+        """)
+        
+        return self._stream_features(query, {
+            "minx": minx, "miny": miny, "maxx": maxx, "maxy": maxy,
+            "regions": regions, "limit": limit, "after_id": decode_parcel_cursor(cursor)
+        }, fmt, page_limit=limit)
+    
+    def stream_search_parcels(self, field: str, value: str, regions: List[str] = None, limit: int = 100, fmt: str = "geojson") -> Iterator[bytes]:
+        """Stream parcel search results as GeoJSON or newline-delimited GeoJSON"""
+        # Validate before the response starts; errors inside the stream
+        # can no longer become a 400
+        condition, rank = self._search_clauses(field)
+        
+        query = text(f"""
+            SELECT id, {feature_json_sql()}::text AS feature
+            FROM parcels
+            WHERE {condition}
+            {self._region_filter(regions)}
+            ORDER BY {rank} DESC, id
+            LIMIT :limit
+        """)
+        
+        return self._stream_features(query, self._search_params(value, regions, limit), fmt)
+    
+    def get_parcels_binary(
+        self,
+        fmt: str,
+        regions: List[str] = None,
+        bbox: Optional[List[float]] = None,
+        limit: int = 1000,
+        zoom: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[bytes, int, Optional[str]]:
+        """Get a page of parcels as FlatGeobuf, WKB or TWKB, with its count and next cursor
+
+        Geometry bytes are produced by PostGIS and copied to the response
+        as-is; see binary_parcels_sql for the layouts.
+        """
+        where, params = self._page_clause(regions, bbox, limit, cursor)
+        result = self.db.execute(text(binary_parcels_sql(fmt, where, zoom)), params).first()
+
+        return binary_parcels_bytes(fmt, result), result.total, parcel_cursor(result.last_id, result.total, limit)
+
+    def get_parcels_topojson(
+        self,
+        regions: List[str] = None,
+        bbox: Optional[List[float]] = None,
+        limit: int = 1000,
+        zoom: Optional[int] = None,
+        cursor: Optional[str] = None,
+        quantization: int = TOPOJSON_QUANTIZATION
+    ) -> bytes:
+        """Get a page of parcels as a quantized TopoJSON Topology with shared boundaries stored once"""
+        from app.services.topojson_service import encode_topology
         
-        return ParcelCollection(
-            features=features,
-            total=len(features)
+        where, params = self._page_clause(regions, bbox, limit, cursor)
+        geometry, _ = generalized_geometry(zoom)
+        query = text(f"""
+            SELECT id, parcel_id, {properties_json_sql()}::text AS properties, ST_AsBinary({geometry}) AS geom
+            FROM parcels
+            WHERE {where}
+            ORDER BY id
+            LIMIT :limit
+        """)
+
+        rows = self.db.execute(query, params).all()
+        topology = encode_topology(
+            [(row.parcel_id, raw_json(row.properties), bytes(row.geom)) for row in rows],
+            quantization
         )
+        topology["total"] = len(rows)
+        topology["next_cursor"] = parcel_cursor(rows[-1].id if rows else None, len(rows), limit)
+        return dumps(topology)
+
+    def get_parcel_binary(self, parcel_id: str, fmt: str) -> Optional[bytes]:
+        """Get a single parcel as FlatGeobuf, WKB or TWKB"""
+        result = self.db.execute(
+            text(binary_parcels_sql(fmt, f"parcel_id = :parcel_id AND {PARCEL_REGION_LOOKUP}", None)),
+            {"parcel_id": parcel_id, "limit": 1}
+        ).first()
+
+        if not result.total:
+            return None
+        return binary_parcels_bytes(fmt, result)
+
+    def selection_clause(
+        self,
+        regions: List[str] = None,
+        bbox: Optional[List[float]] = None,
+        field: Optional[str] = None,
+        value: Optional[str] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """WHERE clause and parameters selecting parcels by regions, bbox and/or search"""
+        conditions = ["TRUE"]
+        params: Dict[str, Any] = {"regions": regions}
+        
+        if bbox:
+            conditions.append("ST_Intersects(geometry, ST_MakeEnvelope(:minx, :miny, :maxx, :maxy, 4326))")
+            params.update(zip(("minx", "miny", "maxx", "maxy"), bbox))
+        
+        if field:
+            if not value:
+                raise ValueError("Search value is required")
+            condition, _ = self._search_clauses(field)
+            conditions.append(condition)
+            params.update(self._search_params(value, regions, None))
+        
+        return " AND ".join(conditions) + " " + self._region_filter(regions), params
+    
+    def _search_clauses(self, field: str) -> Tuple[str, str]:
+        """WHERE condition and relevance expression for a search field
+        
+        Single-field ILIKE '%value%' is served by the pg_trgm GIN indexes and
+        ranked by trigram similarity. The "all" mode matches the weighted
+        search_vector (parcel id and owner > address > location > land use)
+        or a fuzzy owner/address trigram match.
+        """
+        if field == SEARCH_ALL:
+            condition = """(
+                search_vector @@ websearch_to_tsquery('simple', :value)
+                OR owner_name % :value
+                OR address % :value
+                OR parcel_id ILIKE :pattern
+            )"""
+            rank = """(
+                ts_rank_cd(search_vector, websearch_to_tsquery('simple', :value))
+                + greatest(similarity(owner_name, :value), similarity(address, :value))
+            )"""
+            return condition, rank
+        
+        if field not in SEARCH_FIELDS:
+            raise ValueError(f"Invalid search field: {field}")
+        
+        return f"{field} ILIKE :pattern", f"similarity({field}, :value)"
+    
+    def _search_params(self, value: str, regions: Optional[List[str]], limit: Optional[int]) -> Dict[str, Any]:
+        # Escape LIKE wildcards so user input only matches literally
+        escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return {"value": value, "pattern": f"%{escaped}%", "regions": regions, "limit": limit}
+    
+    def _page_clause(
+        self,
+        regions: Optional[List[str]],
+        bbox: Optional[List[float]],
+        limit: int,
+        cursor: Optional[str]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """WHERE clause and parameters for a cursor page of parcels by regions and/or bbox"""
+        conditions = ["id > :after_id"]
+        params: Dict[str, Any] = {"regions": regions, "limit": limit, "after_id": decode_parcel_cursor(cursor)}
+        if bbox:
+            conditions.append("ST_Intersects(geometry, ST_MakeEnvelope(:minx, :miny, :maxx, :maxy, 4326))")
+            params.update(zip(("minx", "miny", "maxx", "maxy"), bbox))
+        return " AND ".join(conditions) + " " + self._region_filter(regions), params
+    
+    def _region_filter(self, regions: Optional[List[str]]) -> str:
+        return "AND region = ANY(:regions)" if regions else ""
+    
+    def _stream_features(self, query, params: Dict[str, Any], fmt: str, page_limit: Optional[int] = None) -> Iterator[bytes]:
+        """Write features from a server-side cursor one batch at a time
+        
+        With page_limit, GeoJSON output ends with the next_cursor of the page.
+        """
+        if fmt not in ("geojson", "ndjson"):
+            raise ValueError(f"Invalid stream format: {fmt}")
+        
+        def generate():
+            result = self.db.execute(
+                query, params,
+                execution_options={"stream_results": True, "yield_per": STREAM_BATCH_SIZE}
+            )
+            
+            if fmt == "ndjson":
+                for rows in result.partitions():
+                    yield "".join(row.feature + "\n" for row in rows).encode()
+                return
+            
+            total = 0
+            last_id = None
+            yield b'{"type":"FeatureCollection","features":['
+            for rows in result.partitions():
+                chunk = ",".join(row.feature for row in rows)
+                yield (b"," if total else b"") + chunk.encode()
+                total += len(rows)
+                last_id = rows[-1].id
+            
+            next_cursor = parcel_cursor(last_id, total, page_limit) if page_limit else None
+            yield (
+                b'],"total":' + str(total).encode()
+                + b',"next_cursor":' + (f'"{next_cursor}"' if next_cursor else "null").encode() + b'}'
+            )
+        
+        return generate()
     
     def create_parcel(self, parcel_data: ParcelCreate) -> Parcel:
         """Create new parcel"""
+        from geoalchemy2.shape import from_shape
+        from shapely.geometry import shape
+        
         # Convert GeoJSON geometry to PostGIS geometry
         geom = shape(parcel_data.geometry)
         
@@ -262,4 +922,149 @@ class ParcelService:
         self.db.commit()
         self.db.refresh(db_parcel)
         
-        return db_parcel
\ No newline at end of file
+        return db_parcel
+
+    def create_parcels_bulk(self, features: List[Dict[str, Any]], upsert: bool = False) -> ParcelBulkResponse:
+        """Validate a FeatureCollection and insert its parcels in one transaction
+
+        Properties are checked against ParcelBase per feature; geometries are
+        parsed and validated for the whole collection at once with Shapely's
+        vectorized functions. Valid parcels are written with multi-row
+        INSERT ... ON CONFLICT (parcel_id, region) statements that either skip
+        or, with upsert, update existing parcels. A parcel_id that exists in
+        another region is skipped too, or with upsert moved to the new region.
+        """
+        import shapely
+        
+        if len(features) > BULK_MAX_FEATURES:
+            raise ValueError(f"At most {BULK_MAX_FEATURES} features per request")
+
+        results: List[Optional[ParcelBulkResult]] = [None] * len(features)
+
+        candidates = []
+        for index, feature in enumerate(features):
+            try:
+                properties = ParcelBase.model_validate(feature.get("properties") or {})
+            except ValidationError as e:
+                results[index] = ParcelBulkResult(index=index, status="invalid", error=_validation_message(e))
+                continue
+
+            if not isinstance(feature.get("geometry"), dict):
+                results[index] = ParcelBulkResult(index=index, parcel_id=properties.parcel_id, status="invalid", error="Missing geometry")
+                continue
+
+            candidates.append((index, properties, json.dumps(feature["geometry"])))
+
+        geometries = shapely.from_geojson([geojson for _, _, geojson in candidates], on_invalid="ignore")
+        geometry_errors = _geometry_errors(geometries)
+        wkts = shapely.to_wkt(geometries, rounding_precision=-1)
+
+        rows = []
+        seen = set()
+        for (index, properties, _), error, wkt in zip(candidates, geometry_errors, wkts):
+            if error is None and properties.parcel_id in seen:
+                error = "Duplicate parcel_id in request"
+            if error is not None:
+                results[index] = ParcelBulkResult(index=index, parcel_id=properties.parcel_id, status="invalid", error=error)
+                continue
+
+            seen.add(properties.parcel_id)
+            rows.append((index, {**properties.model_dump(), "geometry": f"SRID=4326;{wkt}"}))
+
+        try:
+            outcomes = self._insert_parcels([row for _, row in rows], upsert) if rows else {}
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            raise
+
+        for index, row in rows:
+            results[index] = ParcelBulkResult(
+                index=index,
+                parcel_id=row["parcel_id"],
+                status=outcomes.get(row["parcel_id"], "exists")
+            )
+
+        return ParcelBulkResponse(
+            created=sum(result.status == "created" for result in results),
+            updated=sum(result.status == "updated" for result in results),
+            failed=sum(result.status == "invalid" for result in results),
+            results=results
+        )
+
+    def _insert_parcels(self, rows: List[Dict[str, Any]], upsert: bool) -> Dict[str, str]:
+        """Insert rows in multi-row statements, returning created/updated per parcel_id"""
+        table = Parcel.__table__
+        outcomes = {}
+
+        # ON CONFLICT only sees the (parcel_id, region) of the target
+        # partition; a parcel_id registered under another region would make
+        # register_parcel_key() abort the whole statement. Those rows are
+        # left out of the INSERT and, when upserting, updated in place, which
+        # moves them to their new region's partition.
+        parcel_ids = [row["parcel_id"] for row in rows]
+        regions = {}
+        for start in range(0, len(parcel_ids), BULK_INSERT_BATCH_SIZE):
+            regions.update(self.db.query(ParcelKey.parcel_id, ParcelKey.region).filter(
+                ParcelKey.parcel_id.in_(parcel_ids[start:start + BULK_INSERT_BATCH_SIZE])
+            ).all())
+
+        moved = [row for row in rows if regions.get(row["parcel_id"], row["region"]) != row["region"]]
+        if moved:
+            rows = [row for row in rows if regions.get(row["parcel_id"], row["region"]) == row["region"]]
+        if moved and upsert:
+            for row in moved:
+                self.db.execute(
+                    table.update()
+                    .where(table.c.parcel_id == row["parcel_id"], table.c.region == regions[row["parcel_id"]])
+                    .values(**row, updated_at=func.now())
+                )
+                outcomes[row["parcel_id"]] = "updated"
+
+        for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+            stmt = pg_insert(table).values(rows[start:start + BULK_INSERT_BATCH_SIZE])
+            if upsert:
+                updates = {column: stmt.excluded[column] for column in rows[0] if column not in ("parcel_id", "region")}
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.parcel_id, table.c.region],
+                    set_={**updates, "updated_at": func.now()}
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.parcel_id, table.c.region])
+
+            # xmax is 0 for freshly inserted rows and set for rows updated by ON CONFLICT
+            stmt = stmt.returning(table.c.parcel_id, literal_column("xmax = 0").label("inserted"))
+            for row in self.db.execute(stmt):
+                outcomes[row.parcel_id] = "created" if row.inserted else "updated"
+
+        return outcomes
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+def _geometry_errors(geometries) -> List[Optional[str]]:
+    """Vectorized geometry checks; None for geometries that can be stored as parcels"""
+    import numpy as np
+    import shapely
+
+    errors = np.full(len(geometries), None, dtype=object)
+    if not len(geometries):
+        return errors.tolist()
+
+    missing = shapely.is_missing(geometries)
+    errors[missing] = "Invalid GeoJSON geometry"
+
+    not_polygon = ~missing & (shapely.get_type_id(geometries) != shapely.GeometryType.POLYGON)
+    errors[not_polygon] = "Geometry must be a Polygon"
+
+    empty = ~missing & ~not_polygon & shapely.is_empty(geometries)
+    errors[empty] = "Geometry is empty"
+
+    invalid = ~missing & ~not_polygon & ~empty & ~shapely.is_valid(geometries)
+    if invalid.any():
+        errors[invalid] = shapely.is_valid_reason(geometries[invalid])
+
+    return errors.tolist()
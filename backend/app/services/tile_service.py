@@ -0,0 +1,171 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Optional
+import os
+import shutil
+import tempfile
+
+from app.core.config import settings
+from app.models.listing import SpatialLayer
+from app.services.data_version_service import DataVersionService
+from app.services.layer_service import layer_version_name
+
+class TileService:
+    def __init__(self, db: Session, cache_dir: Optional[str] = None):
+        self.db = db
+        self.cache_dir = cache_dir or settings.tile_cache_dir
+
+    def get_parcel_tile(self, z: int, x: int, y: int) -> bytes:
+        """Get parcels as a Mapbox Vector Tile, served from the disk cache when unchanged"""
+        self._validate_tile(z, x, y)
+
+        version = DataVersionService(self.db).get_version("parcels")
+        path = self._cache_path("parcels", version, z, x, y)
+
+        tile = self._read_cache(path)
+        if tile is None:
+            tile = self._render_parcel_tile(z, x, y)
+            self._write_cache("parcels", "parcels", version, path, tile)
+
+        return tile
+
+    def get_layer_tile(self, layer: SpatialLayer, z: int, x: int, y: int) -> bytes:
+        """Get a spatial layer as a Mapbox Vector Tile, cached until the layer is re-imported"""
+        self._validate_tile(z, x, y)
+
+        cache_layer = os.path.join("layers", str(layer.id))
+        version_name = layer_version_name(layer.id)
+        version = DataVersionService(self.db).get_version(version_name)
+        path = self._cache_path(cache_layer, version, z, x, y)
+
+        tile = self._read_cache(path)
+        if tile is None:
+            tile = self._render_layer_tile(layer, z, x, y)
+            self._write_cache(cache_layer, version_name, version, path, tile)
+
+        return tile
+
+    def _render_layer_tile(self, layer: SpatialLayer, z: int, x: int, y: int) -> bytes:
+        # ST_AsMVT turns the jsonb properties column into tile attributes
+        query = text("""
+            WITH bounds AS (
+                SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+            ),
+            mvtgeom AS (
+                SELECT
+                    ST_AsMVTGeom(
+                        ST_Transform(f.geometry, 3857),
+                        bounds.geom,
+                        :extent,
+                        :buffer,
+                        true
+                    ) AS geom,
+                    f.id,
+                    f.properties
+                FROM spatial_layer_features f, bounds
+                WHERE f.layer_id = :layer_id
+                AND f.geometry && ST_Transform(bounds.geom, 4326)
+            )
+            SELECT ST_AsMVT(mvtgeom.*, :name, :extent, 'geom', 'id') AS tile
+            FROM mvtgeom
+            WHERE geom IS NOT NULL
+        """)
+
+        result = self.db.execute(query, {
+            "z": z, "x": x, "y": y, "layer_id": layer.id, "name": layer.name,
+            "extent": settings.tile_extent, "buffer": settings.tile_buffer
+        }).first()
+
+        return bytes(result.tile) if result and result.tile else b""
+
+    def _render_parcel_tile(self, z: int, x: int, y: int) -> bytes:
+        # The && filter runs against the tile envelope in EPSG:4326 so the
+        # planner can use idx_parcels_geometry; only matching rows are
+        # transformed and clipped to tile space.
+        query = text("""
+            WITH bounds AS (
+                SELECT ST_TileEnvelope(:z, :x, :y) AS geom
+            ),
+            mvtgeom AS (
+                SELECT
+                    ST_AsMVTGeom(
+                        ST_Transform(p.geometry, 3857),
+                        bounds.geom,
+                        :extent,
+                        :buffer,
+                        true
+                    ) AS geom,
+                    p.parcel_id,
+                    p.region,
+                    p.district,
+                    p.ward,
+                    p.land_use,
+                    p.zoning,
+                    p.owner_name,
+                    p.area_sqm::float8 AS area_sqm,
+                    p.valuation::float8 AS valuation
+                FROM parcels p, bounds
+                WHERE p.geometry && ST_Transform(bounds.geom, 4326)
+            )
+            SELECT ST_AsMVT(mvtgeom.*, 'parcels', :extent, 'geom') AS tile
+            FROM mvtgeom
+            WHERE geom IS NOT NULL
+        """)
+
+        result = self.db.execute(query, {
+            "z": z, "x": x, "y": y,
+            "extent": settings.tile_extent, "buffer": settings.tile_buffer
+        }).first()
+
+        return bytes(result.tile) if result and result.tile else b""
+
+    def _validate_tile(self, z: int, x: int, y: int):
+        if z < 0 or z > settings.tile_max_zoom:
+            raise ValueError(f"Invalid zoom level: {z}")
+        if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            raise ValueError(f"Invalid tile coordinates: {z}/{x}/{y}")
+
+    def _cache_path(self, layer: str, version: int, z: int, x: int, y: int) -> str:
+        return os.path.join(self.cache_dir, layer, f"v{version}", str(z), str(x), f"{y}.mvt")
+
+    def _read_cache(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_cache(self, layer: str, version_name: str, version: int, path: str, tile: bytes):
+        version_dir = os.path.join(self.cache_dir, layer, f"v{version}")
+        if not os.path.isdir(version_dir):
+            self._prune_versions(layer, version_name, keep=version)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temp file and rename so concurrent workers never read
+        # a partially written tile
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(tile)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _prune_versions(self, layer: str, version_name: str, keep: int):
+        """Remove cached tiles of data versions older than both `keep` and the current one
+
+        Other workers may still be rendering an older version than this one,
+        or already writing a newer one; the version is re-read so a worker
+        that started on a stale version never removes the current tiles.
+        """
+        layer_dir = os.path.join(self.cache_dir, layer)
+        if not os.path.isdir(layer_dir):
+            return
+
+        oldest_kept = min(keep, DataVersionService(self.db).get_version(version_name))
+        for name in os.listdir(layer_dir):
+            if name.startswith("v") and name[1:].isdigit() and int(name[1:]) < oldest_kept:
+                shutil.rmtree(os.path.join(layer_dir, name), ignore_errors=True)
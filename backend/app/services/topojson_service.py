@@ -0,0 +1,134 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import shapely
+
+# Keep this module free of database access: it turns already-fetched
+# features into a TopoJSON Topology
+
+Point = Tuple[int, int]
+
+def encode_topology(
+    features: List[Tuple[str, Any, Optional[bytes]]],
+    quantization: int,
+    object_name: str = "parcels"
+) -> Dict[str, Any]:
+    """Build a quantized TopoJSON Topology from (id, properties, WKB) features
+
+    Coordinates are snapped to a quantization x quantization grid over the
+    extent of the features. Rings are cut into arcs at junctions, the
+    points where rings sharing a boundary diverge, so a boundary shared by
+    neighbouring parcels is stored once and referenced by both (reversed
+    with ~index). Arcs are delta-encoded.
+    """
+    geoms = shapely.from_wkb([wkb for _, _, wkb in features])
+    coords = shapely.get_coordinates(geoms)
+    if len(coords):
+        x0, y0 = coords.min(axis=0).tolist()
+        x1, y1 = coords.max(axis=0).tolist()
+    else:
+        x0 = y0 = x1 = y1 = 0.0
+    kx = (x1 - x0) / (quantization - 1) if x1 > x0 else 1.0
+    ky = (y1 - y0) / (quantization - 1) if y1 > y0 else 1.0
+    origin = np.array([x0, y0])
+    scale = np.array([kx, ky])
+
+    def quantize(ring) -> Optional[List[Point]]:
+        snapped = np.round((shapely.get_coordinates(ring) - origin) / scale).astype(np.int64)
+        points: List[Point] = []
+        for point in map(tuple, snapped.tolist()):
+            if not points or points[-1] != point:
+                points.append(point)
+        # Rings are handled open; the closing point is restored on each arc
+        if len(points) > 1 and points[0] == points[-1]:
+            points.pop()
+        return points if len(points) >= 3 else None
+
+    # Polygons per feature, each a list of open quantized rings; rings
+    # that collapse at this quantization are dropped
+    shapes: List[List[List[List[Point]]]] = []
+    for geom in geoms:
+        polygons = []
+        if geom is not None and not geom.is_empty:
+            for polygon in shapely.get_parts(geom):
+                exterior = quantize(polygon.exterior)
+                if exterior is None:
+                    continue
+                rings = [exterior] + [ring for ring in map(quantize, polygon.interiors) if ring is not None]
+                polygons.append(rings)
+        shapes.append(polygons)
+
+    junctions = _junctions(ring for polygons in shapes for rings in polygons for ring in rings)
+
+    arcs: List[List[Point]] = []
+    arc_ids: Dict[Tuple[Point, ...], int] = {}
+
+    def arc_id(points: List[Point]) -> int:
+        key = tuple(points)
+        if key in arc_ids:
+            return arc_ids[key]
+        reverse = key[::-1]
+        if reverse in arc_ids:
+            return ~arc_ids[reverse]
+        arc_ids[key] = len(arcs)
+        arcs.append(points)
+        return arc_ids[key]
+
+    geometries = []
+    for (feature_id, properties, _), polygons in zip(features, shapes):
+        encoded = [[[arc_id(arc) for arc in _cut(ring, junctions)] for ring in rings] for rings in polygons]
+        geometry: Dict[str, Any] = {"id": feature_id, "properties": properties}
+        if not encoded:
+            geometry["type"] = None
+        elif len(encoded) == 1:
+            geometry["type"] = "Polygon"
+            geometry["arcs"] = encoded[0]
+        else:
+            geometry["type"] = "MultiPolygon"
+            geometry["arcs"] = encoded
+        geometries.append(geometry)
+
+    return {
+        "type": "Topology",
+        "bbox": [x0, y0, x1, y1],
+        "transform": {"scale": [kx, ky], "translate": [x0, y0]},
+        "objects": {object_name: {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": [_delta_encode(arc) for arc in arcs],
+    }
+
+def _junctions(rings) -> set:
+    """Points whose neighbours differ between the rings (or ring passes) visiting them"""
+    neighbors: Dict[Point, Tuple[Point, Point]] = {}
+    junctions = set()
+    for ring in rings:
+        count = len(ring)
+        for i, point in enumerate(ring):
+            previous, following = ring[i - 1], ring[(i + 1) % count]
+            seen = neighbors.get(point)
+            if seen is None:
+                neighbors[point] = (previous, following)
+            elif seen != (previous, following) and seen != (following, previous):
+                junctions.add(point)
+    return junctions
+
+def _cut(ring: List[Point], junctions: set) -> List[List[Point]]:
+    """Split an open ring into closed arcs at its junctions
+
+    A ring without junctions is one arc starting at its smallest point, so
+    identical rings yield the same arc whichever point they started at.
+    """
+    cuts = [i for i, point in enumerate(ring) if point in junctions]
+    start = cuts[0] if cuts else ring.index(min(ring))
+    rotated = ring[start:] + ring[:start]
+    rotated.append(rotated[0])
+
+    if not cuts:
+        return [rotated]
+    bounds = [i - start for i in cuts] + [len(ring)]
+    return [rotated[a:b + 1] for a, b in zip(bounds, bounds[1:])]
+
+def _delta_encode(points: List[Point]) -> List[List[int]]:
+    encoded = [list(points[0])]
+    for (px, py), (x, y) in zip(points, points[1:]):
+        encoded.append([x - px, y - py])
+    return encoded
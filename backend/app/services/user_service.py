@@ -1,26 +1,30 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from typing import Optional, List
+from functools import lru_cache
 import uuid
-from passlib.context import CryptContext
 
 from app.models.user import User, UserRole, UserPermission
 from app.schemas.user import UserCreate, UserUpdate
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache(maxsize=None)
+def password_context():
+    """bcrypt CryptContext, built on first use so workers boot without importing passlib"""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 class UserService:
     def __init__(self, db: Session):
         self.db = db
     
     def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+        return password_context().hash(password)
     
-    def create_user(self, user_data: UserCreate) -> User:
-        """Create a new user"""
+    def create_user(self, user_data: UserCreate, password_hash: Optional[str] = None) -> User:
+        """Create a new user; pass password_hash when it was computed off the event loop"""
         db_user = User(
             email=user_data.email,
-            password_hash=self.get_password_hash(user_data.password),
+            password_hash=password_hash or self.get_password_hash(user_data.password),
             first_name=user_data.first_name,
             last_name=user_data.last_name,
             phone=user_data.phone,
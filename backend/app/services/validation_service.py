@@ -0,0 +1,116 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+import multiprocessing
+import os
+
+import numpy as np
+import shapely
+
+# Keep this module free of app imports: worker processes are spawned and
+# import it on their own
+
+VALID = "valid"
+REPAIRED = "repaired"
+INVALID = "invalid"
+
+# Overlaps covering less than this share of the smaller parcel are treated
+# as digitising noise rather than reported
+OVERLAP_MIN_RATIO = 0.001
+
+def validate_wkb(wkbs: List[bytes]) -> Tuple[List[Optional[bytes]], List[str], List[Optional[str]]]:
+    """Check polygons, repairing invalid ones with make_valid
+
+    Returns the (possibly repaired) WKB, a status and the GEOS reason per
+    geometry. Geometries that do not repair into a single polygon get
+    status INVALID and no WKB.
+    """
+    geoms = shapely.from_wkb(wkbs)
+    valid = shapely.is_valid(geoms)
+
+    out = list(wkbs)
+    statuses = [VALID] * len(wkbs)
+    reasons: List[Optional[str]] = [None] * len(wkbs)
+
+    invalid = np.flatnonzero(~valid)
+    if len(invalid):
+        invalid_reasons = shapely.is_valid_reason(geoms[invalid])
+        repaired = shapely.make_valid(geoms[invalid])
+        for i, reason, geom in zip(invalid, invalid_reasons, repaired):
+            polygon = _single_polygon(geom)
+            reasons[i] = reason
+            if polygon is None:
+                out[i] = None
+                statuses[i] = INVALID
+            else:
+                out[i] = shapely.to_wkb(polygon)
+                statuses[i] = REPAIRED
+
+    return out, statuses, reasons
+
+def overlapping(wkbs_a: List[bytes], wkbs_b: List[bytes]) -> List[bool]:
+    """Whether each pair of polygons shares interior area beyond OVERLAP_MIN_RATIO"""
+    a = shapely.from_wkb(wkbs_a)
+    b = shapely.from_wkb(wkbs_b)
+
+    interiors = shapely.relate_pattern(a, b, "T********")
+    smaller = np.minimum(shapely.area(a), shapely.area(b))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = shapely.area(shapely.intersection(a, b)) / smaller
+
+    return (interiors & (ratio >= OVERLAP_MIN_RATIO)).tolist()
+
+def _single_polygon(geom) -> Optional[shapely.Geometry]:
+    """The polygonal part of a make_valid result if it is one polygon"""
+    if geom is None or geom.is_empty:
+        return None
+    if geom.geom_type == "GeometryCollection":
+        parts = [part for part in geom.geoms if part.geom_type in ("Polygon", "MultiPolygon")]
+        if not parts:
+            return None
+        geom = shapely.union_all(parts)
+    if geom.geom_type == "MultiPolygon" and len(geom.geoms) == 1:
+        geom = geom.geoms[0]
+    return geom if geom.geom_type == "Polygon" else None
+
+class GeometryValidator:
+    """Runs validate_wkb and overlap checks across a pool of worker processes
+
+    With one worker everything runs in the calling process, which is
+    cheaper for small imports than starting a pool.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def validate(self, wkbs: List[bytes]) -> Tuple[List[Optional[bytes]], List[str], List[Optional[str]]]:
+        """validate_wkb over all geometries, split across the workers"""
+        out, statuses, reasons = [], [], []
+        for chunk_out, chunk_statuses, chunk_reasons in self._map(validate_wkb, wkbs):
+            out.extend(chunk_out)
+            statuses.extend(chunk_statuses)
+            reasons.extend(chunk_reasons)
+        return out, statuses, reasons
+
+    def confirm_overlaps(self, wkbs_a: List[bytes], wkbs_b: List[bytes]) -> List[bool]:
+        """overlapping() over candidate pairs, split across the workers"""
+        return [flag for chunk in self._map(overlapping, wkbs_a, wkbs_b) for flag in chunk]
+
+    def _map(self, fn, *columns: List):
+        """fn over the columns, split into one slice per worker"""
+        if self.pool is None or not columns[0]:
+            return [fn(*columns)]
+        chunk_size = -(-len(columns[0]) // self.workers)
+        return self.pool.map(
+            fn,
+            *[[column[start:start + chunk_size] for start in range(0, len(column), chunk_size)] for column in columns]
+        )
@@ -0,0 +1,90 @@
+"""
+Benchmark worker cold start: a fresh interpreter importing app.main and
+running the application's startup (the schema version check), as every new
+uvicorn/gunicorn worker does.
+
+Each run is a separate process so nothing is cached in sys.modules. Reported
+per phase as the median over --repeat runs, along with which of the heavy
+geo/crypto libraries were loaded by the end of startup.
+
+Usage:
+    python scripts/benchmark_cold_start.py [--repeat 10] [--no-startup] [--importtime 15]
+"""
+import sys
+import os
+import argparse
+import json
+import statistics
+import subprocess
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["numpy", "shapely", "fiona", "passlib", "geoalchemy2.shape"]
+
+PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def startup():
+    async with app.main.lifespan(app.main.app):
+        pass
+
+if {startup}:
+    asyncio.run(startup())
+done = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - start,
+    "startup_s": done - imported,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+def run_probe(startup: bool) -> dict:
+    code = PROBE.format(startup=startup, heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    measured = json.loads(result.stdout.strip().splitlines()[-1])
+    measured["process_s"] = time.perf_counter() - start
+    return measured
+
+def slowest_imports(count: int):
+    """Top modules by cumulative import time from python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if cumulative_us.strip().isdigit():
+            timings.append((int(cumulative_us), name.strip()))
+    return sorted(timings, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--no-startup", action="store_true", help="Only import app.main; no database needed")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="Also list the N slowest imports")
+    args = parser.parse_args()
+
+    runs = [run_probe(not args.no_startup) for _ in range(args.repeat)]
+    for phase, label in (("import_s", "import app.main"), ("startup_s", "startup"), ("process_s", "whole process")):
+        timings = [run[phase] for run in runs]
+        print(f"{label:>16}: median {statistics.median(timings) * 1000:8.1f} ms  max {max(timings) * 1000:8.1f} ms")
+    print(f"{'loaded at boot':>16}: {', '.join(runs[-1]['loaded']) or 'none of ' + ', '.join(HEAVY_MODULES)}")
+
+    if args.importtime:
+        print()
+        print(f"{'cumulative ms':>14}  module")
+        for cumulative_us, name in slowest_imports(args.importtime):
+            print(f"{cumulative_us / 1000:>14.1f}  {name}")
+
+if __name__ == "__main__":
+    main()
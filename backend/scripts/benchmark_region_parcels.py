@@ -0,0 +1,110 @@
+"""
+Benchmark GET /parcels/?regions=... loading: the legacy per-parcel geometry
+lookup (N+1 queries) against the single set-based query.
+
+Synthetic parcels are inserted into a throwaway region inside a transaction
+that is rolled back at the end, so the database is left unchanged.
+
+Usage:
+    python scripts/benchmark_region_parcels.py [--sizes 1000 5000] [--repeat 5]
+"""
+import sys
+import os
+import argparse
+import json
+import statistics
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import SessionLocal
+from app.models.parcel import Parcel
+from app.schemas.parcel import ParcelCollection, ParcelFeature
+from app.services.parcel_service import ParcelService
+
+BENCH_REGION = "__benchmark__"
+
+def insert_synthetic_parcels(db, count: int):
+    """Insert a grid of small square parcels into the benchmark region"""
+    db.execute(text("""
+        INSERT INTO parcels (parcel_id, geometry, region, district, ward, area_sqm,
+                             perimeter_m, owner_name, address, land_use, zoning, valuation)
+        SELECT
+            'BENCH' || n,
+            ST_MakeEnvelope(
+                39.0 + (n % 100) * 0.001, -6.0 - (n / 100) * 0.001,
+                39.0 + (n % 100) * 0.001 + 0.0009, -6.0 - (n / 100) * 0.001 + 0.0009,
+                4326
+            ),
+            :region, 'Benchmark', 'Benchmark', 1000, 400,
+            'Owner ' || n, 'Plot ' || n, 'Residential', 'R1', 100000
+        FROM generate_series(1, :count) AS n
+    """), {"region": BENCH_REGION, "count": count})
+
+def legacy_get_parcels_by_region(db, regions, limit):
+    """The pre-optimisation implementation: ORM rows plus one geometry query per parcel"""
+    parcels = db.query(Parcel).filter(Parcel.region.in_(regions)).limit(limit).all()
+
+    features = []
+    for parcel in parcels:
+        result = db.execute(text("""
+            SELECT ST_AsGeoJSON(geometry) as geometry
+            FROM parcels
+            WHERE id = :parcel_id
+        """), {"parcel_id": parcel.id}).first()
+
+        features.append(ParcelFeature(
+            id=parcel.parcel_id,
+            geometry=json.loads(result.geometry),
+            properties={
+                "parcel_id": parcel.parcel_id,
+                "region": parcel.region,
+                "district": parcel.district,
+                "ward": parcel.ward,
+                "area_sqm": float(parcel.area_sqm) if parcel.area_sqm else None,
+                "perimeter_m": float(parcel.perimeter_m) if parcel.perimeter_m else None,
+                "owner_name": parcel.owner_name,
+                "owner_id": parcel.owner_id,
+                "address": parcel.address,
+                "land_use": parcel.land_use,
+                "zoning": parcel.zoning,
+                "valuation": float(parcel.valuation) if parcel.valuation else None,
+                "created_at": parcel.created_at.isoformat() if parcel.created_at else None,
+                "updated_at": parcel.updated_at.isoformat() if parcel.updated_at else None
+            }
+        ))
+
+    # Serialise as the endpoint would
+    return ParcelCollection(features=features, total=len(features)).model_dump_json().encode()
+
+def time_call(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        insert_synthetic_parcels(db, max(args.sizes))
+        db.flush()
+
+        service = ParcelService(db)
+        print(f"{'parcels':>8} {'legacy (ms)':>12} {'single query (ms)':>18} {'speedup':>8}")
+        for size in args.sizes:
+            legacy = time_call(lambda: legacy_get_parcels_by_region(db, [BENCH_REGION], size), args.repeat)
+            current = time_call(lambda: service.get_parcels_by_region([BENCH_REGION], size), args.repeat)
+            print(f"{size:>8} {legacy * 1000:>12.1f} {current * 1000:>18.1f} {legacy / current:>7.1f}x")
+    finally:
+        db.rollback()
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Load test: concurrent request throughput of `async def` handlers that query
+through the blocking sync Session against the asyncpg AsyncSession path.
+
+Each simulated request runs the same service call a handler makes. On the
+sync path it blocks the event loop, so concurrent requests run one after
+another; on the async path the query awaits asyncpg and requests overlap.
+Event loop lag is how late a 10 ms ticker wakes up, i.e. how long every other
+request on the worker would have been stalled.
+
+--query sleep stands in for a slow spatial query with pg_sleep; --query
+parcels runs ParcelService.get_parcels_by_region for --region.
+
+Usage:
+    python scripts/load_test_async_db.py [--query sleep|parcels] [--concurrency 1 5 10] [--requests 50]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import statistics
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import AsyncSessionLocal, SessionLocal, async_engine
+from app.services.parcel_service import ParcelService
+
+TICK = 0.01
+
+def make_workload(args):
+    """The sync service call one request makes"""
+    if args.query == "sleep":
+        return lambda session: session.execute(text("SELECT pg_sleep(:seconds)"), {"seconds": args.sleep}).scalar()
+    return lambda session: ParcelService(session).get_parcels_by_region([args.region], args.limit)
+
+async def sync_request(workload):
+    # What the handlers did before: blocking I/O inside a coroutine
+    db = SessionLocal()
+    try:
+        workload(db)
+    finally:
+        db.close()
+
+async def async_request(workload):
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(workload)
+
+async def watch_loop_lag(lags: list, done: asyncio.Event):
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+async def run(request, workload, concurrency: int, total: int):
+    """Run `total` requests, at most `concurrency` at a time; returns (req/s, latencies, loop lags)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, lags = [], []
+    done = asyncio.Event()
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await request(workload)
+            latencies.append(time.perf_counter() - start)
+
+    watcher = asyncio.create_task(watch_loop_lag(lags, done))
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await watcher
+    return total / elapsed, latencies, lags or [0.0]
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+async def main_async(args):
+    workload = make_workload(args)
+    # Warm both pools so connection setup is not measured
+    await run(sync_request, workload, 1, 1)
+    await run(async_request, workload, max(args.concurrency), max(args.concurrency))
+
+    print(f"{'conc':>5} {'path':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max loop lag ms':>16}")
+    for concurrency in args.concurrency:
+        for name, request in (("sync", sync_request), ("async", async_request)):
+            throughput, latencies, lags = await run(request, workload, concurrency, args.requests)
+            print(
+                f"{concurrency:>5} {name:>6} {throughput:>8.1f} "
+                f"{statistics.median(latencies) * 1000:>8.1f} {percentile(latencies, 0.95) * 1000:>8.1f} "
+                f"{max(lags) * 1000:>16.1f}"
+            )
+    await async_engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--query", choices=["sleep", "parcels"], default="sleep")
+    parser.add_argument("--sleep", type=float, default=0.1, help="Seconds per query with --query sleep")
+    parser.add_argument("--region", default="Dar es Salaam")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
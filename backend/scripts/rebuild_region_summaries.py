@@ -0,0 +1,42 @@
+"""
+Check or rebuild the region_listing_summaries rollup behind GET /external/regions.
+
+Triggers on plot_listings and parcels keep the rollup current; this compares
+every region against a fresh aggregate of the base tables and, unless --check
+is given, recomputes all of them.
+
+Usage:
+    python scripts/rebuild_region_summaries.py [--check]
+"""
+import sys
+import os
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.external_service import ExternalApiService
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true",
+                        help="Only report regions that differ from the base tables; exit 1 if any do")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        service = ExternalApiService(db)
+        drifted = service.check_region_summaries()
+        for region in drifted:
+            print(f"out of date: {region}")
+
+        if args.check:
+            print(f"{len(drifted)} region(s) out of date")
+            sys.exit(1 if drifted else 0)
+
+        rebuilt = service.rebuild_region_summaries()
+        print(f"Rebuilt {rebuilt} region(s), {len(drifted)} were out of date")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,26 @@ Seed script to populate the database with sample Tanzania parcel data
 """
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
 
+from alembic import command
+from alembic.config import Config
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal, engine
-from app.models.parcel import Base, Parcel
+from app.core.database import SessionLocal
+from app.models.parcel import Parcel
 from geoalchemy2.shape import from_shape
 from shapely.geometry import Polygon
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+def migrate():
+    """Bring the database to the latest migration, as `alembic upgrade head` does
+
+    The schema (partitions, parcel_keys, triggers) only exists in the
+    migrations; Base.metadata.create_all would leave parcels without them.
+    """
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
 
 def create_sample_parcels():
     db = SessionLocal()
@@ -167,4 +177,5 @@ def create_sample_parcels():
         db.close()
 
 if __name__ == "__main__":
+    migrate()
     create_sample_parcels()
\ No newline at end of file
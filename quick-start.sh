@@ -63,7 +63,7 @@ echo "🎉 Setup complete!"
 echo ""
 echo "📋 Next steps:"
 echo "1. Configure your .env files with Supabase credentials"
-echo "2. Run the backend: cd backend && source venv/bin/activate && python scripts/seed_enhanced_data.py && uvicorn app.main:app --reload"
+echo "2. Run the backend: cd backend && source venv/bin/activate && alembic upgrade head && python scripts/seed_enhanced_data.py && uvicorn app.main:app --reload"
 echo "3. Run the frontend: npm run dev"
 echo ""
 echo "📖 For detailed instructions, see setup-instructions.md"
\ No newline at end of file
@@ -1,4 +1,4 @@
-import { ParcelCollection, ParcelFeature, SearchParams } from '../types';
+import { ParcelClusterCollection, ParcelCollection, ParcelFeature, SearchParams } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1';
 
@@ -33,6 +33,15 @@ class ApiService {
     return this.request<ParcelCollection>(`/parcels?${params}`);
   }
 
+  async getParcelClusters(bbox: string, zoom: number, regions?: string[]): Promise<ParcelClusterCollection> {
+    const params = new URLSearchParams();
+    params.append('bbox', bbox);
+    params.append('zoom', Math.floor(zoom).toString());
+    if (regions && regions.length > 0) params.append('regions', regions.join(','));
+
+    return this.request<ParcelClusterCollection>(`/parcels/clusters?${params}`);
+  }
+
   async getParcel(parcelId: string): Promise<any> {
     return this.request(`/parcels/${parcelId}`);
   }
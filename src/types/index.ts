@@ -27,6 +27,19 @@ export interface ParcelCollection extends GeoJSON.FeatureCollection {
   total: number;
 }
 
+export interface ParcelClusterProperties {
+  parcel_count: number;
+  listing_count: number;
+  area_sqm: number;
+  valuation: number;
+}
+
+export interface ParcelClusterCollection extends GeoJSON.FeatureCollection<GeoJSON.Point, ParcelClusterProperties> {
+  bbox: [number, number, number, number];
+  cell_size: number;
+  total: number;
+}
+
 export interface SearchParams {
   field: 'owner_name' | 'parcel_id' | 'address' | 'land_use' | 'region';
   value: string;